@@ -0,0 +1,89 @@
+"""Tests for the transactional ATM pause window."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.pv_miner.luxos_api import LuxOSAPI, LuxOSAPIError
+
+OK = {"STATUS": [{"STATUS": "S", "Msg": "ok"}]}
+
+
+@pytest.fixture
+def api():
+    """Create an API client recording its session commands."""
+    api = LuxOSAPI("192.168.1.210")
+    api._execute_session_command = AsyncMock(return_value=OK)
+    api.wait_for_atm_state = AsyncMock(return_value=True)
+    api.wait_for_board_states = AsyncMock(return_value=True)
+    return api
+
+
+def _commands(api):
+    return [call.args for call in api._execute_session_command.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_boards_share_one_pause_window(api):
+    """Several boards are switched between one ATM pause and one restore."""
+    outcome = await api.set_hashboards({0: False, 2: False})
+
+    assert _commands(api) == [
+        ("atmset", "enabled=false"),
+        ("disableboard", "0"),
+        ("disableboard", "2"),
+        ("atmset", "enabled=true"),
+    ]
+    api.wait_for_board_states.assert_awaited_once_with({0: False, 2: False}, timeout=15)
+    assert outcome["verified"] is True
+    assert api.state.atm_enabled is True
+
+
+@pytest.mark.asyncio
+async def test_atm_restored_on_failure(api):
+    """A failing board command still re-enables ATM."""
+    async def _command(command, parameter):
+        if command == "disableboard":
+            raise LuxOSAPIError("board busy")
+        return OK
+
+    api._execute_session_command.side_effect = _command
+
+    with pytest.raises(LuxOSAPIError):
+        await api.set_hashboards({1: False})
+
+    assert _commands(api)[-1] == ("atmset", "enabled=true")
+    assert api.state.atm_enabled is True
+
+
+@pytest.mark.asyncio
+async def test_atm_restored_on_cancellation(api):
+    """Cancelling the operation inside the window still re-enables ATM."""
+    started = asyncio.Event()
+
+    async def _command(command, parameter):
+        if command == "disableboard":
+            started.set()
+            await asyncio.sleep(10)
+        return OK
+
+    api._execute_session_command.side_effect = _command
+    task = asyncio.ensure_future(api.set_hashboards({1: False}))
+    await started.wait()
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert _commands(api)[-1] == ("atmset", "enabled=true")
+
+
+@pytest.mark.asyncio
+async def test_atm_disabled_by_user_stays_off(api):
+    """ATM that was already off is neither paused nor re-enabled."""
+    api.state.confirm_atm(False)
+
+    await api.set_hashboards({0: True})
+
+    assert _commands(api) == [("enableboard", "0")]
+    assert api.state.atm_enabled is False
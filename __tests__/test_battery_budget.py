@@ -0,0 +1,77 @@
+"""Tests for the battery state-of-charge aware power budget."""
+import pytest
+
+from custom_components.pv_miner.battery_budget import (
+    MODE_CHARGE,
+    MODE_DISCHARGE,
+    MODE_MINE,
+    BatteryBudget,
+)
+
+
+@pytest.fixture
+def budget():
+    """Create a budget mining from 90% and discharging to 30%."""
+    return BatteryBudget(mine_soc=90, floor_soc=30, max_charge_watts=3000, max_discharge_watts=2500)
+
+
+def test_without_soc_passes_pv_through(budget):
+    """No SOC reading leaves the PV power untouched."""
+    assert budget.update(4000, None) == 4000
+    assert budget.mode is None
+
+
+def test_battery_charges_first(budget):
+    """Below the mining band only PV beyond the charge reserve is available."""
+    assert budget.update(5000, 50) == 2000
+    assert budget.update(2000, 50) == 0
+    assert budget.mode == MODE_CHARGE
+
+
+def test_full_battery_mines_all_pv(budget):
+    """At the mining SOC all PV power goes to the miners."""
+    assert budget.update(4000, 92) == 4000
+    assert budget.mode == MODE_MINE
+
+
+def test_discharge_into_evening_until_floor(budget):
+    """After mining started the battery supplements PV down to the floor."""
+    budget.update(4000, 92)
+
+    assert budget.update(500, 70) == 3000
+    assert budget.mode == MODE_DISCHARGE
+    assert budget.update(0, 31) == 2500
+
+    # Floor reached - back to charging
+    assert budget.update(0, 30) == 0
+    assert budget.mode == MODE_CHARGE
+    # Hysteresis: no mining until the battery is back at the mining SOC
+    assert budget.update(2500, 60) == 0
+
+
+def test_household_discharge_reduces_budget(budget):
+    """Discharge beyond the miner's draw and the allowance is taken off the budget."""
+    budget.update(4000, 92)
+
+    # Miner asleep, household draws 3000W from the battery
+    assert budget.update(0, 70, battery_watts=-3000, miner_watts=0) == 2000
+    # Household at night on top of a miner at 2000W
+    assert budget.update(0, 70, battery_watts=-5000, miner_watts=2000) == 2000
+    # In the mine band discharge beyond the miner's draw counts against the budget
+    assert budget.update(3000, 95, battery_watts=-1000, miner_watts=500) == 2500
+
+
+def test_miner_discharge_is_not_counted_twice(budget):
+    """The battery covering the miner's own draw leaves the budget unchanged."""
+    budget.update(4000, 92)
+
+    assert budget.update(500, 70, battery_watts=-2500, miner_watts=3000) == 3000
+    assert budget.update(3000, 95, battery_watts=-500, miner_watts=3500) == 3000
+    # Without the miner's draw the discharge is not attributed
+    assert budget.update(500, 70, battery_watts=-3000) == 3000
+
+
+def test_invalid_bands():
+    """The floor must lie below the mining SOC."""
+    with pytest.raises(ValueError):
+        BatteryBudget(mine_soc=30, floor_soc=40)
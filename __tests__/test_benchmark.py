@@ -0,0 +1,51 @@
+"""Tests for the benchmark suite."""
+import pytest
+
+from custom_components.pv_miner import POLL_COMMANDS
+from benchmarks.benchmark import async_run, compare, percentiles
+
+
+def test_percentiles_in_milliseconds():
+    """Durations in seconds are reported as millisecond percentiles."""
+    result = percentiles([i / 1000 for i in range(1, 101)], "poll_")
+
+    assert result == {"poll_p50_ms": 51.0, "poll_p90_ms": 91.0, "poll_p99_ms": 100.0, "poll_max_ms": 100.0}
+
+
+def test_compare_flags_regressions_in_both_directions():
+    """Slower timings and fewer polls per second beyond the tolerance are regressions."""
+    baseline = {
+        "fleet.10.poll_p50_ms": 40.0,
+        "fleet.10.polls_per_second": 1000.0,
+        "fleet.10.executor_threads": 10,
+        "command.stats.p50_ms": 0.5,
+        "memory.poll_peak_bytes": 100000,
+    }
+    current = {
+        "fleet.10.poll_p50_ms": 60.0,
+        "fleet.10.polls_per_second": 700.0,
+        "fleet.10.executor_threads": 10,
+        "command.stats.p50_ms": 0.9,
+        "memory.poll_peak_bytes": 90000,
+    }
+
+    regressions = compare(current, baseline, tolerance=0.25)
+
+    assert [line.split(":")[0] for line in regressions] == ["fleet.10.poll_p50_ms", "fleet.10.polls_per_second"]
+    assert compare(baseline, current, tolerance=0.25) == []
+
+
+@pytest.mark.asyncio
+async def test_run_reports_all_metrics():
+    """A small run polls every miner without failures and reports each metric."""
+    report = await async_run(sizes=(1, 3), rounds=2, samples=3)
+    metrics = report["metrics"]
+
+    for command in POLL_COMMANDS:
+        assert metrics[f"command.{command}.p50_ms"] > 0
+    assert metrics["fleet.3.polls_per_second"] > 0
+    assert metrics["fleet.3.poll_failures"] == 0
+    assert 1 <= metrics["fleet.3.executor_threads"] <= report["meta"]["executor_workers"]
+    assert metrics["fleet.3.executor_jobs_per_poll"] == 1.0
+    assert metrics["fleet.3.wire_bytes_per_poll"] > 0
+    assert metrics["memory.poll_peak_bytes"] > 0
@@ -0,0 +1,112 @@
+"""Tests for importing many miners in one config flow."""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner.config_flow import (
+    PVMinerConfigFlow,
+    async_validate_miners,
+    parse_miner_list,
+)
+from custom_components.pv_miner.luxos_api import LuxOSAPIError
+
+CREDENTIALS = {"username": "root", "password": "root"}
+
+
+def test_parse_csv_with_header_and_comments():
+    """CSV lines give host, name and optional credentials."""
+    miners = parse_miner_list(
+        "host,name\n# rack 1\n192.168.1.210, S19j Pro+\n192.168.1.211;S19j Pro;admin;secret\n192.168.1.212\n"
+    )
+    assert miners == [
+        {"host": "192.168.1.210", "name": "S19j Pro+"},
+        {"host": "192.168.1.211", "name": "S19j Pro", "username": "admin", "password": "secret"},
+        {"host": "192.168.1.212", "name": "192.168.1.212"},
+    ]
+
+
+def test_parse_yaml_list_and_mapping():
+    """YAML lists of mappings or hosts and name: host mappings are accepted."""
+    assert parse_miner_list("- host: 192.168.1.210\n  name: S21+\n- 192.168.1.211\n") == [
+        {"host": "192.168.1.210", "name": "S21+"},
+        {"host": "192.168.1.211", "name": "192.168.1.211"},
+    ]
+    assert parse_miner_list("miners:\n  - {ip: 192.168.1.212, name: S21+}\n") == [
+        {"host": "192.168.1.212", "name": "S21+"},
+    ]
+    assert parse_miner_list("S21+: 192.168.1.212\n") == [{"host": "192.168.1.212", "name": "S21+"}]
+
+
+def test_parse_rejects_empty_or_hostless_lists():
+    """Nothing to import or an entry without host is an error."""
+    with pytest.raises(ValueError):
+        parse_miner_list("# nothing\n")
+    with pytest.raises(ValueError):
+        parse_miner_list("- name: S21+\n")
+
+
+@pytest.mark.asyncio
+async def test_validation_runs_concurrently_over_one_session():
+    """All miners are validated in parallel with the shared HTTP session."""
+    session = object()
+    sessions = set()
+    running = 0
+    peak = 0
+
+    async def _validate(hass, data, session=None):
+        nonlocal running, peak
+        sessions.add(id(session))
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if data["host"].endswith(".13"):
+            raise LuxOSAPIError("Cannot connect to miner")
+        return {"title": data["name"], "firmware": "2025.10.15"}
+
+    miners = [{"host": f"10.0.0.{i}", "name": f"m{i}"} for i in range(1, 41)]
+    with patch("custom_components.pv_miner.config_flow.async_get_clientsession", return_value=session), patch(
+        "custom_components.pv_miner.config_flow.validate_input", _validate
+    ):
+        results = await async_validate_miners(MagicMock(), miners, CREDENTIALS, configured=["10.0.0.1"])
+
+    assert sessions == {id(session)}
+    assert peak == 32
+    assert results[0] == {"host": "10.0.0.1", "name": "m1", "ok": False, "error": "already configured"}
+    assert results[12]["error"] == "Cannot connect to miner"
+    assert sum(result["ok"] for result in results) == 38
+
+
+@pytest.mark.asyncio
+async def test_flow_creates_an_entry_per_valid_miner():
+    """Valid miners share the power settings; one entry each is created."""
+    flow = PVMinerConfigFlow()
+    flow.hass = MagicMock()
+    flow.context = {}
+    flow._async_current_entries = MagicMock(return_value=[])
+    results = [
+        {"host": "192.168.1.210", "name": "a", "ok": True, "firmware": "2025.10.15"},
+        {"host": "192.168.1.211", "name": "b", "ok": False, "error": "Cannot connect to miner"},
+        {"host": "192.168.1.212", "name": "c", "username": "admin", "ok": True, "firmware": "2025.10.15"},
+    ]
+
+    with patch("custom_components.pv_miner.config_flow.async_validate_miners", return_value=results):
+        result = await flow.async_step_bulk(
+            {"miner_list": "192.168.1.210,a\n192.168.1.211,b\n192.168.1.212,c,admin", **CREDENTIALS}
+        )
+    assert result["step_id"] == "validate"
+    assert result["description_placeholders"]["passed"] == "2"
+    assert "❌ b (192.168.1.211): Cannot connect to miner" in result["description_placeholders"]["results"]
+
+    await flow.async_step_validate({})
+    await flow.async_step_power({"min_power": 500, "max_power": 3000, "priority": 1})
+    with patch.object(flow, "async_set_unique_id"), patch.object(flow, "_abort_if_unique_id_configured"):
+        result = await flow.async_step_intervals({"scan_interval": 30, "solar_scan_interval": 600})
+
+    assert result["title"] == "a"
+    imported = flow.hass.config_entries.flow.async_init.call_args.kwargs["data"]
+    assert imported["host"] == "192.168.1.212"
+    assert imported["username"] == "admin"
+    assert imported["password"] == "root"
+    assert imported["max_power"] == 3000
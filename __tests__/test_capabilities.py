@@ -0,0 +1,191 @@
+"""Tests for the firmware capability probe and cache."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner.capabilities import CapabilityStore, async_probe_capabilities
+from custom_components.pv_miner.const import (
+    CAP_ATM,
+    CAP_BATCH,
+    CAP_BOARD_CONTROL,
+    CAP_CURTAIL,
+    CAP_POWER_TARGET,
+    CAP_PROFILES,
+)
+from custom_components.pv_miner.luxos_api import (
+    BOARD_CONTROL_FAILURES,
+    LuxOSAPI,
+    LuxOSAPIError,
+    LuxOSUnsupportedError,
+)
+
+OK = {"STATUS": [{"STATUS": "S"}]}
+
+
+def _check(exists):
+    return {"STATUS": [{"STATUS": "S"}], "CHECK": [{"Exists": "Y" if exists else "N", "Access": "Y"}]}
+
+
+def _miner(commands):
+    """Return a fake _execute_command answering from a command table."""
+    async def _execute(command, parameter=""):
+        key = f"{command} {parameter}".strip() if command == "check" else command
+        reply = commands.get(key)
+        if reply is None:
+            raise LuxOSAPIError(f"unknown command {key}")
+        return reply
+    return _execute
+
+
+@pytest.fixture
+def api():
+    """Create an API client for a LuxOS 2025.10.15 miner."""
+    api = LuxOSAPI("192.168.1.210")
+    api.firmware_version = "2025.10.15.191043"
+    api._execute_command = AsyncMock(side_effect=_miner({
+        "check curtail": _check(True),
+        "check enableboard": _check(True),
+        "check powertargetset": _check(False),
+        "version+config": {"version": [OK], "config": [OK]},
+        "atm": {"STATUS": [{"STATUS": "S"}], "ATM": [{"Enabled": True}]},
+        "profiles": {"STATUS": [{"STATUS": "S"}], "PROFILES": [{"Profile Name": "default"}]},
+    }))
+    return api
+
+
+@pytest.mark.asyncio
+async def test_probe_reports_capabilities(api):
+    """The probe answers every capability without changing miner state."""
+    capabilities = await async_probe_capabilities(api)
+
+    assert capabilities == {
+        CAP_CURTAIL: True,
+        CAP_BOARD_CONTROL: None,  # exists, but only a verified change proves it works
+        CAP_POWER_TARGET: False,
+        CAP_BATCH: True,
+        CAP_ATM: True,
+        CAP_PROFILES: True,
+    }
+    sent = {call.args[0] for call in api._execute_command.await_args_list}
+    assert not sent & {"curtail", "enableboard", "atmset", "profileset"}
+
+
+@pytest.mark.asyncio
+async def test_probe_treats_unknown_power_target_as_unsupported(api):
+    """A firmware without the check command never gets a blind power target."""
+    api._execute_command.side_effect = _miner({"atm": {"ATM": []}})
+
+    capabilities = await async_probe_capabilities(api)
+
+    assert capabilities[CAP_POWER_TARGET] is False
+    assert capabilities[CAP_CURTAIL] is None
+    assert capabilities[CAP_BATCH] is False
+
+
+class _FakeStore:
+    """In-memory stand-in for the HA storage helper."""
+
+    saved = None
+
+    def __init__(self, hass, version, key):
+        pass
+
+    async def async_load(self):
+        return _FakeStore.saved
+
+    async def async_save(self, data):
+        _FakeStore.saved = data
+
+    def async_delay_save(self, data_func, delay):
+        _FakeStore.saved = data_func()
+
+
+@pytest.mark.asyncio
+async def test_store_probes_once_per_firmware(api):
+    """Capabilities are probed once and re-probed only after a firmware change."""
+    _FakeStore.saved = None
+    with patch("custom_components.pv_miner.capabilities.Store", _FakeStore):
+        await CapabilityStore(MagicMock()).async_capabilities("entry", api)
+        probes = api._execute_command.await_count
+
+        # A restart reuses the stored result
+        cached = await CapabilityStore(MagicMock()).async_capabilities("entry", api)
+        assert api._execute_command.await_count == probes
+        assert cached[CAP_CURTAIL] is True
+
+        api.firmware_version = "2026.1.1"
+        await CapabilityStore(MagicMock()).async_capabilities("entry", api)
+        assert api._execute_command.await_count == 2 * probes
+
+
+@pytest.mark.asyncio
+async def test_unverified_board_control_is_learned_and_persisted(api):
+    """Boards that repeatedly ignore the command mark board control unsupported."""
+    _FakeStore.saved = None
+    with patch("custom_components.pv_miner.capabilities.Store", _FakeStore):
+        store = CapabilityStore(MagicMock())
+        api.capabilities = await store.async_capabilities("entry", api)
+        api.capability_listener = lambda capability, supported: store.async_learn("entry", capability, supported)
+        api._execute_session_command = AsyncMock(return_value=OK)
+        api.wait_for_atm_state = AsyncMock(return_value=True)
+        api.wait_for_board_states = AsyncMock(return_value=False)
+
+        # A single slow verification is not proof
+        await api.disable_hashboard(1)
+        assert api.capabilities[CAP_BOARD_CONTROL] is None
+
+        for _ in range(BOARD_CONTROL_FAILURES - 1):
+            await api.disable_hashboard(1)
+        assert _FakeStore.saved["entry"]["capabilities"][CAP_BOARD_CONTROL] is False
+
+        # The next attempt fails fast without any round-trip
+        api._execute_session_command.reset_mock()
+        with pytest.raises(LuxOSUnsupportedError):
+            await api.disable_hashboard(1)
+        api._execute_session_command.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_poll_uses_one_round_trip(api):
+    """With batch support the poll commands share one request."""
+    api.capabilities = {CAP_BATCH: True}
+    api._execute_command = AsyncMock(return_value={
+        "stats": [{"STATS": []}],
+        "devs": [{"DEVS": []}],
+    })
+
+    replies = await api.execute_batch(["stats", "devs"])
+
+    api._execute_command.assert_awaited_once_with("stats+devs", "")
+    assert replies == {"stats": {"STATS": []}, "devs": {"DEVS": []}}
+
+
+@pytest.mark.asyncio
+async def test_rejected_board_command_is_unsupported_at_once(api):
+    """A firmware that rejects the board command is marked unsupported right away."""
+    api.capabilities = {CAP_BOARD_CONTROL: None}
+    api._execute_session_command = AsyncMock(
+        side_effect=LuxOSAPIError("All disableboard attempts failed. Last error: disableboard failed: Invalid command")
+    )
+    api.wait_for_atm_state = AsyncMock(return_value=True)
+
+    with pytest.raises(LuxOSAPIError):
+        await api.disable_hashboard(1)
+
+    assert api.capabilities[CAP_BOARD_CONTROL] is False
+
+
+@pytest.mark.asyncio
+async def test_verified_board_change_resets_failures(api):
+    """Failures must be consecutive to mark board control unsupported."""
+    api.capabilities = {CAP_BOARD_CONTROL: None}
+    api._execute_session_command = AsyncMock(return_value=OK)
+    api.wait_for_atm_state = AsyncMock(return_value=True)
+    api.wait_for_board_states = AsyncMock(
+        side_effect=[False] * (BOARD_CONTROL_FAILURES - 1) + [True] + [False] * (BOARD_CONTROL_FAILURES - 1)
+    )
+
+    for _ in range(2 * BOARD_CONTROL_FAILURES - 1):
+        await api.disable_hashboard(1)
+
+    assert api.capabilities[CAP_BOARD_CONTROL] is True
@@ -0,0 +1,107 @@
+"""Tests for the persisted profile catalog."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner.catalog_cache import ProfileCatalogCache
+from custom_components.pv_miner.profile_catalog import ProfileCatalog
+from custom_components.pv_miner.solar_policy import SolarPolicy, default_profile_models
+
+# Built-in table served before the first discovery
+BUILTIN = ProfileCatalog.from_models(default_profile_models(SolarPolicy()))
+
+DETAILS = {
+    "default": {"frequency": 525, "watts": 3050, "hashrate": 104.0, "step": "0", "voltage": 13.6},
+    "-2": {"frequency": 475, "watts": 2650, "hashrate": 94.0, "step": "-2", "voltage": 13.4},
+}
+
+
+class _FakeStore:
+    """In-memory stand-in for the HA storage helper."""
+
+    data = {}
+
+    def __init__(self, hass, version, key):
+        self.key = key
+
+    async def async_load(self):
+        return _FakeStore.data.get(self.key)
+
+    async def async_save(self, data):
+        _FakeStore.data[self.key] = data
+
+    async def async_remove(self):
+        _FakeStore.data.pop(self.key, None)
+
+
+@pytest.fixture(autouse=True)
+def fake_store():
+    """Patch the storage helper."""
+    _FakeStore.data = {}
+    with patch("custom_components.pv_miner.catalog_cache.Store", _FakeStore):
+        yield
+
+
+def _api(details, firmware="2025.10.15"):
+    api = MagicMock(host="192.168.1.210", firmware_version=firmware)
+    api.discover_profiles = AsyncMock(return_value=ProfileCatalog.from_details(details))
+    return api
+
+
+@pytest.mark.asyncio
+async def test_first_discovery_is_stored_and_signals_change():
+    """Without a stored catalog the first discovery is saved and reported."""
+    cache = ProfileCatalogCache(MagicMock(), "entry")
+    assert await cache.async_load("2025.10.15") is None
+
+    assert await cache.async_revalidate(_api(DETAILS), BUILTIN)
+
+    # After a restart the catalog is served without asking the miner
+    restarted = ProfileCatalogCache(MagicMock(), "entry")
+    catalog = await restarted.async_load("2025.10.15")
+    assert catalog.names == ["-2", "default"]
+    assert not await restarted.async_revalidate(_api(DETAILS), catalog)
+
+
+@pytest.mark.asyncio
+async def test_firmware_change_invalidates_catalog():
+    """A catalog discovered on other firmware is not served."""
+    await ProfileCatalogCache(MagicMock(), "entry").async_revalidate(_api(DETAILS), BUILTIN)
+
+    assert await ProfileCatalogCache(MagicMock(), "entry").async_load("2026.1.1") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_discovery_keeps_cached_catalog():
+    """An empty profiles reply never replaces a good catalog."""
+    cache = ProfileCatalogCache(MagicMock(), "entry")
+    await cache.async_revalidate(_api(DETAILS), BUILTIN)
+
+    assert not await cache.async_revalidate(_api({}), ProfileCatalog.from_details(DETAILS))
+    assert (await cache.async_load("2025.10.15")).names == ["-2", "default"]
+
+
+@pytest.mark.asyncio
+async def test_changed_profiles_are_reported():
+    """New profiles trigger a reload."""
+    cache = ProfileCatalogCache(MagicMock(), "entry")
+    await cache.async_revalidate(_api(DETAILS), BUILTIN)
+    served = ProfileCatalog.from_details(DETAILS)
+
+    changed = dict(DETAILS, **{"+1": {"frequency": 550, "watts": 3300, "hashrate": 108.0}})
+    assert await cache.async_revalidate(_api(changed), served)
+
+
+@pytest.mark.asyncio
+async def test_first_discovery_matching_served_catalog_does_not_reload():
+    """The first discovery is stored, but reloads only if the options change."""
+    cache = ProfileCatalogCache(MagicMock(), "entry")
+    served = ProfileCatalog.from_details(DETAILS)
+
+    assert not await cache.async_revalidate(_api(DETAILS), served)
+    assert (await cache.async_load("2025.10.15")).names == served.names
+
+    # Updated figures for the same profiles are stored without a reload
+    retuned = dict(DETAILS, default=dict(DETAILS["default"], watts=3100))
+    assert not await cache.async_revalidate(_api(retuned), served)
+    assert (await cache.async_load("2025.10.15")).profiles[-1].watts == 3100
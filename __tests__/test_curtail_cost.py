@@ -0,0 +1,91 @@
+"""Tests for the sleep/wake curtail cost model."""
+import pytest
+
+from custom_components.pv_miner.curtail_cost import (
+    CHOICE_LOWEST,
+    CHOICE_RIDE,
+    CHOICE_SLEEP,
+    CurtailCostModel,
+)
+
+
+@pytest.fixture
+def model():
+    """Create a cost model with a 500W sleep threshold."""
+    return CurtailCostModel(sleep_threshold=500, wake_seconds=300, retune_seconds=60)
+
+
+def _feed(model, samples, start=0, step=30):
+    """Feed filtered power samples at a fixed cadence."""
+    for i, watts in enumerate(samples):
+        model.add_sample(start + i * step, watts)
+    return start + len(samples) * step
+
+
+def test_smooth_decline_sleeps(model):
+    """A sunset ramp has no expected end and sleeps immediately."""
+    now = _feed(model, range(1500, 300, -60))
+
+    assert model.expected_dip_seconds(now) is None
+    assert model.choose(now, 300, 2300, 2223) == CHOICE_SLEEP
+
+
+def test_volatile_signal_rides_short_dip(model):
+    """Passing clouds make a short dip cheaper to ride at the lowest profile."""
+    now = _feed(model, [3000, 1200, 3200, 900, 3100, 1000, 3000, 400])
+
+    assert model.expected_dip_seconds(now) is not None
+    assert model.choose(now, 400, 3600, 2223) == CHOICE_LOWEST
+
+
+def test_ride_when_already_at_lowest(model):
+    """Without a re-tune to pay for, staying put is cheapest."""
+    now = _feed(model, [3000, 1200, 3200, 900, 3100, 1000, 3000, 450])
+
+    assert model.choose(now, 450, 2223, 2223, at_lowest=True) in (CHOICE_RIDE, CHOICE_LOWEST)
+    assert model.choose(now + 30, 450, 2223, 2223, at_lowest=True) != CHOICE_SLEEP
+
+
+def test_long_dip_ends_in_sleep(model):
+    """Riding is capped by the maximum ride time."""
+    now = _feed(model, [3000, 1200, 3200, 900, 3100, 1000, 3000, 400])
+    model.choose(now, 400, 3600, 2223)
+
+    assert model.choose(now + model.max_ride_seconds + 1, 400, 2223, 2223, at_lowest=True) == CHOICE_SLEEP
+    assert model.energy_saved_wh < 0
+
+
+def test_ridden_dip_books_savings(model):
+    """A dip ridden out books the avoided wake cost minus the import."""
+    now = _feed(model, [3000, 1200, 3200, 900, 3100, 1000, 3000, 400])
+    model.choose(now, 400, 2223, 2223, at_lowest=True)
+    model.add_sample(now + 60, 3000)
+
+    assert model.energy_saved_wh > 0
+    assert model.as_dict()["energy_saved_wh"] == pytest.approx(model.energy_saved_wh, abs=0.1)
+
+
+def test_decisions_counted_once_per_dip(model):
+    """Repeated evaluations within one dip count a decision once."""
+    now = _feed(model, [3000, 1200, 3200, 900, 3100, 1000, 3000, 400])
+    for i in range(3):
+        model.choose(now + i * 30, 400, 2223, 2223, at_lowest=True)
+
+    assert sum(model.decisions.values()) == 1
+
+
+def test_measured_wake_time(model):
+    """The wake time is measured once hashrate reaches the expected level."""
+    model.wake_started(0)
+    model.observe_hashrate(60, 10.0, 100.0)
+    model.observe_hashrate(120, 95.0, 100.0)
+
+    assert model.wake_seconds == 120
+
+
+def test_observed_dips_drive_estimate(model):
+    """Completed dips set the expected dip length."""
+    _feed(model, [3000, 3000, 400, 400, 3000])  # one 60 s dip
+    now = _feed(model, [3000, 400], start=300)
+
+    assert model.expected_dip_seconds(now) == pytest.approx(30)
@@ -0,0 +1,124 @@
+"""Tests for the LuxOS subnet scan."""
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner import discovery
+from custom_components.pv_miner.config_flow import PVMinerConfigFlow
+from custom_components.pv_miner.discovery import (
+    DiscoveredMiner,
+    async_probe_host,
+    async_scan_network,
+    scan_hosts,
+)
+
+VERSION = {
+    "STATUS": [{"STATUS": "S", "Msg": "LUXminer"}],
+    "VERSION": [{"LUXminer": "2025.10.15", "API": "3.7", "Type": "Antminer S21+"}],
+}
+
+
+async def _serve(reply: bytes):
+    """Start a TCP server answering every request with ``reply``."""
+    async def _handle(reader, writer):
+        await reader.read(1024)
+        writer.write(reply)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_scan_hosts_skips_configured():
+    """Network and broadcast addresses and configured hosts are not probed."""
+    hosts = scan_hosts("192.168.1.0/24", exclude=["192.168.1.210"])
+    assert len(hosts) == 253
+    assert "192.168.1.210" not in hosts
+    assert hosts[0] == "192.168.1.1"
+
+
+def test_scan_hosts_rejects_large_or_invalid_networks():
+    """Networks beyond a /22 or malformed ones are refused."""
+    with pytest.raises(ValueError):
+        scan_hosts("10.0.0.0/16")
+    with pytest.raises(ValueError):
+        scan_hosts("192.168.1.300/24")
+
+
+@pytest.mark.asyncio
+async def test_probe_fingerprints_luxos():
+    """A LuxOS version reply identifies the miner."""
+    server, port = await _serve(json.dumps(VERSION).encode() + b"\x00")
+    async with server:
+        miner = await async_probe_host("127.0.0.1", port)
+
+    assert miner.firmware == "2025.10.15"
+    assert miner.model == "Antminer S21+"
+
+
+@pytest.mark.asyncio
+async def test_probe_ignores_other_cgminer_hosts():
+    """A cgminer API without LUXminer in its version is not offered."""
+    stock = {"STATUS": [{"STATUS": "S"}], "VERSION": [{"CGMiner": "4.11.1", "Type": "Antminer S19"}]}
+    server, port = await _serve(json.dumps(stock).encode() + b"\x00")
+    async with server:
+        assert await async_probe_host("127.0.0.1", port) is None
+
+
+@pytest.mark.asyncio
+async def test_probe_closed_port():
+    """A host without the API port is skipped quickly."""
+    server, port = await _serve(b"")
+    server.close()
+    await server.wait_closed()
+    assert await async_probe_host("127.0.0.1", port) is None
+
+
+@pytest.mark.asyncio
+async def test_scan_is_concurrent_under_cap():
+    """Hosts are probed in parallel, never more than the cap at once."""
+    running = 0
+    peak = 0
+
+    async def _probe(host, port):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if host.endswith(".210"):
+            return DiscoveredMiner(host, "2025.10.15", "Antminer S21+", None)
+        return None
+
+    with patch.object(discovery, "async_probe_host", _probe):
+        found = await async_scan_network("192.168.1.0/24", concurrency=16)
+
+    assert peak == 16
+    assert [miner.host for miner in found] == ["192.168.1.210"]
+    assert found[0].name == "Antminer S21+ 192.168.1.210"
+
+
+@pytest.mark.asyncio
+async def test_flow_offers_unconfigured_miners():
+    """The discovery step scans without configured hosts and lists the rest."""
+    flow = PVMinerConfigFlow()
+    flow.hass = MagicMock()
+    flow._async_current_entries = MagicMock(return_value=[MagicMock(data={"host": "192.168.1.210"})])
+    found = [DiscoveredMiner("192.168.1.211", "2025.10.15", "Antminer S19j Pro", "s19jpro.local")]
+
+    with patch("custom_components.pv_miner.config_flow.async_scan_network", return_value=found) as scan:
+        result = await flow.async_step_discovery(
+            {"network": "192.168.1.0/24", "username": "root", "password": "root"}
+        )
+
+    assert scan.call_args.kwargs["exclude"] == {"192.168.1.210"}
+    assert result["step_id"] == "select"
+    assert result["description_placeholders"] == {"count": "1"}
+
+    with patch("custom_components.pv_miner.config_flow.async_validate_miners", return_value=[]) as validate:
+        result = await flow.async_step_select({"hosts": ["192.168.1.211"]})
+    assert result["step_id"] == "validate"
+    assert validate.call_args.args[1] == [{"host": "192.168.1.211", "name": "s19jpro"}]
@@ -0,0 +1,105 @@
+"""Tests for the forecast-aware profile planner."""
+import json
+
+import pytest
+
+from custom_components.pv_miner.forecast_planner import (
+    ForecastPlanner,
+    forecast_at,
+    load_forecast_file,
+    parse_forecast,
+)
+from custom_components.pv_miner.solar_policy import SLEEP_PROFILE
+
+SLOT = 900
+NOW = 1_717_236_000  # 2024-06-01T10:00:00Z
+
+
+def _forecast(*watts):
+    """Build a forecast that is flat within each planner slot."""
+    points = []
+    for i, w in enumerate(watts):
+        points += [(NOW + i * SLOT, float(w)), (NOW + (i + 1) * SLOT - 1, float(w))]
+    return points
+
+
+@pytest.fixture
+def planner():
+    """Create a planner with 15 minute slots over two hours."""
+    return ForecastPlanner(horizon_hours=2, slot_minutes=15)
+
+
+def test_parse_solcast_attributes():
+    """Solcast detailedForecast in kW is converted to W."""
+    points = parse_forecast({
+        "detailedForecast": [
+            {"period_start": "2024-06-01T10:30:00+00:00", "pv_estimate": 2.5},
+            {"period_start": "2024-06-01T10:00:00+00:00", "pv_estimate": 3.0},
+        ]
+    })
+
+    assert [w for _, w in points] == [3000, 2500]
+
+
+def test_parse_forecast_solar_watts():
+    """Forecast.Solar style watts mappings are parsed."""
+    points = parse_forecast({"watts": {"2024-06-01T10:00:00Z": 1200, "2024-06-01T11:00:00Z": 1800}})
+
+    assert forecast_at(points, points[0][0] + 1800) == pytest.approx(1500)
+
+
+def test_load_forecast_file(tmp_path):
+    """A local JSON file can replace the forecast entity."""
+    path = tmp_path / "forecast.json"
+    path.write_text(json.dumps([{"time": NOW, "watts": 4000}, {"time": NOW + 3600, "watts": 4000}]))
+
+    assert load_forecast_file(str(path)) == [(NOW, 4000.0), (NOW + 3600, 4000.0)]
+
+
+def test_full_sun_plans_max_profile(planner):
+    """Plenty of forecast power plans the highest profile throughout."""
+    schedule = planner.plan(_forecast(*[5000] * 8), NOW)
+
+    assert len(schedule) == 8
+    assert {slot.profile for slot in schedule} == {"685MHz"}
+
+
+def test_night_plans_sleep(planner):
+    """No forecast power plans sleep."""
+    schedule = planner.plan(_forecast(*[0] * 8), NOW)
+
+    assert {slot.profile for slot in schedule} == {SLEEP_PROFILE}
+
+
+def test_short_dip_rides_instead_of_sleeping(planner):
+    """A short cloud dip is ridden at a lower profile rather than a sleep/wake cycle."""
+    schedule = planner.plan(_forecast(5000, 5000, 5000, 2000, 5000, 5000, 5000, 5000), NOW)
+
+    assert schedule[3].profile not in (SLEEP_PROFILE, "685MHz")
+    assert schedule[4].profile == "685MHz"
+
+
+def test_corrected_power_follows_plan_when_forecast_holds(planner):
+    """When the meter agrees with the forecast the planned budget is used."""
+    planner.plan(_forecast(5000, 5000, 5000, 2000, 5000, 5000, 5000, 5000), NOW)
+    timestamp = NOW + 3 * SLOT + SLOT / 2
+    expected = forecast_at(planner.forecast, timestamp)
+    slot = planner.slot_at(timestamp)
+
+    assert planner.corrected_power(expected, timestamp) == pytest.approx(slot.planned_watts)
+    assert planner.policy.decide(slot.planned_watts, None).profile == slot.profile
+
+
+def test_corrected_power_falls_back_to_meter(planner):
+    """A large forecast error hands control back to the measurement."""
+    planner.plan(_forecast(*[5000] * 8), NOW)
+
+    assert planner.corrected_power(300, NOW + 60) == 300
+    # Outside the plan the measurement is used as-is
+    assert planner.corrected_power(1234, NOW - 60) == 1234
+
+
+def test_empty_forecast(planner):
+    """A forecast that does not cover now yields no schedule."""
+    assert planner.plan([], NOW) == []
+    assert planner.slot_at(NOW) is None
@@ -0,0 +1,144 @@
+"""Tests running the LuxOS client against the simulated miner."""
+import time
+
+import pytest
+
+from custom_components.pv_miner.capabilities import async_probe_capabilities
+from custom_components.pv_miner.const import CAP_BATCH, CAP_POWER_TARGET, CAP_PROFILES
+from custom_components.pv_miner.luxos_api import LuxOSAPI, LuxOSAPIError
+from benchmarks.luxos_simulator import LuxOSSimulator, SimulatedMiner
+
+
+def _simulator(**kwargs) -> LuxOSSimulator:
+    """Return a simulated miner on free ports."""
+    return LuxOSSimulator(tcp_port=0, http_port=0, **kwargs)
+
+
+def _client(simulator: LuxOSSimulator) -> LuxOSAPI:
+    """Return a client pointed at the simulator."""
+    api = LuxOSAPI(simulator.host)
+    api.tcp_port = simulator.tcp_port
+    api.http_port = simulator.http_port
+    return api
+
+
+@pytest.mark.asyncio
+async def test_telemetry_follows_state():
+    """Stats, devs and power reflect the mining state."""
+    async with _simulator() as sim:
+        api = _client(sim)
+        stats = await api.get_stats()
+        devs = await api.get_devs()
+        power = await api._execute_command("power")
+        await api.close()
+
+    assert stats["STATS"][1]["GHS 5s"] == pytest.approx(216000)
+    assert [dev["Enabled"] for dev in devs["DEVS"]] == ["Y", "Y", "Y"]
+    assert devs["DEVS"][0]["Profile"] == "default"
+    assert power["POWER"][0]["Watts"] == 3580
+    assert sim.requests["tcp"] == 3
+
+
+@pytest.mark.asyncio
+async def test_curtail_and_profile_share_one_session():
+    """Control commands log on once and change what the miner reports."""
+    async with _simulator() as sim:
+        api = _client(sim)
+        await api.pause_mining()
+        assert (await api._execute_command("power"))["POWER"][0]["Watts"] == 30
+
+        await api.resume_mining()
+        assert await api.wait_for_mining(timeout=1)
+
+        await api.set_profile("310MHz")
+        assert (await api.get_devs())["DEVS"][0]["Profile"] == "310MHz"
+        await api.close()
+
+    assert sim.miner.commands["logon"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_session_is_renewed():
+    """An invalidated session is replaced by a new logon."""
+    async with _simulator() as sim:
+        api = _client(sim)
+        await api.set_profile("-2")
+        sim.miner.session_id = None
+
+        await api.set_profile("+1")
+        await api.close()
+
+    assert sim.miner.profile == "+1"
+    assert sim.miner.commands["logon"] == 2
+
+
+@pytest.mark.asyncio
+async def test_board_change_pauses_atm():
+    """Board changes run inside an ATM pause and are verified via devs."""
+    async with _simulator() as sim:
+        api = _client(sim)
+        result = await api.set_hashboards({1: False}, timeout=1)
+        await api.close()
+
+    assert result["verified"]
+    assert sim.miner.boards_enabled == [True, False, True]
+    assert sim.miner.atm_enabled
+    assert sim.miner.commands["atmset"] == 2
+
+
+@pytest.mark.asyncio
+async def test_capabilities_and_batch():
+    """Probing sees the simulated firmware; batched polls take one round-trip."""
+    async with _simulator(miner=SimulatedMiner(unsupported={"powertargetset"})) as sim:
+        api = _client(sim)
+        api.capabilities = await async_probe_capabilities(api)
+        before = sim.requests["tcp"]
+
+        replies = await api.execute_batch(["stats", "devs", "power"])
+        await api.close()
+
+    assert api.capabilities[CAP_BATCH] and api.capabilities[CAP_PROFILES]
+    assert api.capabilities[CAP_POWER_TARGET] is False
+    assert replies["power"]["POWER"][0]["Watts"] == 3580
+    assert sim.requests["tcp"] - before == 1
+
+
+@pytest.mark.asyncio
+async def test_dropped_tcp_reply_falls_back_to_http():
+    """A dropped TCP connection is retried over HTTP."""
+    async with _simulator() as sim:
+        api = _client(sim)
+        sim.inject("stats", "drop")
+
+        stats = await api.get_stats()
+        await api.close()
+
+    assert stats["STATS"][1]["GHS 5s"] > 0
+    assert sim.requests == {"tcp": 1, "http": 1}
+
+
+@pytest.mark.asyncio
+async def test_injected_faults_surface_as_api_errors():
+    """Error and malformed replies on both transports raise LuxOSAPIError."""
+    async with _simulator() as sim:
+        api = _client(sim)
+        sim.inject("stats", "fail", 2)
+        with pytest.raises(LuxOSAPIError, match="Simulated failure"):
+            await api.get_stats()
+
+        sim.inject("devs", "malformed", 2)
+        with pytest.raises(LuxOSAPIError, match="Invalid JSON"):
+            await api.get_devs()
+        await api.close()
+
+
+@pytest.mark.asyncio
+async def test_latency_is_applied():
+    """Configured latency delays every reply."""
+    async with _simulator(latency=0.1) as sim:
+        api = _client(sim)
+        start = time.monotonic()
+        await api.get_summary()
+        await api.close()
+
+    assert time.monotonic() - start >= 0.1
@@ -0,0 +1,188 @@
+"""Tests for the idempotent command layer."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner import POLL_COMMANDS, PVMinerCoordinator
+from custom_components.pv_miner.luxos_api import LuxOSAPI
+from custom_components.pv_miner.miner_state import WAKE_GRACE_SECONDS, MinerState
+
+OK = {"STATUS": [{"STATUS": "S", "Msg": "ok"}]}
+
+
+def _data(profile="default", ghs=95000.0):
+    return {
+        "stats": {"STATS": [{}, {"GHS 5s": ghs}]},
+        "devs": {"DEVS": [{"Profile": profile}, {"Profile": profile}, {"Profile": profile}]},
+    }
+
+
+@pytest.fixture
+def api():
+    """Create an API client with mocked session commands."""
+    api = LuxOSAPI("192.168.1.210")
+    api._execute_session_command = AsyncMock(return_value=OK)
+    api._execute_curtail_command = AsyncMock(return_value=OK)
+    return api
+
+
+def test_observe_confirms_profile_and_curtail():
+    """Polled data confirms the active profile and mining state."""
+    state = MinerState()
+    state.observe(_data("310MHz"))
+    assert state.profile == "310MHz"
+    assert state.curtailed is False
+
+
+def test_low_hashrate_alone_is_not_sleep():
+    """A miner without hashrate (reboot, board init) has an unknown curtail state."""
+    state = MinerState()
+    state.observe(_data(ghs=0))
+    assert state.curtailed is None
+
+    state.observe(_data())
+    state.observe(_data(ghs=0))
+    assert state.curtailed is None
+
+
+def test_sleep_is_trusted_from_ack_or_curtail_mode():
+    """A sleep acknowledgement or a reported curtail mode confirms sleep."""
+    state = MinerState()
+    state.confirm_curtail(True)
+    state.observe(_data(ghs=0))
+    assert state.curtailed is True
+
+    state = MinerState()
+    data = _data(ghs=0)
+    data["config"] = {"CONFIG": [{"CurtailMode": "Sleep"}]}
+    state.observe(data)
+    assert state.curtailed is True
+
+    data["config"] = {"CONFIG": [{"CurtailMode": "None"}]}
+    state.observe(data)
+    assert state.curtailed is False
+
+
+def test_observe_ignores_mixed_board_profiles():
+    """Boards reporting different profiles leave the profile unknown."""
+    state = MinerState()
+    data = _data()
+    data["devs"]["DEVS"][0]["Profile"] = "460MHz"
+    state.observe(data)
+    assert state.profile is None
+
+
+def test_low_hashrate_during_wakeup_is_not_curtailed():
+    """A miner ramping up after wakeup is not mistaken for sleeping."""
+    state = MinerState()
+    with patch("custom_components.pv_miner.miner_state.time.monotonic", return_value=1000.0):
+        state.confirm_curtail(False)
+        state.observe(_data(ghs=0))
+    assert state.curtailed is False
+
+    with patch(
+        "custom_components.pv_miner.miner_state.time.monotonic",
+        return_value=1001.0 + WAKE_GRACE_SECONDS,
+    ):
+        state.observe(_data(ghs=0))
+    assert state.curtailed is None
+
+
+@pytest.mark.asyncio
+async def test_set_profile_skips_confirmed_profile(api):
+    """Setting the profile the miner already runs sends nothing."""
+    api.state.observe(_data("310MHz"))
+
+    result = await api.set_profile("310MHz")
+
+    api._execute_session_command.assert_not_awaited()
+    assert result["STATUS"][0]["STATUS"] == "S"
+    assert result["skipped"] is True
+    assert api.state.skipped == {"profileset": 1}
+
+
+@pytest.mark.asyncio
+async def test_set_profile_writes_and_confirms_change(api):
+    """A real change is sent once and then counts as confirmed."""
+    api.state.observe(_data("310MHz"))
+
+    await api.set_profile("460MHz")
+    await api.set_profile("460MHz")
+
+    api._execute_session_command.assert_awaited_once_with("profileset", "460MHz")
+    assert api.state.profile == "460MHz"
+    assert api.state.skipped_total == 1
+
+
+@pytest.mark.asyncio
+async def test_force_bypasses_skip(api):
+    """force=True always sends the command."""
+    api.state.observe(_data("310MHz"))
+
+    await api.set_profile("310MHz", force=True)
+
+    api._execute_session_command.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_unknown_state_never_skips(api):
+    """Without confirmed state every write goes to the miner."""
+    await api.set_profile("default")
+    await api.pause_mining()
+
+    assert api._execute_session_command.await_count == 1
+    assert api._execute_curtail_command.await_count == 1
+    assert api.state.skipped_total == 0
+
+
+@pytest.mark.asyncio
+async def test_curtail_skips_repeated_commands(api):
+    """Sleep and wakeup are only sent when they change the state."""
+    api.state.observe(_data(ghs=95000.0))
+
+    await api.resume_mining()
+    await api.pause_mining()
+    await api.pause_mining()
+
+    api._execute_curtail_command.assert_awaited_once_with("sleep")
+    assert api.state.skipped == {"curtail": 2}
+
+
+@pytest.mark.asyncio
+async def test_board_control_keeps_disabled_atm_off(api):
+    """Board control with ATM already off neither pauses nor re-enables it."""
+    api.state.confirm_atm(False)
+    api.wait_for_board_states = AsyncMock(return_value=True)
+
+    await api.disable_hashboard(1)
+
+    api._execute_session_command.assert_awaited_once_with("disableboard", "1")
+    assert api.state.atm_enabled is False
+    assert api.state.skipped == {"atmset": 1}
+
+
+def test_hashrate_during_sleep_is_not_mining():
+    """A miner still ramping down after sleep is not mistaken for mining."""
+    state = MinerState()
+    state.confirm_curtail(True)
+    state.observe(_data(ghs=95000.0))
+    assert state.curtailed is True
+
+
+@pytest.mark.asyncio
+async def test_poll_confirms_sleep_after_restart():
+    """A miner asleep since before a restart is confirmed from the polled config."""
+    api = LuxOSAPI("192.168.1.210")
+    replies = dict(
+        _data(ghs=0),
+        config={"CONFIG": [{"CurtailMode": "Sleep"}]},
+        atm={"ATM": [{"Enabled": False}]},
+    )
+    api._execute_command = AsyncMock(side_effect=lambda command, parameter="": replies.get(command, OK))
+    coordinator = PVMinerCoordinator(MagicMock(), api, 30)
+
+    await coordinator._async_update_data()
+
+    assert {"config", "atm"} <= set(POLL_COMMANDS)
+    assert api.state.curtailed is True
+    assert api.state.atm_enabled is False
@@ -0,0 +1,148 @@
+"""Tests for the closed-loop power limit."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner.miner_state import MinerState
+from custom_components.pv_miner.power_limit import (
+    SETTLE_INITIAL_DELAY,
+    async_set_power_limit,
+    async_settled_power,
+)
+from custom_components.pv_miner.profile_catalog import ProfileCatalog
+
+DETAILS = {
+    "-4": {"frequency": 425, "watts": 2300, "hashrate": 84.5},
+    "-2": {"frequency": 475, "watts": 2650, "hashrate": 94.0},
+    "default": {"frequency": 525, "watts": 3050, "hashrate": 104.0},
+    "+1": {"frequency": 550, "watts": 3300, "hashrate": 108.0},
+}
+
+
+class _Coordinator:
+    """Coordinator whose measured power follows a scripted sequence."""
+
+    def __init__(self, readings):
+        self.thermal_governor = None
+        self._readings = iter(readings)
+        self.power_watts = None
+
+    async def async_refresh(self):
+        self.power_watts = next(self._readings)
+
+
+def _entry_data(readings):
+    return {
+        "api": AsyncMock(capabilities={}),
+        "coordinator": _Coordinator(readings),
+        "profile_catalog": ProfileCatalog.from_details(DETAILS),
+    }
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    """Skip the settling delays."""
+    with patch("custom_components.pv_miner.power_limit.asyncio.sleep", AsyncMock()):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_settled_power_waits_for_stable_readings():
+    """Power counts as settled once two readings agree."""
+    coordinator = _Coordinator([2000, 2600, 2640, 2645])
+
+    assert await async_settled_power(coordinator) == 2640
+
+
+@pytest.mark.asyncio
+async def test_settled_power_waits_out_the_retune():
+    """No reading is taken before the minimum wait, e.g. a profile retune."""
+    coordinator = _Coordinator([2640, 2645])
+    with patch("custom_components.pv_miner.power_limit.asyncio.sleep", AsyncMock()) as sleep:
+        assert await async_settled_power(coordinator, timeout=60, min_wait=90) == 2645
+
+    assert sleep.await_args_list[0].args[0] == pytest.approx(90, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_power_limit_entity_verifies_in_entry_task():
+    """The verification runs as a config entry background task."""
+    from custom_components.pv_miner.number import PVMinerPowerLimit
+
+    entity = PVMinerPowerLimit(MagicMock(), AsyncMock(), "entry", "Miner")
+    entity.hass = MagicMock()
+    entity.platform = MagicMock()
+    entity.async_write_ha_state = MagicMock()
+
+    await entity.async_set_native_value(3000)
+
+    entity.platform.config_entry.async_create_background_task.assert_called_once()
+    entity.hass.async_create_task.assert_not_called()
+    entity.platform.config_entry.async_create_background_task.call_args.args[1].close()
+
+
+@pytest.mark.asyncio
+async def test_limit_within_target():
+    """A profile that stays under the limit is reported without refinement."""
+    entry_data = _entry_data([2900, 2980, 2990])
+
+    report = await async_set_power_limit(entry_data, 3100)
+
+    entry_data["api"].set_profile.assert_awaited_once_with("default")
+    assert report["profile"] == "default"
+    assert report["power"] == 2990
+    assert report["within_limit"] is True
+    assert report["refined"] is False
+    assert report["deviation_watts"] == 2990 - 3100
+
+
+@pytest.mark.asyncio
+async def test_active_profile_skips_the_retune_wait():
+    """A limit the running profile already meets is read back without a retune wait."""
+    entry_data = _entry_data([2980, 2990])
+    entry_data["api"].state = MinerState()
+    entry_data["api"].state.confirm_profile("default")
+
+    with patch("custom_components.pv_miner.power_limit.asyncio.sleep", AsyncMock()) as sleep:
+        report = await async_set_power_limit(entry_data, 3100)
+
+    assert sleep.await_args_list[0].args[0] == SETTLE_INITIAL_DELAY
+    assert report["power"] == 2990
+
+
+@pytest.mark.asyncio
+async def test_overshoot_steps_down_one_profile():
+    """A miner drawing more than rated is moved one profile down."""
+    entry_data = _entry_data([3250, 3260, 2800, 2810])
+
+    report = await async_set_power_limit(entry_data, 3100)
+
+    assert [call.args[0] for call in entry_data["api"].set_profile.await_args_list] == ["default", "-2"]
+    assert report["profile"] == "-2"
+    assert report["power"] == 2810
+    assert report["refined"] is True
+    assert report["within_limit"] is True
+
+
+@pytest.mark.asyncio
+async def test_limit_below_all_profiles_uses_lowest():
+    """A limit below every profile selects the lowest and reports the overshoot."""
+    entry_data = _entry_data([2300, 2310])
+
+    report = await async_set_power_limit(entry_data, 1500)
+
+    entry_data["api"].set_profile.assert_awaited_once_with("-4")
+    assert report["within_limit"] is False
+    assert report["refined"] is False
+
+
+@pytest.mark.asyncio
+async def test_missing_power_reading_is_reported():
+    """Without a power reading the limit is applied but not verified."""
+    entry_data = _entry_data([None])
+
+    report = await async_set_power_limit(entry_data, 3100)
+
+    assert report["power"] is None
+    assert report["within_limit"] is False
@@ -0,0 +1,103 @@
+"""Tests for the per-miner profile catalog."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.pv_miner.profile_catalog import ProfileCatalog
+from custom_components.pv_miner.services import _set_power_limit, _set_power_profile
+from custom_components.pv_miner.solar_policy import SolarPolicy
+
+# S19j Pro style profile details as returned by get_all_profiles_with_details
+DETAILS = {
+    "default": {"frequency": 525, "watts": 3050, "hashrate": 104.0, "step": "0", "voltage": 13.6},
+    "-2": {"frequency": 475, "watts": 2650, "hashrate": 94.0, "step": "-2", "voltage": 13.4},
+    "-4": {"frequency": 425, "watts": 2300, "hashrate": 84.5, "step": "-4", "voltage": 13.2},
+    "+1": {"frequency": 550, "watts": 3300, "hashrate": 108.0, "step": "1", "voltage": 13.8},
+    "broken": {"frequency": 0, "watts": 0, "hashrate": 0, "step": "0", "voltage": 0},
+}
+
+
+@pytest.fixture
+def catalog():
+    """Create a catalog from profile details."""
+    return ProfileCatalog.from_details(DETAILS)
+
+
+def test_ordered_by_watts(catalog):
+    """Profiles are ordered by power draw and entries without power are dropped."""
+    assert catalog.names == ["-4", "-2", "default", "+1"]
+    assert "broken" not in catalog
+    assert catalog.lowest.name == "-4"
+    assert catalog.highest.name == "+1"
+
+
+def test_for_budget(catalog):
+    """The highest profile fitting the budget is chosen."""
+    assert catalog.for_budget(3100).name == "default"
+    assert catalog.for_budget(3050).name == "default"
+    assert catalog.for_budget(10000).name == "+1"
+    assert catalog.for_budget(2000) is None
+
+
+def test_for_hashrate(catalog):
+    """The cheapest profile reaching the target hashrate is chosen."""
+    assert catalog.for_hashrate(90).name == "-2"
+    assert catalog.for_hashrate(105).name == "+1"
+    assert catalog.for_hashrate(200) is None
+
+
+def test_most_efficient_under_cap(catalog):
+    """The best J/TH profile within the power cap is chosen."""
+    assert catalog.most_efficient(2700).name == "-4"
+    assert catalog.most_efficient(1000) is None
+
+
+def test_steps(catalog):
+    """Neighbouring profiles can be walked by power."""
+    assert catalog.step_down("default").name == "-2"
+    assert catalog.step_up("default").name == "+1"
+    assert catalog.step_up("+1") is None
+
+
+def test_policy_map_uses_miner_profiles(catalog):
+    """The solar policy is driven by the miner's own profiles."""
+    policy = SolarPolicy(catalog.policy_map())
+
+    assert policy.profile_for_power(600) == "-4"
+    assert policy.profile_for_power(2700) == "-2"
+    assert policy.profile_for_power(5000) == "+1"
+
+
+def _entry_data(catalog):
+    api = AsyncMock(capabilities={})
+    return {
+        "api": api,
+        "coordinator": SimpleNamespace(
+            thermal_governor=None, async_refresh=AsyncMock(), power_watts=None
+        ),
+        "profile_catalog": catalog,
+    }
+
+
+@pytest.mark.asyncio
+async def test_set_power_limit_uses_catalog(catalog):
+    """A power limit maps to the best fitting profile instead of a frequency guess."""
+    entry_data = _entry_data(catalog)
+
+    with patch("custom_components.pv_miner.power_limit.asyncio.sleep", AsyncMock()):
+        await _set_power_limit(entry_data, 2800)
+
+    entry_data["api"].set_profile.assert_awaited_once_with("-2")
+
+
+@pytest.mark.asyncio
+async def test_unknown_profile_is_rejected(catalog):
+    """Profiles the miner does not have are never sent."""
+    entry_data = _entry_data(catalog)
+
+    with pytest.raises(HomeAssistantError):
+        await _set_power_profile(entry_data, "585MHz")
+
+    entry_data["api"].set_profile.assert_not_awaited()
@@ -0,0 +1,60 @@
+"""Tests for profile discovery in the LuxOS API client."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.pv_miner import luxos_api
+from custom_components.pv_miner.luxos_api import LuxOSAPI, LuxOSAPIError
+
+PROFILES = {
+    "STATUS": [{"STATUS": "S"}],
+    "PROFILES": [
+        {"Profile Name": "default", "Frequency": 525, "Watts": 3050, "Hashrate": 104.0, "Voltage": 13.6, "Step": "0"},
+        {"Profile Name": "-2", "Frequency": 475, "Watts": 2650, "Hashrate": 94.0, "Voltage": 13.4, "Step": "-2"},
+    ],
+}
+
+
+@pytest.mark.asyncio
+async def test_names_and_details_from_one_call():
+    """Names and details come from a single profiles command."""
+    api = LuxOSAPI("192.168.1.210")
+    api._execute_command = AsyncMock(return_value=PROFILES)
+
+    catalog = await api.discover_profiles()
+
+    api._execute_command.assert_awaited_once_with("profiles", "")
+    assert catalog.names == ["-2", "default"]
+    assert catalog.get("default").watts == 3050
+    assert catalog.get("-2").step == "-2"
+
+
+@pytest.mark.asyncio
+async def test_fallback_probes_run_concurrently_under_cap(monkeypatch):
+    """Without a profiles command the known profiles are probed in parallel."""
+    names = [f"p{i}" for i in range(10)]
+    monkeypatch.setattr(luxos_api, "FALLBACK_PROFILES", tuple(names))
+    running = 0
+    peak = 0
+
+    async def _command(command, parameter=""):
+        nonlocal running, peak
+        if command == "profiles":
+            raise LuxOSAPIError("Invalid command")
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if parameter == "p3":
+            return {"STATUS": [{"STATUS": "E", "Msg": "Unknown profile"}]}
+        return {"PROFILE": [{"Frequency": 500, "Watts": 2000 + int(parameter[1:]), "Hashrate": 90.0}]}
+
+    api = LuxOSAPI("192.168.1.210")
+    api._execute_command = _command
+
+    catalog = await api.discover_profiles()
+
+    assert peak == luxos_api.PROFILE_PROBE_CONCURRENCY
+    assert len(catalog) == 9
+    assert "p3" not in catalog
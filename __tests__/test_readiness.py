@@ -0,0 +1,54 @@
+"""Tests for readiness polling in the LuxOS API."""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.pv_miner.luxos_api import LuxOSAPI, LuxOSAPIError
+
+
+def _summary(mhs):
+    return {"SUMMARY": [{"MHS 5s": mhs}]}
+
+
+@pytest.fixture
+def api():
+    """Create an API client without network access."""
+    return LuxOSAPI("192.168.1.210")
+
+
+@pytest.mark.asyncio
+async def test_wait_for_mining_returns_when_hashing(api):
+    """Polling stops as soon as the miner reports hashrate."""
+    api._execute_command = AsyncMock(side_effect=[_summary(0), _summary(0), _summary(95e6)])
+    sleep = AsyncMock()
+
+    with patch("custom_components.pv_miner.luxos_api.asyncio.sleep", sleep):
+        assert await api.wait_for_mining(timeout=30)
+
+    assert api._execute_command.await_count == 3
+    # Exponential backoff between polls
+    assert [call.args[0] for call in sleep.await_args_list] == [0.25, 0.5]
+    assert "wake" in api.readiness_latency
+
+
+@pytest.mark.asyncio
+async def test_wait_tolerates_errors_until_deadline(api):
+    """A miner that never answers times out instead of raising."""
+    api._execute_command = AsyncMock(side_effect=LuxOSAPIError("connection refused"))
+
+    assert not await api.wait_for_mining(timeout=0.01)
+    assert "wake" not in api.readiness_latency
+
+
+@pytest.mark.asyncio
+async def test_wait_for_board_state(api):
+    """Board verification polls devs until the Enabled flag matches."""
+    api._execute_command = AsyncMock(side_effect=[
+        {"DEVS": [{"Enabled": "Y"}, {"Enabled": "Y"}]},
+        {"DEVS": [{"Enabled": "Y"}, {"Enabled": "N"}]},
+    ])
+
+    with patch("custom_components.pv_miner.luxos_api.asyncio.sleep", AsyncMock()):
+        assert await api.wait_for_board_state(1, enabled=False, timeout=30)
+
+    assert "disableboard" in api.readiness_latency
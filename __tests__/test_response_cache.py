@@ -0,0 +1,79 @@
+"""Tests for the LuxOS response cache."""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.pv_miner.luxos_api import LuxOSAPI
+from custom_components.pv_miner.response_cache import CACHE_TTLS, ResponseCache
+
+OK = {"STATUS": [{"STATUS": "S", "Msg": "ok"}]}
+POOLS = {"STATUS": [{"STATUS": "S"}], "POOLS": [{"POOL": 0, "URL": "stratum+tcp://pool:3333"}]}
+
+
+@pytest.fixture
+def api():
+    """Create an API client answering every command with a fixed reply."""
+    api = LuxOSAPI("192.168.1.210")
+    api._tcp_command = AsyncMock(return_value=POOLS)
+    return api
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_until_ttl_expires(api):
+    """A cached read is not sent again before its TTL passes."""
+    with patch("custom_components.pv_miner.response_cache.time.monotonic", return_value=100.0):
+        await api.get_pools()
+        await api.get_pools()
+    assert api._tcp_command.await_count == 1
+    assert api.cache.hit_ratio == 0.5
+
+    with patch(
+        "custom_components.pv_miner.response_cache.time.monotonic",
+        return_value=101.0 + CACHE_TTLS["pools"],
+    ):
+        await api.get_pools()
+    assert api._tcp_command.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_related_write_invalidates(api):
+    """switchpool drops the cached pools; unrelated writes do not."""
+    await api.get_pools()
+    await api.set_frequency(0)
+    await api.get_pools()
+    assert api._tcp_command.await_count == 2
+
+    await api.switch_pool(1)
+    await api.get_pools()
+    assert api._tcp_command.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_batch_skips_cached_commands(api):
+    """Telemetry is always polled while cached commands are served locally."""
+    api._tcp_command.return_value = OK
+    await api.execute_batch(["stats", "pools"])
+    await api.execute_batch(["stats", "pools"])
+
+    sent = [call.args[0] for call in api._tcp_command.await_args_list]
+    assert sent == ["stats", "pools", "stats"]
+    assert api.cache.as_dict() == {"cache_hits": 1, "cache_misses": 1, "cache_hit_ratio": 0.5}
+
+
+def test_error_replies_are_not_cached():
+    """A failed read is fetched again next time."""
+    cache = ResponseCache()
+    cache.put("config", "", {"STATUS": [{"STATUS": "E", "Msg": "busy"}]})
+    assert cache.get("config") is None
+
+
+@pytest.mark.asyncio
+async def test_curtail_invalidates_config(api):
+    """Sleep and wakeup drop the cached config with its curtail mode."""
+    api._tcp_command.return_value = OK
+    await api.execute_batch(["config"])
+    await api._execute_command("curtail", "abc,sleep")
+    await api.execute_batch(["config"])
+
+    sent = [call.args[0] for call in api._tcp_command.await_args_list]
+    assert sent == ["config", "curtail", "config"]
@@ -0,0 +1,98 @@
+"""Tests for the staged fleet rollout."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner.const import DOMAIN
+from custom_components.pv_miner.miner_state import MinerState
+from custom_components.pv_miner.profile_catalog import CatalogProfile, ProfileCatalog
+from custom_components.pv_miner.rollout import plan_batches
+from custom_components.pv_miner.services import _async_staged_rollout, _wake_miner
+
+CATALOG = ProfileCatalog([
+    CatalogProfile("low", 300, 2200, 50.0, "-8", 0),
+    CatalogProfile("max", 685, 3600, 125.0, "1", 0),
+])
+
+
+def test_batches_by_count():
+    """Batch size limits the miners per batch."""
+    steps = [(f"m{i}", 3000) for i in range(5)]
+
+    assert plan_batches(steps, batch_size=2) == [["m0", "m1"], ["m2", "m3"], ["m4"]]
+
+
+def test_batches_by_ramp():
+    """The summed power increase per batch stays within the ramp limit."""
+    steps = [("a", 3000), ("b", 3000), ("c", -500), ("d", 3000)]
+
+    assert plan_batches(steps, max_ramp_watts=6500) == [["a", "b", "c"], ["d"]]
+
+
+def test_oversized_step_gets_own_batch():
+    """A single miner above the ramp limit is still rolled out."""
+    assert plan_batches([("a", 9000), ("b", 100)], max_ramp_watts=5000) == [["a"], ["b"]]
+
+
+class _Coordinator:
+    """Coordinator stand-in whose power follows the miner's wake state."""
+
+    def __init__(self, api, fail=False):
+        self.api = api
+        self.fail = fail
+        self.power_watts = 30
+        self.thermal_governor = None
+
+    async def async_refresh(self):
+        if self.api.resume_mining.await_count and not self.fail:
+            self.power_watts = 3500
+
+    async def async_request_refresh(self):
+        pass
+
+
+def _fleet(count, failing=()):
+    hass = MagicMock()
+    hass.data = {DOMAIN: {}}
+    for i in range(count):
+        api = AsyncMock()
+        api.state = MinerState()
+        api.execute_batch.return_value = {}
+        hass.data[DOMAIN][f"entry{i}"] = {
+            "api": api,
+            "coordinator": _Coordinator(api, fail=i in failing),
+            "config": {"name": f"Miner {i}"},
+            "profile_catalog": CATALOG,
+        }
+    return hass
+
+
+@pytest.mark.asyncio
+async def test_wake_rollout_verifies_each_batch():
+    """Each batch ramps up before the next one is woken."""
+    hass = _fleet(4)
+    rollout = {"batch_size": 2, "batch_delay": 0, "max_ramp_watts": None, "abort_on_failure": True}
+
+    with patch("custom_components.pv_miner.rollout.asyncio.sleep", AsyncMock()):
+        results = await _async_staged_rollout(hass, list(hass.data[DOMAIN]), _wake_miner, rollout)
+
+    assert all(result["success"] for result in results.values())
+    assert results["entry3"]["power"] == 3500
+
+
+@pytest.mark.asyncio
+async def test_rollout_aborts_when_power_does_not_ramp():
+    """A miner that never ramps up stops the rollout."""
+    hass = _fleet(4, failing={1})
+    rollout = {"batch_size": 2, "batch_delay": 0, "max_ramp_watts": None, "abort_on_failure": True}
+
+    # Every clock reading jumps past the verify timeout
+    with patch("custom_components.pv_miner.rollout.asyncio.sleep", AsyncMock()), patch(
+        "custom_components.pv_miner.rollout.time.monotonic", side_effect=range(0, 10000, 400)
+    ):
+        results = await _async_staged_rollout(hass, list(hass.data[DOMAIN]), _wake_miner, rollout)
+
+    assert not results["entry1"]["success"]
+    assert results["entry2"]["error"] == "rollout aborted"
+    hass.data[DOMAIN]["entry2"]["api"].resume_mining.assert_not_awaited()
@@ -0,0 +1,249 @@
+"""Tests for service routing and fleet fan-out."""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner.const import DOMAIN
+from custom_components.pv_miner.luxos_api import LuxOSAPI, LuxOSAPIError
+from custom_components.pv_miner.miner_state import MinerState
+from custom_components.pv_miner.profile_catalog import CatalogProfile, ProfileCatalog
+from custom_components.pv_miner.services import (
+    EntityEntryIndex,
+    _async_fan_out,
+    _emergency_stop,
+    _service_response,
+    _set_power_profile,
+    _sleep_miner,
+)
+
+
+def _registry_entry(entity_id, entry_id, platform=DOMAIN, device_id=None):
+    return SimpleNamespace(
+        entity_id=entity_id,
+        config_entry_id=entry_id,
+        platform=platform,
+        device_id=device_id,
+    )
+
+
+class _EntityRegistry:
+    def __init__(self, entries):
+        self.entities = {entry.entity_id: entry for entry in entries}
+
+    def async_get(self, entity_id):
+        return self.entities.get(entity_id)
+
+
+def _fleet(count, delay=0.0):
+    """Create hass with ``count`` miners and their switch entities."""
+    hass = MagicMock()
+    hass.data = {DOMAIN: {}}
+    entries = []
+    for i in range(count):
+        api = AsyncMock()
+
+        async def _pause(force=False, delay=delay):
+            await asyncio.sleep(delay)
+
+        api.pause_mining.side_effect = _pause
+        api.execute_batch.return_value = {}
+        api.state = MinerState()
+        hass.data[DOMAIN][f"entry{i}"] = {
+            "api": api,
+            "coordinator": AsyncMock(power_watts=None),
+            "config": {"name": f"Miner {i}"},
+        }
+        entries.append(_registry_entry(f"switch.miner_{i}", f"entry{i}"))
+    entries.append(_registry_entry("switch.other", "foreign", platform="other"))
+    return hass, _EntityRegistry(entries)
+
+
+@pytest.fixture
+def patched_registry():
+    """Patch the registries used by the entity index."""
+    with patch("custom_components.pv_miner.services.er.async_get") as entity_registry, patch(
+        "custom_components.pv_miner.services.dr.async_get"
+    ):
+        yield entity_registry
+
+
+def test_index_resolves_entities_to_entries(patched_registry):
+    """Entities are routed to the config entry that owns them."""
+    hass, registry = _fleet(3)
+    patched_registry.return_value = registry
+    index = EntityEntryIndex(hass)
+
+    assert index.resolve("switch.miner_2") == "entry2"
+    assert index.resolve("switch.other") is None
+    assert index.resolve("switch.unknown") is None
+
+
+def test_index_follows_registry_events(patched_registry):
+    """Renames and removals are applied without a rebuild."""
+    hass, registry = _fleet(1)
+    patched_registry.return_value = registry
+    index = EntityEntryIndex(hass)
+    index.resolve("switch.miner_0")
+
+    registry.entities["switch.renamed"] = _registry_entry("switch.renamed", "entry0")
+    del registry.entities["switch.miner_0"]
+    index._async_entity_updated(SimpleNamespace(data={
+        "action": "update", "entity_id": "switch.renamed", "old_entity_id": "switch.miner_0",
+    }))
+
+    assert index.resolve("switch.renamed") == "entry0"
+    assert index.resolve("switch.miner_0") is None
+
+
+@pytest.mark.asyncio
+async def test_fan_out_runs_miners_concurrently(patched_registry):
+    """An emergency stop across 20 miners takes about one round-trip."""
+    hass, registry = _fleet(20, delay=0.1)
+    patched_registry.return_value = registry
+    index = EntityEntryIndex(hass)
+
+    start = time.monotonic()
+    results = await _async_fan_out(
+        hass, index, [f"switch.miner_{i}" for i in range(20)], _emergency_stop
+    )
+
+    assert time.monotonic() - start < 0.5
+    assert len(results) == 20
+    assert all(result["success"] for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_fan_out_collects_failures(patched_registry):
+    """A failing miner is reported without affecting the others."""
+    hass, registry = _fleet(2)
+    patched_registry.return_value = registry
+    hass.data[DOMAIN]["entry1"]["api"].pause_mining.side_effect = LuxOSAPIError("timeout")
+    index = EntityEntryIndex(hass)
+
+    results = await _async_fan_out(
+        hass, index, ["switch.miner_0", "switch.miner_1", "switch.miner_1"], _emergency_stop
+    )
+
+    assert results["entry0"]["success"]
+    assert results["entry1"]["miner"] == "Miner 1"
+    assert results["entry1"]["success"] is False
+    assert results["entry1"]["error"] == "timeout"
+    assert results["entry1"]["entity_ids"] == ["switch.miner_1", "switch.miner_1"]
+    hass.data[DOMAIN]["entry1"]["api"].pause_mining.assert_awaited_once_with(force=True)
+
+
+@pytest.mark.asyncio
+async def test_results_report_status_retries_and_state(patched_registry):
+    """Each miner reports the LuxOS message, retries, latency and verified state."""
+    hass, registry = _fleet(1)
+    patched_registry.return_value = registry
+    api = LuxOSAPI("192.168.1.210")
+    api._luxos_session_id = "abc"
+    api._execute_command = AsyncMock(side_effect=[
+        {"STATUS": [{"STATUS": "E", "Msg": "Invalid session_id"}]},
+        {"SESSION": [{"SessionID": "def"}]},
+        {"STATUS": [{"STATUS": "S", "Msg": "Curtail sleep"}]},
+        # Read back after the call
+        {"DEVS": [{"Profile": "default"}]},
+        {"CONFIG": [{"CurtailMode": "Sleep"}]},
+        {"STATUS": [{"STATUS": "S"}]},
+    ])
+    hass.data[DOMAIN]["entry0"]["api"] = api
+    index = EntityEntryIndex(hass)
+
+    response = _service_response(
+        await _async_fan_out(hass, index, ["switch.miner_0"], _sleep_miner)
+    )
+
+    assert response["success"]
+    result = response["miners"]["entry0"]
+    assert result["message"] == "Curtail sleep"
+    assert result["retries"] == 1
+    assert result["latency_ms"] >= 0
+    assert result["verified"] == {"profile": "default", "curtailed": True}
+    coordinator = hass.data[DOMAIN]["entry0"]["coordinator"]
+    coordinator.async_request_refresh.assert_awaited_once()
+    coordinator.async_refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_skipped_write_is_reported(patched_registry):
+    """A no-op write reports the skip instead of a miner round-trip."""
+    hass, registry = _fleet(1)
+    patched_registry.return_value = registry
+    api = LuxOSAPI("192.168.1.210")
+    api._execute_session_command = AsyncMock()
+    api.state.confirm_profile("default")
+    hass.data[DOMAIN]["entry0"]["api"] = api
+    hass.data[DOMAIN]["entry0"]["coordinator"].thermal_governor = None
+    hass.data[DOMAIN]["entry0"]["profile_catalog"] = ProfileCatalog(
+        [CatalogProfile("default", 595, 3250, 110.0, "0", 0)]
+    )
+    index = EntityEntryIndex(hass)
+
+    results = await _async_fan_out(
+        hass, index, ["switch.miner_0"], _set_power_profile, profile="default"
+    )
+
+    api._execute_session_command.assert_not_awaited()
+    assert results["entry0"]["success"]
+    assert results["entry0"]["message"].startswith("Skipped")
+
+
+@pytest.mark.asyncio
+async def test_user_commands_reach_a_sleeping_miner(patched_registry):
+    """Sleep and emergency stop are sent even if the miner is believed asleep."""
+    hass, registry = _fleet(1)
+    patched_registry.return_value = registry
+    api = LuxOSAPI("192.168.1.210")
+    api._execute_curtail_command = AsyncMock(return_value={"STATUS": [{"STATUS": "S"}]})
+    api.state.confirm_curtail(True)
+    hass.data[DOMAIN]["entry0"]["api"] = api
+    index = EntityEntryIndex(hass)
+
+    await _async_fan_out(hass, index, ["switch.miner_0"], _sleep_miner)
+    await _async_fan_out(hass, index, ["switch.miner_0"], _emergency_stop)
+
+    assert api._execute_curtail_command.await_count == 2
+    assert api.state.skipped_total == 0
+
+
+@pytest.mark.asyncio
+async def test_unresolved_entities_fail_the_response(patched_registry):
+    """Entities that belong to no miner are reported as failed results."""
+    hass, registry = _fleet(1)
+    patched_registry.return_value = registry
+    index = EntityEntryIndex(hass)
+
+    response = _service_response(
+        await _async_fan_out(hass, index, ["switch.miner_0", "switch.other"], _emergency_stop)
+    )
+
+    assert response["success"] is False
+    assert response["miners"]["entry0"]["success"]
+    assert response["miners"]["switch.other"]["success"] is False
+    assert response["miners"]["switch.other"]["entity_ids"] == ["switch.other"]
+
+    response = _service_response(await _async_fan_out(hass, index, ["switch.other"], _emergency_stop))
+    assert response["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_unknown_profile_fails(patched_registry):
+    """An unknown power profile is reported as a failed result."""
+    hass, registry = _fleet(1)
+    patched_registry.return_value = registry
+    hass.data[DOMAIN]["entry0"]["profile_catalog"] = ProfileCatalog([
+        CatalogProfile("default", 595, 3250, 110.0, "0", 0),
+    ])
+    index = EntityEntryIndex(hass)
+
+    response = _service_response(
+        await _async_fan_out(hass, index, ["switch.miner_0"], _set_power_profile, profile="turbo")
+    )
+
+    assert response["success"] is False
+    assert "Unknown power profile 'turbo'" in response["miners"]["entry0"]["error"]
@@ -0,0 +1,187 @@
+"""Tests for the non-blocking config entry setup."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner import async_setup_entry
+from custom_components.pv_miner.const import CAP_CURTAIL, DATA_HANDOFF, DOMAIN
+from custom_components.pv_miner.handoff import async_store_handoff
+from custom_components.pv_miner.luxos_api import LuxOSAPI
+
+VERSION = {"STATUS": [{"STATUS": "S"}], "VERSION": [{"LUXminer": "2025.10.15"}]}
+
+
+class _FakeStore:
+    """In-memory stand-in for the HA storage helper."""
+
+    data = {}
+
+    def __init__(self, hass, version, key):
+        self.key = key
+
+    async def async_load(self):
+        return _FakeStore.data.get(self.key)
+
+    async def async_save(self, data):
+        _FakeStore.data[self.key] = data
+
+    def async_delay_save(self, data_func, delay):
+        _FakeStore.data[self.key] = data_func()
+
+
+@pytest.fixture
+def setup_env():
+    """Create hass and a config entry whose background tasks are collected."""
+    _FakeStore.data = {}
+    hass = MagicMock()
+    hass.data = {}
+    hass.config_entries.async_forward_entry_setups = AsyncMock()
+    hass.services.has_service.return_value = True
+    tasks = []
+    entry = SimpleNamespace(
+        entry_id="entry",
+        data={"host": "192.168.1.210", "username": "root", "password": "root", "name": "Miner"},
+        options={},
+        async_create_background_task=lambda hass, coro, name: tasks.append(coro),
+        add_update_listener=MagicMock(),
+        async_on_unload=MagicMock(),
+    )
+    with patch("custom_components.pv_miner.capabilities.Store", _FakeStore), patch(
+        "custom_components.pv_miner.catalog_cache.Store", _FakeStore
+    ), patch("custom_components.pv_miner.solar_coordinator.SolarPowerCoordinator.async_start", AsyncMock()):
+        yield hass, entry, tasks
+    for coro in tasks:
+        coro.close()
+
+
+@pytest.mark.asyncio
+async def test_setup_is_gated_by_one_liveness_call(setup_env):
+    """Only the version call runs before the platforms are set up."""
+    hass, entry, tasks = setup_env
+    execute = AsyncMock(return_value=VERSION)
+
+    with patch.object(LuxOSAPI, "_execute_command", execute):
+        assert await async_setup_entry(hass, entry)
+
+    execute.assert_awaited_once_with("version")
+    hass.config_entries.async_forward_entry_setups.assert_awaited_once()
+    assert len(tasks) == 2  # first refresh and discovery
+    assert "setup" in hass.data[DOMAIN]["entry"]["timings"]
+    # Built-in profiles until discovery finished
+    assert hass.data[DOMAIN]["entry"]["profile_catalog"]
+
+
+@pytest.mark.asyncio
+async def test_unreachable_miner_fails_setup(setup_env):
+    """A miner that does not answer the liveness check is not set up."""
+    hass, entry, _ = setup_env
+    execute = AsyncMock(return_value={"STATUS": [{"STATUS": "E"}]})
+
+    with patch.object(LuxOSAPI, "_execute_command", execute):
+        assert not await async_setup_entry(hass, entry)
+
+    hass.config_entries.async_forward_entry_setups.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_background_discovery_reloads_when_entities_change(setup_env):
+    """Discovering an unsupported capability reloads the entry once."""
+    hass, entry, tasks = setup_env
+
+    async def _execute(command, parameter=""):
+        if command == "version":
+            return VERSION
+        if command == "check":
+            return {"STATUS": [{"STATUS": "S"}], "CHECK": [{"Exists": "N" if parameter == "curtail" else "Y"}]}
+        return {"STATUS": [{"STATUS": "E", "Msg": "unsupported"}]}
+
+    with patch.object(LuxOSAPI, "_execute_command", AsyncMock(side_effect=_execute)):
+        await async_setup_entry(hass, entry)
+        discovery = tasks.pop()
+        await discovery
+
+    api = hass.data[DOMAIN]["entry"]["api"]
+    assert api.capabilities[CAP_CURTAIL] is False
+    assert "discovery" in hass.data[DOMAIN]["entry"]["timings"]
+    hass.config_entries.async_reload.assert_called_once_with("entry")
+    hass.async_create_task.assert_called_once()
+    hass.async_create_task.call_args.args[0].close()
+
+
+@pytest.mark.asyncio
+async def test_first_setup_uses_config_flow_handoff(setup_env):
+    """A miner verified by the config flow is set up without any round-trip."""
+    hass, entry, tasks = setup_env
+    flow_api = LuxOSAPI("192.168.1.210")
+    flow_api.firmware_version = "2025.10.15"
+    flow_api._luxos_session_id = "abc123"
+    async_store_handoff(hass, flow_api)
+    execute = AsyncMock(return_value=VERSION)
+
+    with patch.object(LuxOSAPI, "_execute_command", execute):
+        assert await async_setup_entry(hass, entry)
+        execute.assert_not_awaited()
+        await tasks.pop()  # discovery
+
+    api = hass.data[DOMAIN]["entry"]["api"]
+    assert api.firmware_version == "2025.10.15"
+    assert api._luxos_session_id == "abc123"
+    # Without capabilities from the flow (bulk import) they are probed after
+    # setup and stored for the next start
+    assert "check" in {call.args[0] for call in execute.await_args_list}
+    assert "entry" in _FakeStore.data["pv_miner.capabilities"]
+    # The handoff is used once
+    assert hass.data[DATA_HANDOFF] == {}
+
+
+@pytest.mark.asyncio
+async def test_handoff_capabilities_are_not_probed_again(setup_env):
+    """Capabilities probed by the config flow are stored and not probed again."""
+    hass, entry, tasks = setup_env
+    flow_api = LuxOSAPI("192.168.1.210")
+    flow_api.firmware_version = "2025.10.15"
+    async_store_handoff(hass, flow_api, {CAP_CURTAIL: False})
+    execute = AsyncMock(return_value=VERSION)
+
+    with patch.object(LuxOSAPI, "_execute_command", execute):
+        assert await async_setup_entry(hass, entry)
+        await tasks.pop()  # discovery
+
+    api = hass.data[DOMAIN]["entry"]["api"]
+    assert api.capabilities == {CAP_CURTAIL: False}
+    # Only the profile revalidation talked to the miner, no probe and no reload
+    assert {call.args[0] for call in execute.await_args_list} <= {"profiles", "profileget"}
+    assert _FakeStore.data["pv_miner.capabilities"]["entry"]["capabilities"] == {CAP_CURTAIL: False}
+    hass.config_entries.async_reload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stale_handoff_is_ignored(setup_env):
+    """An old handoff falls back to the liveness check."""
+    hass, entry, _ = setup_env
+    flow_api = LuxOSAPI("192.168.1.210")
+    flow_api.firmware_version = "2025.10.15"
+    with patch("custom_components.pv_miner.handoff.time.monotonic", return_value=0.0):
+        async_store_handoff(hass, flow_api)
+    execute = AsyncMock(return_value=VERSION)
+
+    with patch.object(LuxOSAPI, "_execute_command", execute):
+        assert await async_setup_entry(hass, entry)
+
+    execute.assert_awaited_once_with("version")
+
+
+@pytest.mark.asyncio
+async def test_options_change_reloads_the_entry(setup_env):
+    """Saving the options reloads the entry so new settings apply."""
+    hass, entry, _ = setup_env
+
+    with patch.object(LuxOSAPI, "_execute_command", AsyncMock(return_value=VERSION)):
+        assert await async_setup_entry(hass, entry)
+
+    listener = entry.add_update_listener.call_args.args[0]
+    entry.async_on_unload.assert_called_once_with(entry.add_update_listener.return_value)
+    hass.config_entries.async_reload = AsyncMock()
+    await listener(hass, entry)
+    hass.config_entries.async_reload.assert_awaited_once_with("entry")
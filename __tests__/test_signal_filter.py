@@ -0,0 +1,102 @@
+"""Tests for the solar signal filter."""
+import pytest
+
+from custom_components.pv_miner.signal_filter import SolarSignalFilter
+
+
+@pytest.fixture
+def signal_filter():
+    """Create a filter without EWMA smoothing so medians are easy to check."""
+    return SolarSignalFilter(window=5, alpha=1.0)
+
+
+def _feed(signal_filter, samples):
+    """Feed one sample per tick and return the last output."""
+    value = None
+    for sample in samples:
+        value = signal_filter.update(sample)
+    return value
+
+
+def test_single_dropout_is_rejected(signal_filter):
+    """A single 0W glitch must not reach the output or the median window."""
+    _feed(signal_filter, [3000, 3000, 3000, 3000])
+
+    assert signal_filter.update(0) == 3000
+    assert signal_filter.update(3000) == 3000
+    assert signal_filter.rejected == 1
+    assert signal_filter.as_dict()["samples"] == 5
+
+
+def test_single_spike_is_rejected(signal_filter):
+    """A single spike must not reach the output."""
+    assert _feed(signal_filter, [2000, 2000, 2000, 9000]) == 2000
+    assert signal_filter.update(2000) == 2000
+    assert signal_filter.rejected == 1
+
+
+def test_step_change_passes_after_half_window(signal_filter):
+    """A persistent drop is followed once it fills half the window."""
+    _feed(signal_filter, [3000] * 5)
+    value = _feed(signal_filter, [200, 200, 200])
+
+    assert value == 200
+    assert signal_filter.rejected == 0
+
+
+def test_steady_reading_reaches_output(signal_filter):
+    """An unchanged reading is sampled every tick, e.g. a steady 0W at night."""
+    outputs = [_feed(signal_filter, [3000] * 5)] + [signal_filter.update(0) for _ in range(40)]
+
+    assert outputs[1:4] == [3000, 3000, 0]
+    assert outputs[-1] == 0
+    assert not signal_filter.is_stale
+
+
+def test_alternating_glitches_are_not_a_step(signal_filter):
+    """Outliers that disagree with each other are not promoted to a step."""
+    _feed(signal_filter, [2000] * 5)
+
+    assert _feed(signal_filter, [0, 9000, 0, 9000]) == 2000
+    assert signal_filter.rejected == 3
+
+
+def test_ewma_smooths_output():
+    """The EWMA stage moves only part of the way towards a new median."""
+    signal_filter = SolarSignalFilter(window=1, alpha=0.5)
+    _feed(signal_filter, [1000])
+    value = signal_filter.update(2000)
+
+    assert value == 1500
+
+
+def test_unavailable_sensor(signal_filter):
+    """An unavailable sensor reports stale and no value until it returns."""
+    _feed(signal_filter, [3000, 3000])
+    signal_filter.mark_unavailable()
+
+    assert signal_filter.is_stale
+    assert signal_filter.value is None
+
+    assert signal_filter.update(3000) == 3000
+    assert not signal_filter.is_stale
+
+
+def test_frozen_sensor_is_stale(signal_filter):
+    """A reading not reported for longer than max_age is held back as stale."""
+    _feed(signal_filter, [3000, 3000])
+
+    assert signal_filter.update(3000, age=signal_filter.max_age + 1) is None
+    assert signal_filter.is_stale
+    assert signal_filter.as_dict()["samples"] == 2
+
+    assert signal_filter.update(3000, age=10) == 3000
+    assert not signal_filter.is_stale
+
+
+def test_invalid_parameters():
+    """Invalid window or alpha raise ValueError."""
+    with pytest.raises(ValueError):
+        SolarSignalFilter(window=0)
+    with pytest.raises(ValueError):
+        SolarSignalFilter(alpha=0)
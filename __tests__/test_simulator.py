@@ -0,0 +1,181 @@
+"""Tests for the offline solar control simulator."""
+import json
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.simulator import (
+    default_profile_models,
+    load_history,
+    main,
+    simulate,
+)
+from custom_components.pv_miner.curtail_cost import CHOICE_LOWEST, CHOICE_RIDE, CurtailCostModel
+from custom_components.pv_miner.signal_filter import SolarSignalFilter, filter_series
+from custom_components.pv_miner.solar_policy import SLEEP_PROFILE, SolarPolicy
+
+
+def _solar_day(days=1, step=10.0, seed=1):
+    """Generate a noisy sun curve with cloud dips and meter dropouts."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, days * 86400, step)
+    hour = (t % 86400) / 3600
+    sun = np.clip(np.sin((hour - 6) / 12 * np.pi), 0, None) * 4500
+    clouds = np.where(rng.random(len(t)) < 0.02, 0.3, 1.0)
+    power = sun * clouds + rng.normal(0, 50, len(t))
+    power[rng.random(len(t)) < 0.001] = 0  # meter dropouts
+    return t, np.clip(power, 0, None)
+
+
+def _cloudy_day(step=10.0):
+    """Generate a sunny day with short, deep cloud dips every 20 minutes."""
+    t, power = _solar_day(step=step)
+    hour = (t % 86400) / 3600
+    dips = (hour > 9) & (hour < 16) & ((t % 1200) < 180)
+    return t, np.where(dips, 150.0, power)
+
+
+def test_filter_series_matches_live_filter():
+    """The vectorized filter produces the same output as the live filter."""
+    _, power = _solar_day(step=30.0)
+    live = SolarSignalFilter(window=5, alpha=0.3)
+    expected = [live.update(sample) for sample in power]
+
+    np.testing.assert_allclose(filter_series(power, 5, 0.3), expected, rtol=1e-9, atol=1e-6)
+
+
+def _replay(t, power, policy, curtail_cost):
+    """Replay the coordinator's decision flow tick by tick; return the decision count."""
+    profiles = default_profile_models(policy)
+    lowest = policy.profiles[0]
+    live = SolarSignalFilter()
+    cost_model = CurtailCostModel(policy.sleep_threshold)
+    current = None
+    decisions = 0
+    for tick in np.arange(t[0], t[-1] + 1e-9, 30):
+        i = np.searchsorted(t, tick, side="right") - 1
+        value = live.update(power[i])
+        cost_model.add_sample(tick, value)
+        decision = policy.decide(value, current)
+        if decision.profile == SLEEP_PROFILE and curtail_cost and current in profiles:
+            choice = cost_model.choose(tick, value, profiles[current].watts, profiles[lowest].watts, current == lowest)
+            if choice == CHOICE_RIDE:
+                continue
+            if choice == CHOICE_LOWEST:
+                if current != lowest:
+                    decisions += 1
+                    current = lowest
+                continue
+        if decision.profile is not None:
+            decisions += 1
+            current = decision.profile
+    return decisions
+
+
+@pytest.mark.parametrize("curtail_cost", [True, False])
+def test_simulation_matches_step_by_step_replay(curtail_cost):
+    """Change-point replay issues the same decisions as a naive tick loop."""
+    t, power = _cloudy_day()
+    policy = SolarPolicy()
+    report = simulate(t, power, policy=policy, decision_interval=30, curtail_cost=curtail_cost)
+
+    decisions = _replay(t, power, policy, curtail_cost)
+
+    assert report["decisions"] == decisions
+    assert report["switch_count"] == decisions - 1
+
+
+def test_curtail_cost_rides_short_dips():
+    """Short cloud dips are ridden or met at the lowest profile instead of sleeping."""
+    t, power = _cloudy_day()
+
+    with_cost = simulate(t, power)
+    plain = simulate(t, power, curtail_cost=False)
+
+    assert with_cost["ride_decisions"] + with_cost["lowest_profile_decisions"] > 0
+    assert with_cost["sleep_count"] < plain["sleep_count"]
+    assert plain["ride_decisions"] == plain["lowest_profile_decisions"] == 0
+
+
+def test_energy_balance():
+    """Consumed + exported - imported equals the solar energy."""
+    t, power = _solar_day()
+    report = simulate(t, power)
+
+    balance = report["consumed_kwh"] + report["exported_kwh"] - report["imported_kwh"]
+    assert balance == pytest.approx(report["solar_kwh"], abs=0.01)
+    assert report["mined_th"] > 0
+    assert report["sleep_count"] >= 1
+
+
+def test_night_only_sleeps():
+    """With no solar power the miner is put to sleep once and never mines."""
+    t = np.arange(0, 3600, 10.0)
+    report = simulate(t, np.zeros(len(t)))
+
+    assert report["mined_th"] == 0
+    assert report["sleep_count"] == 1
+    assert report["switch_count"] == 0
+
+
+def test_retune_latency_costs_hashrate():
+    """Longer re-tune latency reduces mined TH."""
+    t, power = _solar_day()
+    policy = SolarPolicy()
+    fast = {name: model._replace(retune_seconds=0) for name, model in default_profile_models(policy).items()}
+    slow = {name: model._replace(retune_seconds=600) for name, model in fast.items()}
+
+    assert simulate(t, power, profiles=slow)["mined_th"] < simulate(t, power, profiles=fast)["mined_th"]
+
+
+def test_missing_profile_model():
+    """A policy profile without a model is rejected."""
+    with pytest.raises(ValueError):
+        simulate([0, 10], [1000, 1000], profiles={})
+
+
+def test_load_history_csv(tmp_path):
+    """HA history CSV exports are parsed and non-numeric states skipped."""
+    path = tmp_path / "history.csv"
+    path.write_text(
+        "entity_id,state,last_changed\n"
+        "sensor.pv,1200,2024-06-01T10:00:10+00:00\n"
+        "sensor.pv,unavailable,2024-06-01T10:00:20+00:00\n"
+        "sensor.pv,1000,2024-06-01T10:00:00Z\n"
+    )
+    t, power = load_history(str(path))
+
+    assert list(power) == [1000, 1200]
+    assert t[1] - t[0] == 10
+
+
+def test_profile_file_drives_the_policy(tmp_path, capsys):
+    """A profile file of another model replaces the built-in profile table."""
+    profiles = tmp_path / "profiles.json"
+    profiles.write_text(json.dumps({"PROFILES": [
+        {"Profile Name": "-4", "Watts": 2300, "Hashrate": 84.5},
+        {"Profile Name": "default", "Watts": 3050, "Hashrate": 104.0},
+    ]}))
+    history = tmp_path / "history.csv"
+    history.write_text("".join(f"{t},{3200 if t < 1800 else 2500}\n" for t in range(0, 3600, 10)))
+
+    main([str(history), "--profiles", str(profiles)])
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["mined_th"] > 0
+    assert report["switch_count"] == 1
+
+
+def test_year_runs_in_seconds():
+    """A full year at 10 s resolution replays in a few seconds."""
+    t, power = _solar_day(days=365)
+    start = time.perf_counter()
+    simulate(t, power)
+
+    assert time.perf_counter() - start < 10
+
+
+def test_sleep_profile_constant():
+    """The simulator and policy agree on the sleep pseudo profile."""
+    assert SolarPolicy().decide(0, None).profile == SLEEP_PROFILE
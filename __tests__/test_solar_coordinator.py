@@ -0,0 +1,234 @@
+"""Tests for the solar power coordinator decision flow."""
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.pv_miner.const import DEFAULT_SOLAR_MAX_AGE
+from custom_components.pv_miner.miner_state import MinerState
+from custom_components.pv_miner.solar_coordinator import SolarPowerCoordinator
+from custom_components.pv_miner.solar_policy import SLEEP_PROFILE
+
+SOLAR_SENSOR = "sensor.pro3em_total_active_power"
+
+
+class _States:
+    """Minimal hass.states stand-in driven by a solar power value."""
+
+    def __init__(self):
+        self.solar = None
+        self.since = dt_util.utcnow()
+        self.reported = None
+
+    def get(self, entity_id):
+        if entity_id == SOLAR_SENSOR and self.solar is not None:
+            # A steady reading keeps its original timestamp, as in HA
+            return SimpleNamespace(
+                state=str(self.solar), last_updated=self.since, last_reported=self.reported
+            )
+        return None
+
+
+@pytest.fixture
+def solar():
+    """Create a solar coordinator in auto mode with a mocked API."""
+    hass = MagicMock()
+    hass.states = _States()
+    api = AsyncMock()
+    # Acknowledged writes confirm the miner state, as in LuxOSAPI
+    api.state = MinerState()
+    api.set_profile.side_effect = api.state.confirm_profile
+    api.pause_mining.side_effect = lambda: api.state.confirm_curtail(True)
+    api.resume_mining.side_effect = lambda: api.state.confirm_curtail(False)
+    coordinator = SolarPowerCoordinator(hass, api, "entry", "Test Miner", SOLAR_SENSOR)
+    coordinator.set_auto_mode(True)
+    return coordinator
+
+
+async def _tick(solar, watts):
+    """Run one solar update with a new reading."""
+    solar.hass.states.solar = watts
+    with patch("asyncio.sleep", AsyncMock()):
+        await solar._async_update()
+
+
+@pytest.mark.asyncio
+async def test_full_sun_sets_profile(solar):
+    """Plenty of solar power selects the top profile."""
+    await _tick(solar, 5000)
+
+    solar._api.set_profile.assert_awaited_once_with("685MHz")
+    assert solar._current_profile == "685MHz"
+
+
+@pytest.mark.asyncio
+async def test_single_dropout_does_not_sleep(solar):
+    """A single 0W glitch from the meter is filtered out."""
+    for _ in range(4):
+        await _tick(solar, 5000)
+    await _tick(solar, 0)
+
+    solar._api.pause_mining.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_missing_sensor_holds_state(solar):
+    """No reading means no command."""
+    await _tick(solar, None)
+
+    solar._api.set_profile.assert_not_awaited()
+    solar._api.pause_mining.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_steady_zero_after_sun_sleeps(solar):
+    """A step to a steady 0W is sampled every tick and puts the miner to sleep."""
+    await _tick(solar, 3000)
+    for _ in range(10):
+        await _tick(solar, 0)
+
+    solar._api.pause_mining.assert_awaited()
+    assert not solar.signal_filter.is_stale
+
+
+@pytest.mark.asyncio
+async def test_unavailable_sensor_is_stale(solar):
+    """An unavailable sensor holds the state and marks the signal stale."""
+    await _tick(solar, "unavailable")
+
+    assert solar.signal_filter.is_stale
+    solar._api.set_profile.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_frozen_sensor_is_stale(solar):
+    """A meter that stopped reporting holds the state and marks the signal stale."""
+    solar.hass.states.reported = dt_util.utcnow() - timedelta(seconds=DEFAULT_SOLAR_MAX_AGE + 60)
+    await _tick(solar, 5000)
+
+    assert solar.signal_filter.is_stale
+    solar._api.set_profile.assert_not_awaited()
+
+    solar.hass.states.reported = dt_util.utcnow()
+    await _tick(solar, 5000)
+    assert not solar.signal_filter.is_stale
+
+
+@pytest.mark.asyncio
+async def test_staleness_falls_back_to_state_events(solar):
+    """Without last_reported the last state event of the sensor dates the reading."""
+    solar._solar_reported_at = dt_util.utcnow() - timedelta(seconds=DEFAULT_SOLAR_MAX_AGE + 60)
+    await _tick(solar, 5000)
+    assert solar.signal_filter.is_stale
+
+    solar._async_solar_reported(SimpleNamespace(time_fired=dt_util.utcnow()))
+    await _tick(solar, 5000)
+    assert not solar.signal_filter.is_stale
+
+
+@pytest.mark.asyncio
+async def test_sustained_darkness_sleeps(solar):
+    """A smooth decline below the threshold puts the miner to sleep."""
+    for watts in (900, 800, 700, 600, 500, 400, 300, 200, 100, 0, 0, 0):
+        await _tick(solar, watts)
+
+    solar._api.pause_mining.assert_awaited()
+    assert solar._current_profile == SLEEP_PROFILE
+
+
+@pytest.mark.asyncio
+async def test_thermal_cap_takes_precedence(solar):
+    """A capped profile is applied instead of the solar choice."""
+    from custom_components.pv_miner.thermal_governor import ThermalGovernor
+
+    governor = ThermalGovernor(solar.policy.profiles)
+    governor.record_profile("685MHz")
+    governor.update([74], 0)
+    solar._coordinator = SimpleNamespace(thermal_governor=governor, data=None)
+
+    await _tick(solar, 5000)
+
+    solar._api.set_profile.assert_awaited_once_with("660MHz")
+    assert governor.active_profile == "660MHz"
+
+    # Already at the cap - no repeated write
+    await _tick(solar, 5000)
+    solar._api.set_profile.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_battery_budget_limits_profile(solar):
+    """A charging battery leaves only the surplus for mining."""
+    from custom_components.pv_miner.battery_budget import BatteryBudget
+
+    solar.configure_battery(BatteryBudget(max_charge_watts=3000), "sensor.battery_soc")
+    states = solar.hass.states
+    original_get = states.get
+    states.get = lambda entity_id: (
+        SimpleNamespace(state="50") if entity_id == "sensor.battery_soc" else original_get(entity_id)
+    )
+
+    await _tick(solar, 6000)
+
+    solar._api.set_profile.assert_awaited_once_with("460MHz")
+    assert solar.battery_budget.budget == 3000
+
+
+async def _sleep_then_sun(solar):
+    """Put the miner to sleep, then make the sun return."""
+    for _ in range(6):
+        await _tick(solar, 0)
+    assert solar._current_profile == SLEEP_PROFILE
+    solar.hass.states.solar = 5000
+    for _ in range(2):
+        solar.signal_filter.update(5000)
+
+
+@pytest.mark.asyncio
+async def test_wake_timeout_does_not_set_profile(solar):
+    """A miner that does not hash after wakeup gets no profile and no wake record."""
+    await _sleep_then_sun(solar)
+    solar._api.wait_for_mining.return_value = False
+
+    await _tick(solar, 5000)
+
+    solar._api.resume_mining.assert_awaited_once()
+    solar._api.set_profile.assert_not_awaited()
+    assert solar._current_profile is None
+    assert solar.cost_model._wake_started is None
+
+
+@pytest.mark.asyncio
+async def test_ticks_do_not_overlap_during_wake(solar):
+    """A tick arriving while a wake cycle waits for hashrate is skipped."""
+    await _sleep_then_sun(solar)
+    ready = asyncio.Event()
+
+    async def _wait_for_mining():
+        await ready.wait()
+        return True
+
+    solar._api.wait_for_mining.side_effect = _wait_for_mining
+    first = asyncio.ensure_future(solar._async_update())
+    await asyncio.sleep(0)
+    await solar._async_update()
+    ready.set()
+    await first
+
+    solar._api.resume_mining.assert_awaited_once()
+    solar._api.set_profile.assert_awaited_once()
+    assert solar.cost_model._wake_started is not None
+
+
+@pytest.mark.asyncio
+async def test_decisions_follow_the_observed_miner_state(solar):
+    """A profile set outside the coordinator is the starting point of the next decision."""
+    solar._api.state.observe({"devs": {"DEVS": [{"Profile": "685MHz"}]}})
+
+    await _tick(solar, 5000)
+
+    solar._api.set_profile.assert_not_awaited()
+    assert solar._current_profile == "685MHz"
@@ -0,0 +1,178 @@
+"""Startup performance budget of the integration."""
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.pv_miner import async_setup_entry
+from custom_components.pv_miner.const import DOMAIN, IMPORT_TIME_BUDGET, SETUP_TIME_BUDGET
+from custom_components.pv_miner.luxos_api import LuxOSAPI
+from custom_components.pv_miner.services import SERVICE_SCHEMAS
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Home Assistant modules that are loaded before any integration
+HA_PRELOAD = (
+    "homeassistant.config_entries",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.event",
+    "aiohttp",
+)
+
+# Modules only needed once an entry is set up or a flow, service call or
+# platform uses them
+LAZY_MODULES = (
+    "custom_components.pv_miner.battery_budget",
+    "custom_components.pv_miner.capabilities",
+    "custom_components.pv_miner.catalog_cache",
+    "custom_components.pv_miner.handoff",
+    "custom_components.pv_miner.luxos_api",
+    "custom_components.pv_miner.miner_state",
+    "custom_components.pv_miner.response_cache",
+    "custom_components.pv_miner.profile_catalog",
+    "custom_components.pv_miner.solar_coordinator",
+    "custom_components.pv_miner.solar_policy",
+    "custom_components.pv_miner.thermal_governor",
+    "custom_components.pv_miner.config_flow",
+    "custom_components.pv_miner.discovery",
+    "custom_components.pv_miner.services",
+    "custom_components.pv_miner.rollout",
+    "yaml",
+)
+
+IMPORT_PROBE = """
+import importlib, json, sys, time
+for name in {preload!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+import custom_components.pv_miner as integration
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "reported": integration.IMPORT_SECONDS,
+    "loaded": sorted(set(sys.modules) - before),
+}}))
+"""
+
+VERSION = {"STATUS": [{"STATUS": "S"}], "VERSION": [{"LUXminer": "2025.10.15"}]}
+MINER_LATENCY = 0.2  # seconds per command
+# Headroom over the import budget for slow or busy CI machines
+IMPORT_BUDGET_TOLERANCE = 2
+
+
+def _import_profile() -> dict:
+    """Import the integration in a fresh interpreter and report what it cost."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE.format(preload=HA_PRELOAD)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_stays_within_budget():
+    """Importing the integration is cheap and loads no lazy module."""
+    profile = _import_profile()
+
+    assert 0 < profile["reported"] <= profile["seconds"]
+    assert profile["seconds"] < IMPORT_TIME_BUDGET * IMPORT_BUDGET_TOLERANCE
+    assert not set(LAZY_MODULES) & set(profile["loaded"])
+
+
+class _FakeStore:
+    """In-memory stand-in for the HA storage helper."""
+
+    def __init__(self, hass, version, key):
+        self.key = key
+
+    async def async_load(self):
+        return None
+
+    async def async_save(self, data):
+        pass
+
+    def async_delay_save(self, data_func, delay):
+        pass
+
+
+def _hass():
+    """Create hass whose service registry remembers registrations."""
+    hass = MagicMock()
+    hass.data = {}
+    hass.config_entries.async_forward_entry_setups = AsyncMock()
+    registered = {}
+    hass.services.has_service.side_effect = lambda domain, service: service in registered
+    hass.services.async_register.side_effect = (
+        lambda domain, service, handler, schema, supports_response: registered.setdefault(service, schema)
+    )
+    return hass, registered
+
+
+def _entry(entry_id, tasks):
+    """Create a config entry collecting its background tasks."""
+    return SimpleNamespace(
+        entry_id=entry_id,
+        data={"host": "192.168.1.210", "username": "root", "password": "root", "name": "Miner"},
+        options={},
+        async_create_background_task=lambda hass, coro, name: tasks.append(coro),
+        add_update_listener=MagicMock(),
+        async_on_unload=MagicMock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_setup_stays_within_budget_on_a_slow_miner():
+    """Setup waits for one round-trip only, however slow the miner polls."""
+    hass, _ = _hass()
+    tasks = []
+    entry = _entry("entry", tasks)
+
+    async def _slow_miner(command, parameter=""):
+        await asyncio.sleep(MINER_LATENCY)
+        return VERSION
+
+    miner = AsyncMock(side_effect=_slow_miner)
+    with patch("custom_components.pv_miner.capabilities.Store", _FakeStore), patch(
+        "custom_components.pv_miner.catalog_cache.Store", _FakeStore
+    ), patch("custom_components.pv_miner.solar_coordinator.SolarPowerCoordinator.async_start", AsyncMock()), patch.object(
+        LuxOSAPI, "_execute_command", miner
+    ):
+        assert await async_setup_entry(hass, entry)
+        assert miner.await_count == 1
+        first_refresh = tasks[0]
+        await first_refresh
+    for coro in tasks[1:]:
+        coro.close()
+
+    timings = hass.data[DOMAIN]["entry"]["timings"]
+    assert timings["setup"] < SETUP_TIME_BUDGET
+    assert timings["first_refresh"] >= MINER_LATENCY
+    assert timings["import"] > 0
+
+
+@pytest.mark.asyncio
+async def test_services_are_registered_once():
+    """Further entries reuse the services and their prebuilt schemas."""
+    hass, registered = _hass()
+    tasks = []
+
+    with patch("custom_components.pv_miner.capabilities.Store", _FakeStore), patch(
+        "custom_components.pv_miner.catalog_cache.Store", _FakeStore
+    ), patch("custom_components.pv_miner.solar_coordinator.SolarPowerCoordinator.async_start", AsyncMock()), patch.object(
+        LuxOSAPI, "_execute_command", AsyncMock(return_value=VERSION)
+    ):
+        assert await async_setup_entry(hass, _entry("entry1", tasks))
+        assert await async_setup_entry(hass, _entry("entry2", tasks))
+    for coro in tasks:
+        coro.close()
+
+    assert hass.services.async_register.call_count == len(SERVICE_SCHEMAS)
+    assert all(registered[service] is schema for service, schema in SERVICE_SCHEMAS.items())
@@ -0,0 +1,104 @@
+"""Tests for the thermal governor."""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.pv_miner import PVMinerCoordinator
+from custom_components.pv_miner.miner_state import MinerState
+from custom_components.pv_miner.thermal_governor import ThermalGovernor, board_temperatures
+
+PROFILES = ["260MHz", "360MHz", "460MHz", "560MHz", "685MHz"]
+
+
+@pytest.fixture
+def governor():
+    """Create a governor with a 75°C limit."""
+    governor = ThermalGovernor(PROFILES, limit=75, margin=3, hysteresis=8, step_seconds=60, cooldown_seconds=600)
+    governor.record_profile("685MHz")
+    return governor
+
+
+def test_board_temperatures_from_devs():
+    """Per-board temperatures come from the devs reply."""
+    data = {"devs": {"DEVS": [{"ASC": 0, "Temperature": 64.0}, {"ASC": 1, "Temperature": 71.5}]}}
+
+    assert board_temperatures(data) == [64.0, 71.5]
+
+
+def test_board_temperatures_fallback_to_stats():
+    """Without devs temperatures the stats temp fields are used."""
+    data = {"devs": {}, "stats": {"STATS": [{}, {"temp1": 60, "temp2": 62, "temp3": 61}]}}
+
+    assert board_temperatures(data) == [60.0, 62.0, 61.0]
+
+
+def test_cool_boards_leave_profile_alone(governor):
+    """Temperatures well below the limit impose no cap."""
+    assert governor.update([60, 62, 61], 0) is None
+    assert governor.cap("685MHz") == "685MHz"
+
+
+def test_hot_board_steps_down(governor):
+    """Approaching the limit caps one step below the active profile."""
+    assert governor.update([60, 73, 61], 0) == "560MHz"
+    governor.record_profile("560MHz")
+
+    # Still hot, but the next step waits for step_seconds
+    assert governor.update([60, 74, 61], 30) is None
+    assert governor.update([60, 74, 61], 60) == "460MHz"
+    assert governor.cap("685MHz") == "460MHz"
+    assert governor.cap("360MHz") == "360MHz"
+
+
+def test_cap_never_drops_below_lowest_profile(governor):
+    """The governor curtails to the lowest profile, not to sleep."""
+    for step in range(10):
+        target = governor.update([80], step * 60)
+        if target:
+            governor.record_profile(target)
+
+    assert governor.cap_profile == "260MHz"
+
+
+def test_steps_up_only_after_cooldown(governor):
+    """The cap is raised one step per full cooldown below the hysteresis band."""
+    governor.update([74], 0)
+    governor.record_profile("560MHz")
+
+    # Inside the hysteresis band nothing changes
+    governor.update([70], 100)
+    governor.update([70], 1000)
+    assert governor.cap_profile == "560MHz"
+
+    governor.update([65], 1100)
+    governor.update([65], 1500)
+    assert governor.cap_profile == "560MHz"
+    governor.update([65], 1700)
+    assert governor.cap_profile is None
+
+
+def test_unknown_profile_is_capped(governor):
+    """Profiles outside the ranked list fall back to the cap while capped."""
+    governor.update([74], 0)
+
+    assert governor.cap("default") == "560MHz"
+
+
+@pytest.mark.asyncio
+async def test_poll_caps_profile_reported_by_miner():
+    """A profile not set through HA, e.g. before a restart, is capped too."""
+    api = AsyncMock()
+    api.state = MinerState()
+    api.execute_batch.return_value = {
+        "devs": {"DEVS": [
+            {"ASC": 0, "Temperature": 60.0, "Profile": "685MHz"},
+            {"ASC": 1, "Temperature": 73.0, "Profile": "685MHz"},
+        ]},
+    }
+    governor = ThermalGovernor(PROFILES, limit=75, margin=3)
+    coordinator = PVMinerCoordinator(MagicMock(), api, 30, governor)
+
+    await coordinator._async_update_data()
+
+    api.set_profile.assert_awaited_once_with("560MHz")
+    assert governor.active_profile == "560MHz"
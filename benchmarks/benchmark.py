@@ -0,0 +1,308 @@
+"""Benchmarks of the LuxOS client and the miner coordinator.
+
+Polls fleets of simulated LuxOS miners (see luxos_simulator) through
+PVMinerCoordinator the way Home Assistant does and reports per-command
+latency percentiles, full-poll wall time, polls per second per fleet size,
+executor thread usage and bytes allocated per poll. Results are flat metric
+names mapped to numbers; compared against a stored baseline, a regression
+beyond the tolerance exits non-zero.
+
+Usage:
+    python -m benchmarks.benchmark [--miners 1 10 100 500] [--output results.json] [--baseline benchmarks/baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from homeassistant.core import HomeAssistant
+from homeassistant.runner import MAX_EXECUTOR_WORKERS
+
+from benchmarks.luxos_simulator import LuxOSSimulator
+from custom_components.pv_miner import POLL_COMMANDS, PVMinerCoordinator
+from custom_components.pv_miner.capabilities import async_probe_capabilities
+from custom_components.pv_miner.const import DEFAULT_SCAN_INTERVAL
+from custom_components.pv_miner.luxos_api import LuxOSAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FLEET_SIZES = (1, 10, 100, 500)
+DEFAULT_ROUNDS = 5
+DEFAULT_COMMAND_SAMPLES = 50
+DEFAULT_MEMORY_POLLS = 20
+DEFAULT_TOLERANCE = 0.25  # relative change that counts as a regression
+MIN_TIMING_DELTA_MS = 1.0  # smaller timing changes are noise on localhost
+
+# Metrics where larger is better; every other metric regresses upwards
+HIGHER_IS_BETTER = ("polls_per_second",)
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """Default executor that records how busy its threads get."""
+
+    def __init__(self, max_workers: int = MAX_EXECUTOR_WORKERS) -> None:
+        """Initialize the executor like Home Assistant's SyncWorker pool."""
+        super().__init__(max_workers=max_workers, thread_name_prefix="SyncWorker")
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.in_flight = 0
+        self.peak_busy = 0
+        self.peak_in_flight = 0
+        self.jobs = 0
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any):
+        """Queue a job, counting it as in flight until it finishes."""
+        with self._lock:
+            self.jobs += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return super().submit(self._run, fn, *args, **kwargs)
+
+    def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a job on a worker thread, counting it as busy."""
+        with self._lock:
+            self.busy += 1
+            self.peak_busy = max(self.peak_busy, self.busy)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.busy -= 1
+                self.in_flight -= 1
+
+    @property
+    def threads(self) -> int:
+        """Return the number of worker threads started so far."""
+        return len(self._threads)
+
+
+def percentiles(samples: Sequence[float], prefix: str = "") -> Dict[str, float]:
+    """Return p50/p90/p99/max of durations in seconds, in milliseconds."""
+    ordered = sorted(samples)
+
+    def _pick(quantile: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(quantile * len(ordered)))] * 1000, 3)
+
+    return {
+        f"{prefix}p50_ms": _pick(0.5),
+        f"{prefix}p90_ms": _pick(0.9),
+        f"{prefix}p99_ms": _pick(0.99),
+        f"{prefix}max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def compare(metrics: Dict[str, float], baseline: Dict[str, float], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Return a line per metric that got worse than the baseline by more than the tolerance."""
+    regressions = []
+    for name, before in sorted(baseline.items()):
+        after = metrics.get(name)
+        if after is None or not before:
+            continue
+        if name.endswith("_ms") and after - before < MIN_TIMING_DELTA_MS:
+            continue
+        change = (after - before) / before
+        if name.endswith(HIGHER_IS_BETTER):
+            change = -change
+        if change > tolerance:
+            regressions.append(f"{name}: {before} -> {after} ({change:+.0%} worse)")
+    return regressions
+
+
+def _client(simulator: LuxOSSimulator) -> LuxOSAPI:
+    """Return a client pointed at a simulated miner."""
+    api = LuxOSAPI(simulator.host)
+    api.tcp_port = simulator.tcp_port
+    if simulator.http_port is not None:
+        api.http_port = simulator.http_port
+    return api
+
+
+async def _async_start_fleet(size: int, latency: float) -> List[LuxOSSimulator]:
+    """Start ``size`` TCP-only simulated miners on free ports."""
+    fleet = [LuxOSSimulator(tcp_port=0, http_port=None, latency=latency) for _ in range(size)]
+    await asyncio.gather(*(simulator.start() for simulator in fleet))
+    return fleet
+
+
+async def _async_stop_fleet(fleet: List[LuxOSSimulator], apis: List[LuxOSAPI]) -> None:
+    """Close the clients and stop the simulated miners."""
+    await asyncio.gather(*(api.close() for api in apis))
+    await asyncio.gather(*(simulator.stop() for simulator in fleet))
+
+
+async def _async_coordinators(hass: HomeAssistant, apis: List[LuxOSAPI]) -> List[PVMinerCoordinator]:
+    """Probe capabilities like setup does and return one warmed-up coordinator per miner."""
+    capabilities = await asyncio.gather(*(async_probe_capabilities(api) for api in apis))
+    coordinators = []
+    for api, probed in zip(apis, capabilities):
+        api.capabilities = probed
+        coordinators.append(PVMinerCoordinator(hass, api, DEFAULT_SCAN_INTERVAL))
+    # The first refresh fills the response cache, as after setup
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+    return coordinators
+
+
+async def async_bench_commands(latency: float, samples: int = DEFAULT_COMMAND_SAMPLES) -> Dict[str, float]:
+    """Measure the round-trip latency of each poll command on one miner."""
+    fleet = await _async_start_fleet(1, latency)
+    api = _client(fleet[0])
+    metrics: Dict[str, float] = {}
+    try:
+        for command in POLL_COMMANDS:
+            durations = []
+            for _ in range(samples):
+                start = time.perf_counter()
+                await api._execute_command(command, "")
+                durations.append(time.perf_counter() - start)
+            metrics.update(percentiles(durations, f"command.{command}."))
+    finally:
+        await _async_stop_fleet(fleet, [api])
+    return metrics
+
+
+async def async_bench_fleet(hass: HomeAssistant, size: int, rounds: int, latency: float) -> Dict[str, float]:
+    """Poll a fleet of ``size`` miners concurrently for ``rounds`` update intervals."""
+    fleet = await _async_start_fleet(size, latency)
+    apis = [_client(simulator) for simulator in fleet]
+    loop = asyncio.get_running_loop()
+    # A fresh executor per fleet so thread usage covers the timed polls only
+    executor = InstrumentedExecutor()
+    try:
+        coordinators = await _async_coordinators(hass, apis)
+        loop.set_default_executor(executor)
+        wire_before = sum(simulator.bytes_in + simulator.bytes_out for simulator in fleet)
+        poll_times: List[float] = []
+        failures = 0
+
+        async def _poll(coordinator: PVMinerCoordinator) -> None:
+            nonlocal failures
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            poll_times.append(time.perf_counter() - start)
+            if not coordinator.last_update_success:
+                failures += 1
+
+        round_times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await asyncio.gather(*(_poll(coordinator) for coordinator in coordinators))
+            round_times.append(time.perf_counter() - start)
+        wire = sum(simulator.bytes_in + simulator.bytes_out for simulator in fleet) - wire_before
+    finally:
+        await _async_stop_fleet(fleet, apis)
+    loop.set_default_executor(ThreadPoolExecutor(MAX_EXECUTOR_WORKERS, thread_name_prefix="SyncWorker"))
+    executor.shutdown(wait=False)
+
+    prefix = f"fleet.{size}."
+    return {
+        f"{prefix}polls_per_second": round(size * rounds / sum(round_times), 1),
+        **percentiles(poll_times, f"{prefix}poll_"),
+        **percentiles(round_times, f"{prefix}round_"),
+        f"{prefix}poll_failures": failures,
+        f"{prefix}executor_threads": executor.threads,
+        f"{prefix}executor_peak_busy": executor.peak_busy,
+        f"{prefix}executor_peak_in_flight": executor.peak_in_flight,
+        f"{prefix}executor_jobs_per_poll": round(executor.jobs / (size * rounds), 2),
+        f"{prefix}wire_bytes_per_poll": round(wire / (size * rounds)),
+    }
+
+
+async def async_bench_memory(hass: HomeAssistant, latency: float, polls: int = DEFAULT_MEMORY_POLLS) -> Dict[str, float]:
+    """Measure the memory one poll allocates at its peak, traced across all threads."""
+    fleet = await _async_start_fleet(1, latency)
+    apis = [_client(fleet[0])]
+    allocated = []
+    try:
+        coordinator = (await _async_coordinators(hass, apis))[0]
+        tracemalloc.start()
+        try:
+            for _ in range(polls):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                await coordinator.async_refresh()
+                allocated.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+    finally:
+        await _async_stop_fleet(fleet, apis)
+    allocated.sort()
+    return {"memory.poll_peak_bytes": allocated[len(allocated) // 2]}
+
+
+async def async_run(
+    sizes: Sequence[int] = DEFAULT_FLEET_SIZES,
+    rounds: int = DEFAULT_ROUNDS,
+    latency: float = 0.0,
+    samples: int = DEFAULT_COMMAND_SAMPLES,
+) -> Dict[str, Any]:
+    """Run all benchmarks and return the report."""
+    metrics: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        metrics.update(await async_bench_commands(latency, samples))
+        for size in sizes:
+            metrics.update(await async_bench_fleet(hass, size, rounds, latency))
+            _LOGGER.info("Benchmarked %d miners: %.1f polls/s", size, metrics[f"fleet.{size}.polls_per_second"])
+        metrics.update(await async_bench_memory(hass, latency))
+
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fleet_sizes": list(sizes),
+            "rounds": rounds,
+            "latency": latency,
+            "executor_workers": MAX_EXECUTOR_WORKERS,
+        },
+        "metrics": metrics,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the LuxOS client and coordinator against simulated miners")
+    parser.add_argument("--miners", type=int, nargs="+", default=list(DEFAULT_FLEET_SIZES), help="fleet sizes")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="polls per miner and fleet size")
+    parser.add_argument("--samples", type=int, default=DEFAULT_COMMAND_SAMPLES, help="calls per command")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated miner reply latency (s)")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for noisy in ("custom_components.pv_miner", "homeassistant"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+    _LOGGER.setLevel(logging.INFO)
+
+    report = asyncio.run(async_run(args.miners, args.rounds, args.latency, args.samples))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["metrics"]
+        regressions = compare(report["metrics"], baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,596 @@
+"""Simulated LuxOS miner for offline tests and benchmarks.
+
+Serves the cgminer-style TCP API (NUL-terminated JSON, default port 4028)
+and the LuxOS HTTP layer (``POST /api``, default port 8080) backed by one
+stateful miner: sessions and ``logon``, curtail, profiles, ATM, hashboards
+and pools, with telemetry (stats, devs, power, temps, fans) derived from
+that state. Latency, failures, dropped connections and malformed replies
+can be injected.
+
+Usage:
+    python -m benchmarks.luxos_simulator [--tcp-port 4028] [--http-port 8080] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FIRMWARE = "2025.10.15.191043"
+DEFAULT_MODEL = "Antminer S21+"
+DEFAULT_BOARDS = 3
+DEFAULT_SESSION_TIMEOUT = 900  # seconds of inactivity before a session expires
+SLEEP_WATTS = 30  # control board draw while curtailed
+AMBIENT_TEMPERATURE = 30.0
+
+# Name, frequency (MHz), watts, hashrate (TH/s), voltage, step
+DEFAULT_PROFILES: List[Tuple[str, int, int, float, float, str]] = [
+    ("310MHz", 310, 2250, 140.0, 12.4, "-4"),
+    ("-2", 400, 2900, 180.0, 12.9, "-2"),
+    ("default", 490, 3550, 216.0, 13.4, "0"),
+    ("+1", 520, 3850, 228.0, 13.6, "+1"),
+    ("+2", 550, 4150, 238.0, 13.8, "+2"),
+]
+
+# Commands that take "session_id,..." as parameter
+SESSION_COMMANDS = {
+    "curtail",
+    "profileset",
+    "atmset",
+    "enableboard",
+    "disableboard",
+    "powertargetset",
+    "logoff",
+}
+
+
+def _status(code: str, msg: str, description: str = "") -> Dict[str, Any]:
+    """Return a cgminer STATUS section."""
+    return {"STATUS": [{"STATUS": code, "When": int(time.time()), "Code": 0, "Msg": msg, "Description": description}]}
+
+
+class SimulatedMiner:
+    """State of one simulated LuxOS miner and its command handlers."""
+
+    def __init__(
+        self,
+        firmware: str = DEFAULT_FIRMWARE,
+        model: str = DEFAULT_MODEL,
+        boards: int = DEFAULT_BOARDS,
+        username: str = "root",
+        password: str = "root",
+        unsupported: Optional[Set[str]] = None,
+        session_timeout: float = DEFAULT_SESSION_TIMEOUT,
+        wake_seconds: float = 0.0,
+    ) -> None:
+        """Initialize a mining miner on its default profile."""
+        self.firmware = firmware
+        self.model = model
+        self.username = username
+        self.password = password
+        # Commands this firmware does not know
+        self.unsupported = set(unsupported or ())
+        self.session_timeout = session_timeout
+        # Seconds a wakeup takes before hashing resumes
+        self.wake_seconds = wake_seconds
+
+        self.profiles = {
+            name: {"frequency": freq, "watts": watts, "hashrate": hashrate, "voltage": voltage, "step": step}
+            for name, freq, watts, hashrate, voltage, step in DEFAULT_PROFILES
+        }
+        self.profile = "default"
+        self.boards_enabled = [True] * boards
+        self.sleeping = False
+        self.atm_enabled = True
+        self.power_target: Optional[int] = None
+        self.frequency_offset = 0
+        self.pools = [{"url": "stratum+tcp://btc.global.luxor.tech:700", "user": "pvminer.worker", "password": "x"}]
+        self.active_pool = 0
+
+        self.session_id: Optional[str] = None
+        self._session_used = 0.0
+        self._started = time.monotonic()
+        self._hashing_from = self._started
+        # Commands handled, by name
+        self.commands: Dict[str, int] = {}
+
+    # Derived telemetry
+
+    @property
+    def mining(self) -> bool:
+        """Return True while the miner hashes."""
+        return not self.sleeping and any(self.boards_enabled) and time.monotonic() >= self._hashing_from
+
+    def _board_load(self, board: int) -> float:
+        """Return the share of full power a board runs at (0 when idle)."""
+        if not self.mining or not self.boards_enabled[board]:
+            return 0.0
+        return 1.0
+
+    def _profile_scale(self) -> float:
+        """Return the fraction of the profile's power allowed by the power target."""
+        watts = self.profiles[self.profile]["watts"]
+        if self.power_target is None or self.power_target >= watts:
+            return 1.0
+        return max(self.power_target, SLEEP_WATTS) / watts
+
+    def power_watts(self) -> int:
+        """Return the wall power draw."""
+        per_board = self.profiles[self.profile]["watts"] * self._profile_scale() / len(self.boards_enabled)
+        return int(SLEEP_WATTS + sum(per_board * self._board_load(board) for board in range(len(self.boards_enabled))))
+
+    def board_ghs(self, board: int) -> float:
+        """Return a hashboard's hashrate in GH/s."""
+        per_board = self.profiles[self.profile]["hashrate"] * 1000 * self._profile_scale() / len(self.boards_enabled)
+        return round(per_board * self._board_load(board), 2)
+
+    def board_temperature(self, board: int) -> float:
+        """Return a hashboard's temperature in °C."""
+        heat = self.profiles[self.profile]["watts"] / 4150 * self._profile_scale()
+        return round(AMBIENT_TEMPERATURE + 35 * heat * self._board_load(board), 1)
+
+    # Command dispatch
+
+    def handle(self, command: str, parameter: str = "") -> Dict[str, Any]:
+        """Answer one command like LuxOS does (``a+b`` batches included)."""
+        if "+" in command:
+            names = command.split("+")
+            if any(name in SESSION_COMMANDS for name in names):
+                return _status("E", "Invalid batch command")
+            return {name: [self._handle_one(name, "")] for name in names}
+        return self._handle_one(command, parameter)
+
+    def _handle_one(self, command: str, parameter: str) -> Dict[str, Any]:
+        """Answer one command."""
+        self.commands[command] = self.commands.get(command, 0) + 1
+        handler = getattr(self, f"_cmd_{command}", None)
+        if handler is None or command in self.unsupported:
+            return _status("E", f"Invalid command: {command}")
+        if command in SESSION_COMMANDS:
+            session_id, _, parameter = parameter.partition(",")
+            if not self._valid_session(session_id):
+                return _status("E", "Invalid session_id")
+        return handler(parameter)
+
+    def _valid_session(self, session_id: str) -> bool:
+        """Check and refresh a session ID."""
+        now = time.monotonic()
+        if self.session_id and now - self._session_used > self.session_timeout:
+            self.session_id = None
+        if not self.session_id or session_id != self.session_id:
+            return False
+        self._session_used = now
+        return True
+
+    def _ok(self, msg: str, **sections: Any) -> Dict[str, Any]:
+        """Return a successful reply."""
+        return {**_status("S", msg, f"LUXminer {self.firmware}"), **sections, "id": 1}
+
+    # Sessions
+
+    def _cmd_session(self, parameter: str) -> Dict[str, Any]:
+        self._valid_session(self.session_id or "")
+        return self._ok("Session", SESSION=[{"SessionID": self.session_id or ""}])
+
+    def _cmd_logon(self, parameter: str) -> Dict[str, Any]:
+        username, _, password = parameter.partition(",")
+        if (username, password) != (self.username, self.password):
+            return _status("E", "Invalid username or password")
+        if self._valid_session(self.session_id or ""):
+            return _status("E", "Another session is active")
+        self.session_id = secrets.token_hex(4)
+        self._session_used = time.monotonic()
+        return self._ok("Logon", SESSION=[{"SessionID": self.session_id}])
+
+    def _cmd_logoff(self, parameter: str) -> Dict[str, Any]:
+        self.session_id = None
+        return self._ok("Logoff")
+
+    # Control
+
+    def _cmd_curtail(self, parameter: str) -> Dict[str, Any]:
+        if parameter == "sleep":
+            if self.sleeping:
+                return _status("E", "Cannot sleep: curtail mode is idle or sleep")
+            self.sleeping = True
+            return self._ok("Curtail sleep")
+        if parameter == "wakeup":
+            if not self.sleeping:
+                return _status("E", "Miner is already active")
+            self.sleeping = False
+            self._hashing_from = time.monotonic() + self.wake_seconds
+            return self._ok("Curtail wakeup")
+        return _status("E", f"Invalid curtail mode: {parameter}")
+
+    def _cmd_profileset(self, parameter: str) -> Dict[str, Any]:
+        if parameter not in self.profiles:
+            return _status("E", f"Profile {parameter} not found")
+        self.profile = parameter
+        return self._ok(f"Profile set to {parameter}")
+
+    def _cmd_atmset(self, parameter: str) -> Dict[str, Any]:
+        key, _, value = parameter.partition("=")
+        if key != "enabled" or value not in ("true", "false"):
+            return _status("E", f"Invalid atmset parameter: {parameter}")
+        self.atm_enabled = value == "true"
+        return self._ok("ATM configuration updated")
+
+    def _set_board(self, parameter: str, enabled: bool) -> Dict[str, Any]:
+        try:
+            board = int(parameter)
+            self.boards_enabled[board] = enabled
+        except (ValueError, IndexError):
+            return _status("E", f"Invalid board: {parameter}")
+        return self._ok(f"Board {board} {'enabled' if enabled else 'disabled'}")
+
+    def _cmd_enableboard(self, parameter: str) -> Dict[str, Any]:
+        return self._set_board(parameter, True)
+
+    def _cmd_disableboard(self, parameter: str) -> Dict[str, Any]:
+        return self._set_board(parameter, False)
+
+    def _cmd_powertargetset(self, parameter: str) -> Dict[str, Any]:
+        try:
+            self.power_target = int(parameter)
+        except ValueError:
+            return _status("E", f"Invalid power target: {parameter}")
+        return self._ok(f"Power target set to {self.power_target}W")
+
+    def _cmd_frequencyset(self, parameter: str) -> Dict[str, Any]:
+        try:
+            self.frequency_offset = int(parameter)
+        except ValueError:
+            return _status("E", f"Invalid frequency offset: {parameter}")
+        return self._ok(f"Frequency offset set to {self.frequency_offset}")
+
+    def _cmd_addpool(self, parameter: str) -> Dict[str, Any]:
+        fields = parameter.split(",")
+        if len(fields) < 2 or not fields[0]:
+            return _status("E", "Invalid pool parameters")
+        self.pools.append({"url": fields[0], "user": fields[1], "password": fields[2] if len(fields) > 2 else "x"})
+        return self._ok(f"Added pool {len(self.pools) - 1}")
+
+    def _cmd_switchpool(self, parameter: str) -> Dict[str, Any]:
+        try:
+            pool = int(parameter)
+            self.pools[pool]
+        except (ValueError, IndexError):
+            return _status("E", f"Invalid pool: {parameter}")
+        self.active_pool = pool
+        return self._ok(f"Switched to pool {pool}")
+
+    # Reads
+
+    def _cmd_version(self, parameter: str) -> Dict[str, Any]:
+        return self._ok(
+            "LUXminer versions",
+            VERSION=[{"LUXminer": self.firmware, "API": "3.7", "Type": self.model, "Miner": self.firmware}],
+        )
+
+    def _cmd_check(self, parameter: str) -> Dict[str, Any]:
+        exists = hasattr(self, f"_cmd_{parameter}") and parameter not in self.unsupported
+        return self._ok("Check", CHECK=[{"Exists": "Y" if exists else "N", "Access": "Y" if exists else "N"}])
+
+    def _cmd_config(self, parameter: str) -> Dict[str, Any]:
+        return self._ok(
+            "Config",
+            CONFIG=[{
+                "Profile": self.profile,
+                "IsAtmEnabled": self.atm_enabled,
+                "CurtailMode": "Sleep" if self.sleeping else "None",
+                "PowerTarget": self.power_target,
+                "ASC Count": len(self.boards_enabled),
+            }],
+        )
+
+    def _cmd_atm(self, parameter: str) -> Dict[str, Any]:
+        return self._ok(
+            "ATM configuration values",
+            ATM=[{"Enabled": self.atm_enabled, "MinProfile": "310MHz", "MaxProfile": "+2", "PostRampMinutes": 15}],
+        )
+
+    def _profile_entry(self, name: str) -> Dict[str, Any]:
+        profile = self.profiles[name]
+        return {
+            "Profile Name": name,
+            "Frequency": profile["frequency"],
+            "Watts": profile["watts"],
+            "Hashrate": profile["hashrate"],
+            "Voltage": profile["voltage"],
+            "Step": profile["step"],
+            "IsDynamic": False,
+        }
+
+    def _cmd_profiles(self, parameter: str) -> Dict[str, Any]:
+        return self._ok("Profiles", PROFILES=[self._profile_entry(name) for name in self.profiles])
+
+    def _cmd_profileget(self, parameter: str) -> Dict[str, Any]:
+        if parameter not in self.profiles:
+            return _status("E", f"Profile {parameter} not found")
+        return self._ok("Profile", PROFILE=[self._profile_entry(parameter)])
+
+    def _cmd_stats(self, parameter: str) -> Dict[str, Any]:
+        boards = range(len(self.boards_enabled))
+        ghs = sum(self.board_ghs(board) for board in boards)
+        temperatures = [self.board_temperature(board) for board in boards]
+        rpm = self._fan_rpm()
+        miner = {
+            "Elapsed": int(time.monotonic() - self._started),
+            "GHS 5s": round(ghs, 2),
+            "GHS av": round(ghs, 2),
+            "temp_max": max(temperatures),
+            **{f"temp{board + 1}": temperature for board, temperature in enumerate(temperatures)},
+            **{f"fan{fan + 1}": rpm for fan in range(4)},
+        }
+        return self._ok("Stats", STATS=[{"STATS": 0, "Type": self.model}, miner])
+
+    def _cmd_summary(self, parameter: str) -> Dict[str, Any]:
+        ghs = sum(self.board_ghs(board) for board in range(len(self.boards_enabled)))
+        return self._ok(
+            "Summary",
+            SUMMARY=[{"Elapsed": int(time.monotonic() - self._started), "GHS 5s": round(ghs, 2), "MHS 5s": round(ghs * 1000, 2)}],
+        )
+
+    def _cmd_devs(self, parameter: str) -> Dict[str, Any]:
+        return self._ok(
+            "Devices",
+            DEVS=[
+                {
+                    "ASC": board,
+                    "ID": board,
+                    "Name": "BTM",
+                    "Enabled": "Y" if enabled else "N",
+                    "Status": "Alive",
+                    "Temperature": self.board_temperature(board),
+                    "MHS 5s": round(self.board_ghs(board) * 1000, 2),
+                    "Profile": self.profile,
+                }
+                for board, enabled in enumerate(self.boards_enabled)
+            ],
+        )
+
+    def _cmd_power(self, parameter: str) -> Dict[str, Any]:
+        return self._ok("Power", POWER=[{"Watts": self.power_watts(), "PSU": True}])
+
+    def _cmd_temps(self, parameter: str) -> Dict[str, Any]:
+        temps = []
+        for board in range(len(self.boards_enabled)):
+            temperature = self.board_temperature(board)
+            temps.append({
+                "ID": board,
+                "Board": board,
+                "TopLeft": temperature - 2,
+                "TopRight": temperature,
+                "BottomLeft": temperature - 4,
+                "BottomRight": temperature - 1,
+            })
+        return self._ok("Temps", TEMPS=temps)
+
+    def _fan_rpm(self) -> int:
+        load = sum(self._board_load(board) for board in range(len(self.boards_enabled))) / len(self.boards_enabled)
+        return int(1500 + 3500 * load)
+
+    def _cmd_fans(self, parameter: str) -> Dict[str, Any]:
+        rpm = self._fan_rpm()
+        return self._ok("Fans", FANS=[{"ID": fan, "RPM": rpm, "Speed": round(rpm / 60)} for fan in range(4)])
+
+    def _cmd_pools(self, parameter: str) -> Dict[str, Any]:
+        return self._ok(
+            "Pools",
+            POOLS=[
+                {
+                    "POOL": index,
+                    "URL": pool["url"],
+                    "User": pool["user"],
+                    "Status": "Alive",
+                    "Priority": index,
+                    "Stratum Active": index == self.active_pool and self.mining,
+                }
+                for index, pool in enumerate(self.pools)
+            ],
+        )
+
+
+class LuxOSSimulator:
+    """TCP and HTTP front end of a ``SimulatedMiner`` with fault injection."""
+
+    def __init__(
+        self,
+        miner: Optional[SimulatedMiner] = None,
+        host: str = "127.0.0.1",
+        tcp_port: int = 4028,
+        http_port: Optional[int] = 8080,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the simulator.
+
+        Ports of 0 pick free ports on start; ``http_port=None`` serves TCP only.
+        """
+        self.miner = miner or SimulatedMiner()
+        self.host = host
+        self.tcp_port = tcp_port
+        self.http_port = http_port
+        # Seconds added to every reply, plus up to ``jitter`` at random
+        self.latency = latency
+        self.jitter = jitter
+        # Probabilities of an error reply, a truncated reply and a dropped connection
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.drop_rate = drop_rate
+        # Forced faults for the next N requests of a command: "fail", "malformed" or "drop"
+        self.faults: Dict[str, List[str]] = {}
+        self._random = random.Random(seed)
+
+        self.requests = {"tcp": 0, "http": 0}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._tcp_server: Optional[asyncio.AbstractServer] = None
+        self._http_runner: Optional[web.AppRunner] = None
+
+    def inject(self, command: str, fault: str, count: int = 1) -> None:
+        """Force a fault for the next ``count`` requests of a command."""
+        self.faults.setdefault(command, []).extend([fault] * count)
+
+    async def start(self) -> None:
+        """Start serving TCP and HTTP."""
+        self._tcp_server = await asyncio.start_server(self._handle_tcp, self.host, self.tcp_port)
+        self.tcp_port = self._tcp_server.sockets[0].getsockname()[1]
+        if self.http_port is None:
+            _LOGGER.info("Simulated LuxOS miner on %s (TCP %d)", self.host, self.tcp_port)
+            return
+
+        app = web.Application()
+        app.router.add_post("/api", self._handle_http)
+        self._http_runner = web.AppRunner(app, access_log=None)
+        await self._http_runner.setup()
+        site = web.TCPSite(self._http_runner, self.host, self.http_port)
+        await site.start()
+        self.http_port = site._server.sockets[0].getsockname()[1]
+        _LOGGER.info("Simulated LuxOS miner on %s (TCP %d, HTTP %d)", self.host, self.tcp_port, self.http_port)
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._tcp_server is not None:
+            self._tcp_server.close()
+            await self._tcp_server.wait_closed()
+            self._tcp_server = None
+        if self._http_runner is not None:
+            await self._http_runner.cleanup()
+            self._http_runner = None
+
+    async def __aenter__(self) -> "LuxOSSimulator":
+        """Start the simulator in an ``async with`` block."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Stop the simulator."""
+        await self.stop()
+
+    def _fault(self, command: str) -> Optional[str]:
+        """Return the fault to inject for this request, if any."""
+        forced = self.faults.get(command)
+        if forced:
+            return forced.pop(0)
+        roll = self._random.random()
+        for fault, rate in (("drop", self.drop_rate), ("malformed", self.malformed_rate), ("fail", self.failure_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    async def _respond(self, raw: bytes) -> Optional[bytes]:
+        """Return the JSON reply to a raw request, or None to drop it."""
+        self.bytes_in += len(raw)
+        try:
+            request = json.loads(raw.rstrip(b"\x00").decode("utf-8"))
+            command = str(request["command"])
+            parameter = str(request.get("parameter", ""))
+        except (ValueError, KeyError, TypeError):
+            return json.dumps(_status("E", "Invalid JSON")).encode()
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        fault = self._fault(command)
+        if fault == "drop":
+            return None
+        if fault == "fail":
+            return json.dumps(_status("E", f"Simulated failure of {command}")).encode()
+        reply = json.dumps(self.miner.handle(command, parameter)).encode()
+        if fault == "malformed":
+            return reply[: len(reply) // 2]
+        return reply
+
+    async def _handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one TCP request; LuxOS closes the connection after replying."""
+        self.requests["tcp"] += 1
+        raw = b""
+        try:
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                raw += chunk
+                try:
+                    json.loads(raw.rstrip(b"\x00"))
+                    break
+                except ValueError:
+                    continue
+            reply = await self._respond(raw)
+            if reply is not None:
+                writer.write(reply + b"\x00")
+                self.bytes_out += len(reply) + 1
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_http(self, request: web.Request) -> web.StreamResponse:
+        """Serve one HTTP ``/api`` request."""
+        self.requests["http"] += 1
+        reply = await self._respond(await request.read())
+        if reply is None:
+            raise web.HTTPServiceUnavailable()
+        self.bytes_out += len(reply)
+        return web.Response(body=reply, content_type="application/json")
+
+
+async def _async_serve(simulator: LuxOSSimulator) -> None:
+    """Run a simulator until cancelled."""
+    async with simulator:
+        await asyncio.Event().wait()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run a simulated LuxOS miner")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--tcp-port", type=int, default=4028, help="cgminer TCP API port")
+    parser.add_argument("--http-port", type=int, default=8080, help="HTTP API port")
+    parser.add_argument("--boards", type=int, default=DEFAULT_BOARDS, help="number of hashboards")
+    parser.add_argument("--firmware", default=DEFAULT_FIRMWARE, help="reported LUXminer version")
+    parser.add_argument("--unsupported", nargs="*", default=[], help="commands the firmware does not know")
+    parser.add_argument("--latency", type=float, default=0.0, help="reply latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency up to this (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of error replies")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of truncated replies")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of dropped connections")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for injected faults")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    simulator = LuxOSSimulator(
+        SimulatedMiner(firmware=args.firmware, boards=args.boards, unsupported=set(args.unsupported)),
+        host=args.host,
+        tcp_port=args.tcp_port,
+        http_port=args.http_port,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        malformed_rate=args.malformed_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(_async_serve(simulator))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Offline backtesting simulator for the solar control policy.
+
+Replays a historical solar power series (CSV or Home Assistant history
+JSON export) through the same filter, SolarPolicy and CurtailCostModel used
+by SolarPowerCoordinator, and reports mined TH, exported/imported kWh and
+switch count. Requires numpy.
+
+Usage:
+    python -m benchmarks.simulator history.csv [--profiles profiles.json]
+"""
+import argparse
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from custom_components.pv_miner.const import (
+    DEFAULT_SOLAR_FILTER_ALPHA,
+    DEFAULT_SOLAR_FILTER_WINDOW,
+    DEFAULT_SOLAR_MAX_AGE,
+    DEFAULT_SOLAR_SPIKE_MIN_WATTS,
+    DEFAULT_SOLAR_SPIKE_THRESHOLD,
+)
+from custom_components.pv_miner.curtail_cost import CHOICE_LOWEST, CHOICE_RIDE, CurtailCostModel
+from custom_components.pv_miner.profile_catalog import ProfileCatalog
+from custom_components.pv_miner.signal_filter import filter_series
+from custom_components.pv_miner.solar_policy import (
+    DEFAULT_RETUNE_SECONDS,
+    DEFAULT_WAKE_SECONDS,
+    SLEEP_PROFILE,
+    ProfileModel,
+    SolarPolicy,
+    default_profile_models,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Solar coordinator update interval (seconds)
+DEFAULT_DECISION_INTERVAL = 30
+
+DEFAULT_SLEEP_WATTS = 30  # control board draw while curtailed
+
+
+def load_profile_models(path: str) -> Dict[str, ProfileModel]:
+    """Load profile models from JSON.
+
+    Accepts either a raw LuxOS ``profiles`` response (``PROFILES`` list with
+    "Profile Name", "Watts", "Hashrate") or a list of objects with ``name``,
+    ``watts``, ``hashrate`` and optional ``retune_seconds``.
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+
+    entries = data.get("PROFILES", []) if isinstance(data, dict) else data
+    models = {}
+    for entry in entries:
+        name = entry.get("name", entry.get("Profile Name"))
+        if not name:
+            continue
+        models[name] = ProfileModel(
+            name,
+            float(entry.get("watts", entry.get("Watts", 0))),
+            float(entry.get("hashrate", entry.get("Hashrate", 0))),
+            float(entry.get("retune_seconds", DEFAULT_RETUNE_SECONDS)),
+        )
+    return models
+
+
+def _parse_timestamp(value: str) -> float:
+    """Parse an epoch or ISO-8601 timestamp to seconds."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def load_history(path: str) -> Tuple[Any, Any]:
+    """Load a solar power series from CSV or HA history JSON.
+
+    CSV may be a Home Assistant history download (``entity_id,state,last_changed``)
+    or any two-column ``timestamp,power`` file. Non-numeric states such as
+    ``unavailable`` are skipped. Returns sorted (timestamps, power) arrays.
+    """
+    import numpy as np
+
+    rows: List[Tuple[float, float]] = []
+
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        # /api/history/period returns one list of states per entity
+        states = data[0] if data and isinstance(data[0], list) else data
+        for state in states:
+            try:
+                rows.append((_parse_timestamp(state["last_changed"]), float(state["state"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+    else:
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = next(reader, None) or []
+            columns = [column.strip().lower() for column in header]
+            if "state" in columns and "last_changed" in columns:
+                time_col, value_col = columns.index("last_changed"), columns.index("state")
+            else:
+                time_col, value_col = 0, 1
+                # Headerless file - the first row is data
+                try:
+                    rows.append((_parse_timestamp(header[0]), float(header[1])))
+                except (IndexError, ValueError):
+                    pass
+            for row in reader:
+                try:
+                    rows.append((_parse_timestamp(row[time_col]), float(row[value_col])))
+                except (IndexError, ValueError):
+                    continue
+
+    if not rows:
+        raise ValueError(f"No numeric solar power samples found in {path}")
+
+    series = np.array(rows, dtype=float)
+    series = series[np.argsort(series[:, 0], kind="stable")]
+    return series[:, 0], series[:, 1]
+
+
+def simulate(
+    timestamps,
+    power,
+    policy: Optional[SolarPolicy] = None,
+    profiles: Optional[Dict[str, ProfileModel]] = None,
+    decision_interval: float = DEFAULT_DECISION_INTERVAL,
+    filter_window: int = DEFAULT_SOLAR_FILTER_WINDOW,
+    filter_alpha: float = DEFAULT_SOLAR_FILTER_ALPHA,
+    max_age: float = DEFAULT_SOLAR_MAX_AGE,
+    wake_seconds: float = DEFAULT_WAKE_SECONDS,
+    sleep_watts: float = DEFAULT_SLEEP_WATTS,
+    curtail_cost: bool = True,
+) -> Dict[str, Any]:
+    """Replay a solar power series through the solar control policy.
+
+    The coordinator is modelled as sampling the latest reading every
+    ``decision_interval`` seconds. Filtering, profile lookup and energy
+    accounting are vectorized; SolarPolicy.decide is only called at the
+    ticks where the desired state changes, which is exactly where the live
+    coordinator would issue a command. With ``curtail_cost`` the
+    CurtailCostModel sees every tick, as in the coordinator, and is asked on
+    each tick of a dip whether to sleep, drop to the lowest profile or ride
+    it out; without it the plain policy sleeps on every dip.
+    """
+    import numpy as np
+
+    policy = policy or SolarPolicy()
+    if profiles is None:
+        profiles = default_profile_models(policy)
+    missing = [name for name in policy.profiles if name not in profiles]
+    if missing:
+        raise ValueError(f"No profile model for: {', '.join(missing)}")
+
+    t = np.asarray(timestamps, dtype=float)
+    p = np.asarray(power, dtype=float)
+    if len(t) == 0:
+        raise ValueError("Empty solar power series")
+
+    # Coordinator ticks and the sample each tick reads; like the live
+    # coordinator, every tick feeds the filter, also with an unchanged value
+    ticks = np.arange(t[0], t[-1] + 1e-9, decision_interval)
+    sample_idx = np.searchsorted(t, ticks, side="right") - 1
+    filtered = filter_series(
+        p[sample_idx],
+        filter_window,
+        filter_alpha,
+        DEFAULT_SOLAR_SPIKE_THRESHOLD,
+        DEFAULT_SOLAR_SPIKE_MIN_WATTS,
+    )
+
+    # Desired state per tick: -1 sleep, otherwise index into policy.profiles
+    profile_idx = np.searchsorted(np.asarray(policy.thresholds, dtype=float), filtered, side="right") - 1
+    state = np.where(filtered < policy.sleep_threshold, -1, np.maximum(profile_idx, 0))
+
+    is_change = np.diff(state, prepend=-2) != 0
+
+    # Apply the real policy at each change point
+    event_times: List[float] = []
+    event_states: List[int] = []
+    event_latency: List[float] = []
+    current: Optional[str] = None
+    sleeps = wakes = 0
+    lowest = policy.profiles[0]
+    cost_model = CurtailCostModel(policy.sleep_threshold, wake_seconds=wake_seconds) if curtail_cost else None
+    if cost_model is None:
+        # Nothing happens between change points
+        steps = ((int(tick), float(ticks[tick]), float(filtered[tick]), True) for tick in np.flatnonzero(is_change))
+    else:
+        steps = zip(range(len(ticks)), ticks.tolist(), filtered.tolist(), is_change.tolist())
+    for tick, now, value, changed in steps:
+        if cost_model is not None:
+            cost_model.add_sample(now, value)
+            # While a dip is ridden the coordinator re-evaluates every tick
+            in_dip = value < policy.sleep_threshold and current in profiles
+            if not (changed or in_dip):
+                continue
+        decision = policy.decide(value, current)
+        if decision.profile == SLEEP_PROFILE and cost_model is not None and current in profiles:
+            choice = cost_model.choose(
+                now,
+                value,
+                profiles[current].watts,
+                profiles[lowest].watts,
+                at_lowest=current == lowest,
+            )
+            if choice == CHOICE_RIDE:
+                continue
+            if choice == CHOICE_LOWEST:
+                if current != lowest:
+                    current = lowest
+                    event_times.append(now)
+                    event_states.append(0)
+                    event_latency.append(profiles[lowest].retune_seconds)
+                continue
+        if decision.profile is None:
+            continue
+        if decision.profile == SLEEP_PROFILE:
+            latency = 0.0
+            new_state = -1
+            sleeps += 1
+        else:
+            model = profiles[decision.profile]
+            latency = wake_seconds if decision.wake else model.retune_seconds
+            new_state = policy.profiles.index(decision.profile)
+            wakes += decision.wake
+        current = decision.profile
+        event_times.append(now)
+        event_states.append(new_state)
+        event_latency.append(latency)
+
+    watts_table = np.array([profiles[name].watts for name in policy.profiles] + [sleep_watts, 0.0])
+    hash_table = np.array([profiles[name].hashrate for name in policy.profiles] + [0.0, 0.0])
+
+    # Map every sample onto the event governing it (-2 = before first decision)
+    ev_times = np.asarray(event_times)
+    ev_states = np.asarray(event_states + [-2], dtype=int)
+    ev_latency = np.asarray(event_latency)
+    ev_idx = np.searchsorted(ev_times, t, side="right") - 1
+    sample_state = ev_states[ev_idx]  # index -1 picks the trailing -2 sentinel
+    table_idx = np.where(sample_state >= 0, sample_state, len(policy.profiles) + (sample_state == -2))
+
+    miner_watts = watts_table[table_idx]
+    hashrate = hash_table[table_idx]
+    if len(ev_times):
+        since_event = t - ev_times[np.maximum(ev_idx, 0)]
+        retuning = (ev_idx >= 0) & (since_event < ev_latency[np.maximum(ev_idx, 0)])
+        hashrate = np.where(retuning, 0.0, hashrate)
+
+    # Integrate over sample intervals; gaps longer than max_age are not counted
+    dt = np.diff(t, append=t[-1] + decision_interval)
+    dt = np.minimum(dt, max_age)
+    surplus = p - miner_watts
+
+    return {
+        "duration_hours": round(float(dt.sum()) / 3600, 2),
+        "samples": int(len(t)),
+        "decisions": int(len(event_times)),
+        "mined_th": round(float(np.sum(hashrate * dt)), 1),
+        "solar_kwh": round(float(np.sum(np.clip(p, 0, None) * dt)) / 3.6e6, 3),
+        "consumed_kwh": round(float(np.sum(miner_watts * dt)) / 3.6e6, 3),
+        "exported_kwh": round(float(np.sum(np.clip(surplus, 0, None) * dt)) / 3.6e6, 3),
+        "imported_kwh": round(float(np.sum(np.clip(-surplus, 0, None) * dt)) / 3.6e6, 3),
+        "switch_count": max(0, len(event_times) - 1),
+        "sleep_count": sleeps,
+        "wake_count": int(wakes),
+        "ride_decisions": cost_model.decisions[CHOICE_RIDE] if cost_model else 0,
+        "lowest_profile_decisions": cost_model.decisions[CHOICE_LOWEST] if cost_model else 0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Backtest the PV Miner solar control policy")
+    parser.add_argument("history", help="CSV or HA history JSON export of the solar power sensor")
+    parser.add_argument("--profiles", help="JSON profile model (LuxOS 'profiles' response or list)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_DECISION_INTERVAL, help="decision interval (s)")
+    parser.add_argument("--sleep-threshold", type=float, default=None, help="sleep below this power (W)")
+    parser.add_argument("--window", type=int, default=DEFAULT_SOLAR_FILTER_WINDOW, help="median window (samples)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_SOLAR_FILTER_ALPHA, help="EWMA alpha")
+    parser.add_argument("--wake-seconds", type=float, default=DEFAULT_WAKE_SECONDS, help="wake latency (s)")
+    parser.add_argument(
+        "--no-curtail-cost",
+        action="store_true",
+        help="sleep on every dip instead of replaying the curtail cost model",
+    )
+    args = parser.parse_args(argv)
+
+    profiles = load_profile_models(args.profiles) if args.profiles else None
+    # Decide on the loaded profiles, as the coordinator does on the miner's catalog
+    policy = SolarPolicy(ProfileCatalog.from_models(profiles).policy_map()) if profiles else SolarPolicy()
+    if args.sleep_threshold is not None:
+        policy.sleep_threshold = args.sleep_threshold
+
+    timestamps, power = load_history(args.history)
+    report = simulate(
+        timestamps,
+        power,
+        policy=policy,
+        profiles=profiles,
+        decision_interval=args.interval,
+        filter_window=args.window,
+        filter_alpha=args.alpha,
+        wake_seconds=args.wake_seconds,
+        curtail_cost=not args.no_curtail_cost,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Battery state-of-charge aware power budget for the solar control."""
+import logging
+from typing import Any, Dict, Optional
+
+from .const import (
+    DEFAULT_BATTERY_FLOOR_SOC,
+    DEFAULT_BATTERY_MAX_CHARGE,
+    DEFAULT_BATTERY_MAX_DISCHARGE,
+    DEFAULT_BATTERY_MINE_SOC,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Budget modes
+MODE_CHARGE = "charge"
+MODE_MINE = "mine"
+MODE_DISCHARGE = "discharge"
+
+
+class BatteryBudget:
+    """Turn PV power and battery state into the watts the miners may draw.
+
+    SOC bands (with hysteresis between them):
+    - charge: until the battery reaches ``mine_soc`` it charges first; the
+      miners only get the PV power beyond ``max_charge_watts``
+    - mine: at or above ``mine_soc`` the miners get all PV power
+    - discharge: once mining has started the battery may supplement PV with
+      up to ``max_discharge_watts`` until it drops to ``floor_soc``; then the
+      budget returns to charge mode
+
+    While mining, battery discharge that neither the miner's own draw nor the
+    allowance explains (e.g. household loads on the battery) is taken off the
+    budget. The charge reserve is not corrected by the measured charge power:
+    the battery charges less whenever the miners draw more, so feeding it
+    back would make the budget chase its own effect.
+    """
+
+    def __init__(
+        self,
+        mine_soc: float = DEFAULT_BATTERY_MINE_SOC,
+        floor_soc: float = DEFAULT_BATTERY_FLOOR_SOC,
+        max_charge_watts: float = DEFAULT_BATTERY_MAX_CHARGE,
+        max_discharge_watts: float = DEFAULT_BATTERY_MAX_DISCHARGE,
+    ) -> None:
+        """Initialize the budget."""
+        if floor_soc >= mine_soc:
+            raise ValueError("floor_soc must be below mine_soc")
+        self.mine_soc = mine_soc
+        self.floor_soc = floor_soc
+        self.max_charge_watts = max_charge_watts
+        self.max_discharge_watts = max_discharge_watts
+
+        self._mining = False
+        self.mode: Optional[str] = None
+        self.soc: Optional[float] = None
+        self.budget: Optional[float] = None
+
+    def update(
+        self,
+        pv_watts: float,
+        soc: Optional[float],
+        battery_watts: Optional[float] = None,
+        miner_watts: Optional[float] = None,
+    ) -> float:
+        """Return the miner power budget.
+
+        ``battery_watts`` is the measured battery power, positive while
+        charging and negative while discharging; ``miner_watts`` is the
+        miners' measured draw. The discharge correction needs both. Without a
+        SOC reading the PV power is passed through unchanged.
+        """
+        self.soc = soc
+        if soc is None:
+            self.mode = None
+            self.budget = max(0.0, pv_watts)
+            return self.budget
+
+        previous_mode = self.mode
+        if soc >= self.mine_soc:
+            self._mining = True
+        elif soc <= self.floor_soc:
+            self._mining = False
+
+        if not self._mining:
+            self.mode = MODE_CHARGE
+            budget = pv_watts - self.max_charge_watts
+        else:
+            self.mode = MODE_MINE if soc >= self.mine_soc else MODE_DISCHARGE
+            allowance = self.max_discharge_watts if self.mode == MODE_DISCHARGE else 0.0
+            budget = pv_watts + allowance
+            if battery_watts is not None and miner_watts is not None:
+                # Discharge the miners' own draw does not account for
+                budget -= max(0.0, -battery_watts - miner_watts - allowance)
+
+        if self.mode != previous_mode:
+            _LOGGER.info("Battery at %.0f%% SOC - budget mode %s", soc, self.mode)
+
+        self.budget = max(0.0, budget)
+        return self.budget
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return budget state for state attributes."""
+        return {
+            "mode": self.mode,
+            "soc": self.soc,
+            "mine_soc": self.mine_soc,
+            "floor_soc": self.floor_soc,
+            "max_charge_watts": self.max_charge_watts,
+            "max_discharge_watts": self.max_discharge_watts,
+        }
@@ -0,0 +1,138 @@
+"""Per-firmware capability probe cached in Home Assistant storage."""
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CAP_ATM,
+    CAP_BATCH,
+    CAP_BOARD_CONTROL,
+    CAP_CURTAIL,
+    CAP_POWER_TARGET,
+    CAP_PROFILES,
+    DOMAIN,
+)
+from .luxos_api import LuxOSAPI, LuxOSAPIError
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.capabilities"
+SAVE_DELAY = 10  # seconds
+
+# Commands whose existence is checked with the cgminer "check" command
+CHECKED_COMMANDS = {
+    CAP_CURTAIL: "curtail",
+    CAP_BOARD_CONTROL: "enableboard",
+    CAP_POWER_TARGET: "powertargetset",
+}
+
+
+def _is_success(result: Dict[str, Any]) -> bool:
+    """Return True if a LuxOS reply reports STATUS S."""
+    status = result.get("STATUS")
+    return bool(status) and isinstance(status, list) and status[0].get("STATUS") == "S"
+
+
+async def _async_command_exists(api: LuxOSAPI, command: str) -> Optional[bool]:
+    """Ask the miner whether a command exists (None if it cannot tell)."""
+    try:
+        result = await api._execute_command("check", command)
+    except LuxOSAPIError:
+        return None
+    check = result.get("CHECK")
+    if not _is_success(result) or not check:
+        return None
+    return check[0].get("Exists") == "Y" and check[0].get("Access", "Y") == "Y"
+
+
+async def async_probe_capabilities(api: LuxOSAPI) -> Dict[str, Optional[bool]]:
+    """Probe what the miner's firmware supports without changing its state.
+
+    True and False are definite answers; None means unknown, in which case
+    the command is tried. Per-board control cannot be probed safely - even
+    where the command exists it may do nothing - so unless the firmware
+    rejects it, it is learned from the first verified board change.
+    """
+    capabilities: Dict[str, Optional[bool]] = {}
+
+    for capability, command in CHECKED_COMMANDS.items():
+        capabilities[capability] = await _async_command_exists(api, command)
+    if capabilities[CAP_BOARD_CONTROL]:
+        capabilities[CAP_BOARD_CONTROL] = None
+    # An unknown power-target command is never sent blindly
+    capabilities[CAP_POWER_TARGET] = capabilities[CAP_POWER_TARGET] or False
+
+    try:
+        result = await api._execute_command("version+config", "")
+        capabilities[CAP_BATCH] = "version" in result and "config" in result
+    except LuxOSAPIError:
+        capabilities[CAP_BATCH] = False
+
+    try:
+        capabilities[CAP_ATM] = bool((await api._execute_command("atm", "")).get("ATM"))
+    except LuxOSAPIError:
+        capabilities[CAP_ATM] = False
+
+    try:
+        capabilities[CAP_PROFILES] = bool((await api._execute_command("profiles", "")).get("PROFILES"))
+    except LuxOSAPIError:
+        capabilities[CAP_PROFILES] = False
+
+    _LOGGER.info("Capabilities of %s (firmware %s): %s", api.host, api.firmware_version, capabilities)
+    return capabilities
+
+
+class CapabilityStore:
+    """Capabilities per config entry, re-probed when the firmware changes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: Optional[Dict[str, Dict[str, Any]]] = None
+
+    async def async_cached(self, entry_id: str, firmware_version: Optional[str]) -> Optional[Dict[str, Optional[bool]]]:
+        """Return the stored capabilities of a miner on this firmware, if any."""
+        if self._data is None:
+            self._data = await self._store.async_load() or {}
+
+        cached = self._data.get(entry_id)
+        if cached and cached["firmware"] == firmware_version:
+            return dict(cached["capabilities"])
+        return None
+
+    async def async_capabilities(self, entry_id: str, api: LuxOSAPI) -> Dict[str, Optional[bool]]:
+        """Return the cached capabilities of a miner, probing on a new firmware."""
+        cached = await self.async_cached(entry_id, api.firmware_version)
+        if cached is not None:
+            _LOGGER.debug("Using cached capabilities for %s", api.host)
+            return cached
+
+        capabilities = await async_probe_capabilities(api)
+        self._data[entry_id] = {"firmware": api.firmware_version, "capabilities": capabilities}
+        await self._store.async_save(self._data)
+        return dict(capabilities)
+
+    @callback
+    def async_store(self, entry_id: str, firmware_version: Optional[str], capabilities: Dict[str, Optional[bool]]) -> None:
+        """Persist capabilities probed elsewhere (e.g. by the config flow)."""
+        if self._data is None:
+            self._data = {}
+        self._data[entry_id] = {"firmware": firmware_version, "capabilities": dict(capabilities)}
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    @callback
+    def async_learn(self, entry_id: str, capability: str, supported: bool) -> None:
+        """Persist a capability learned from a real command."""
+        if self._data is None or entry_id not in self._data:
+            return
+        self._data[entry_id]["capabilities"][capability] = supported
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget a removed config entry."""
+        if self._data is not None and self._data.pop(entry_id, None) is not None:
+            self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
@@ -0,0 +1,57 @@
+"""Profile catalog persisted per config entry and firmware version."""
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .luxos_api import LuxOSAPI
+from .profile_catalog import ProfileCatalog
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class ProfileCatalogCache:
+    """Serve a miner's profile catalog from storage and revalidate it live.
+
+    The stored catalog is only used while the miner runs the firmware it
+    was discovered on.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.profiles.{entry_id}")
+        self._details: Optional[Dict[str, Dict[str, Any]]] = None
+
+    async def async_load(self, firmware_version: Optional[str]) -> Optional[ProfileCatalog]:
+        """Return the stored catalog for this firmware, if any."""
+        data = await self._store.async_load()
+        if not data or data.get("firmware") != firmware_version:
+            return None
+        self._details = data["profiles"]
+        catalog = ProfileCatalog.from_details(self._details)
+        return catalog if catalog else None
+
+    async def async_revalidate(self, api: LuxOSAPI, served: ProfileCatalog) -> bool:
+        """Discover the profiles live and store them.
+
+        Returns True if the selectable profiles differ from ``served``, the
+        catalog the entry currently runs on (stored or built-in).
+        """
+        catalog = await api.discover_profiles()
+        if not catalog:
+            _LOGGER.debug("No profile details from %s, keeping the cached catalog", api.host)
+            return False
+        # Compare in the normalized form that is stored
+        details = catalog.as_details()
+        if details != self._details:
+            await self._store.async_save({"firmware": api.firmware_version, "profiles": details})
+            self._details = details
+        return catalog.names != served.names
+
+    async def async_remove(self) -> None:
+        """Delete the stored catalog."""
+        await self._store.async_remove()
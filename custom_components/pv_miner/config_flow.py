@@ -1,28 +1,54 @@
 """Config flow for PV Miner integration."""
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
+    CONF_BATTERY_CHARGE_ENTITY,
+    CONF_BATTERY_DISCHARGE_ENTITY,
+    CONF_BATTERY_FLOOR_SOC,
+    CONF_BATTERY_MAX_CHARGE,
+    CONF_BATTERY_MAX_DISCHARGE,
+    CONF_BATTERY_MINE_SOC,
+    CONF_BATTERY_SOC_ENTITY,
+    CONF_FORECAST_ENTITY,
+    CONF_HOSTS,
     CONF_MAX_POWER,
+    CONF_MINER_LIST,
     CONF_MIN_POWER,
+    CONF_NETWORK,
     CONF_PRIORITY,
     CONF_SCAN_INTERVAL,
     CONF_SOLAR_SCAN_INTERVAL,
+    CONF_THERMAL_LIMIT,
+    DEFAULT_BATTERY_FLOOR_SOC,
+    DEFAULT_BATTERY_MAX_CHARGE,
+    DEFAULT_BATTERY_MAX_DISCHARGE,
+    DEFAULT_BATTERY_MINE_SOC,
+    DEFAULT_FLEET_CONCURRENCY,
     DEFAULT_MAX_POWER,
     DEFAULT_MIN_POWER,
+    DEFAULT_NETWORK,
     DEFAULT_PASSWORD,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_SOLAR_SCAN_INTERVAL,
+    DEFAULT_THERMAL_LIMIT,
     DEFAULT_USERNAME,
     DOMAIN,
 )
+from .capabilities import async_probe_capabilities
+from .discovery import DiscoveredMiner, async_scan_network
+from .handoff import async_store_handoff
 from .luxos_api import LuxOSAPI, LuxOSAPIError
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,6 +60,18 @@ STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): cv.string,
 })
 
+STEP_DISCOVERY_DATA_SCHEMA = vol.Schema({
+    vol.Required(CONF_NETWORK, default=DEFAULT_NETWORK): cv.string,
+    vol.Required(CONF_USERNAME, default=DEFAULT_USERNAME): cv.string,
+    vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): cv.string,
+})
+
+STEP_BULK_DATA_SCHEMA = vol.Schema({
+    vol.Required(CONF_MINER_LIST): TextSelector(TextSelectorConfig(multiline=True)),
+    vol.Required(CONF_USERNAME, default=DEFAULT_USERNAME): cv.string,
+    vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): cv.string,
+})
+
 STEP_POWER_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_MIN_POWER, default=DEFAULT_MIN_POWER): cv.positive_int,
     vol.Required(CONF_MAX_POWER, default=DEFAULT_MAX_POWER): cv.positive_int,
@@ -46,9 +84,20 @@ STEP_INTERVALS_DATA_SCHEMA = vol.Schema({
 })
 
 
-async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate the user input allows us to connect."""
-    api = LuxOSAPI(data[CONF_HOST], data[CONF_USERNAME], data[CONF_PASSWORD])
+async def validate_input(
+    hass: HomeAssistant,
+    data: Dict[str, Any],
+    session: Optional[aiohttp.ClientSession] = None,
+    probe_capabilities: bool = False,
+) -> Dict[str, Any]:
+    """Validate the user input allows us to connect.
+
+    Several miners can be validated at once over one shared ``session``.
+    With ``probe_capabilities`` the firmware's capabilities are probed too
+    and handed to the setup of the new entry; bulk validation leaves them
+    to the background probe after setup.
+    """
+    api = LuxOSAPI(data[CONF_HOST], data[CONF_USERNAME], data[CONF_PASSWORD], session=session)
     
     try:
         _LOGGER.info("Testing connection to miner at %s", data[CONF_HOST])
@@ -59,22 +108,28 @@ async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str,
         
         _LOGGER.info("Connection successful, getting miner info...")
         
-        # Try to get miner info - but don't fail if this doesn't work
-        stats = None
-        devs = None
-        
-        try:
-            stats = await api.get_stats()
-        except LuxOSAPIError as e:
-            _LOGGER.warning("Could not get stats: %s", e)
-            
-        try:
-            devs = await api.get_devs()
-        except LuxOSAPIError as e:
-            _LOGGER.warning("Could not get devices: %s", e)
+        # Try to get miner info - but don't fail if this doesn't work.
+        stats, devs = await asyncio.gather(api.get_stats(), api.get_devs(), return_exceptions=True)
+        if isinstance(stats, LuxOSAPIError):
+            _LOGGER.warning("Could not get stats: %s", stats)
+            stats = None
+        if isinstance(devs, LuxOSAPIError):
+            _LOGGER.warning("Could not get devices: %s", devs)
+            devs = None
+        for result in (stats, devs):
+            if isinstance(result, BaseException):
+                raise result
+        capabilities = None
+        if probe_capabilities:
+            try:
+                capabilities = await async_probe_capabilities(api)
+            except LuxOSAPIError as e:
+                _LOGGER.warning("Could not probe capabilities: %s", e)
+        async_store_handoff(hass, api, capabilities)
         
         return {
             "title": data[CONF_NAME],
+            "firmware": api.firmware_version,
             "miner_info": {
                 "stats": stats,
                 "devices": devs
@@ -87,6 +142,102 @@ async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str,
         await api.close()
 
 
+def _miner_from_item(item: Any) -> Dict[str, Any]:
+    """Return host, name and optional credentials of one listed miner."""
+    if isinstance(item, dict):
+        host = item.get(CONF_HOST) or item.get("ip")
+        miner = {CONF_HOST: str(host).strip() if host else "", CONF_NAME: str(item.get(CONF_NAME) or "").strip()}
+        for key in (CONF_USERNAME, CONF_PASSWORD):
+            if item.get(key):
+                miner[key] = str(item[key])
+        return miner
+    return {CONF_HOST: str(item).strip(), CONF_NAME: ""}
+
+
+def parse_miner_list(text: str) -> List[Dict[str, Any]]:
+    """Parse a pasted miner list.
+
+    Accepts a YAML list (of hosts or of mappings with ``host``/``name`` and
+    optional ``username``/``password``), a YAML ``name: host`` mapping, or
+    CSV/semicolon separated lines of ``host,name[,username,password]``.
+    Raises ValueError if no miner can be read or an entry has no host.
+    """
+    # Only needed for bulk imports
+    import yaml
+
+    try:
+        loaded = yaml.safe_load(text)
+    except yaml.YAMLError:
+        loaded = None
+    if isinstance(loaded, dict) and isinstance(loaded.get("miners"), list):
+        loaded = loaded["miners"]
+
+    if isinstance(loaded, list):
+        items = [_miner_from_item(item) for item in loaded]
+    elif isinstance(loaded, dict):
+        items = [{CONF_HOST: str(host).strip(), CONF_NAME: str(name)} for name, host in loaded.items()]
+    else:
+        items = []
+        for line in text.splitlines():
+            fields = [field.strip() for field in line.replace(";", ",").split(",")]
+            if not fields[0] or fields[0].startswith("#") or fields[0].lower() in (CONF_HOST, "ip"):
+                continue
+            items.append(_miner_from_item(dict(zip((CONF_HOST, CONF_NAME, CONF_USERNAME, CONF_PASSWORD), fields))))
+
+    miners: Dict[str, Dict[str, Any]] = {}
+    for miner in items:
+        if not miner[CONF_HOST]:
+            raise ValueError(f"Miner without host: {miner}")
+        miner[CONF_NAME] = miner[CONF_NAME] or miner[CONF_HOST]
+        miners.setdefault(miner[CONF_HOST], miner)
+    if not miners:
+        raise ValueError("No miners listed")
+    return list(miners.values())
+
+
+async def async_validate_miners(
+    hass: HomeAssistant,
+    miners: List[Dict[str, Any]],
+    credentials: Dict[str, Any],
+    configured: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+    """Validate many miners concurrently over Home Assistant's HTTP session.
+
+    Returns one result per miner with ``ok`` and ``firmware`` or ``error``.
+    """
+    session = async_get_clientsession(hass)
+    semaphore = asyncio.Semaphore(DEFAULT_FLEET_CONCURRENCY)
+    skipped = set(configured)
+
+    async def _validate(miner: Dict[str, Any]) -> Dict[str, Any]:
+        result = {**miner, "ok": False}
+        if miner[CONF_HOST] in skipped:
+            result["error"] = "already configured"
+            return result
+        async with semaphore:
+            try:
+                info = await validate_input(hass, {**credentials, **miner}, session)
+            except Exception as e:  # pylint: disable=broad-except
+                result["error"] = str(e) or type(e).__name__
+                return result
+        result.update(ok=True, firmware=info["firmware"])
+        return result
+
+    return await asyncio.gather(*(_validate(miner) for miner in miners))
+
+
+def _results_table(results: List[Dict[str, Any]]) -> str:
+    """Render validation results as one markdown line per miner."""
+    lines = []
+    for result in results:
+        label = f"{result[CONF_NAME]} ({result[CONF_HOST]})"
+        if result["ok"]:
+            lines.append(f"- ✅ {label}: LuxOS {result['firmware']}")
+        else:
+            lines.append(f"- ❌ {label}: {result['error']}")
+    return "\n".join(lines)
+
+
 class PVMinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for PV Miner."""
 
@@ -95,14 +246,24 @@ class PVMinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self):
         """Initialize the config flow."""
         self._data = {}
+        # Miners found by the network scan, and the hosts/names to add
+        self._discovered: Dict[str, DiscoveredMiner] = {}
+        self._batch: List[Dict[str, Any]] = []
+        self._results: List[Dict[str, Any]] = []
 
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
-        """Handle the initial step."""
+        """Let the user add a miner by address or scan the network."""
+        return self.async_show_menu(step_id="user", menu_options=["manual", "discovery", "bulk"])
+
+    async def async_step_manual(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Add a miner by IP address or host name."""
         errors = {}
 
         if user_input is not None:
             try:
-                info = await validate_input(self.hass, user_input)
+                info = await validate_input(
+                    self.hass, user_input, async_get_clientsession(self.hass), probe_capabilities=True
+                )
                 self._data.update(user_input)
                 return await self.async_step_power()
             except LuxOSAPIError:
@@ -112,7 +273,7 @@ class PVMinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "unknown"
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
             description_placeholders={
@@ -121,6 +282,110 @@ class PVMinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
+    async def async_step_discovery(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Scan a network for LuxOS miners that are not configured yet."""
+        errors = {}
+
+        if user_input is not None:
+            configured = {entry.data.get(CONF_HOST) for entry in self._async_current_entries()}
+            try:
+                found = await async_scan_network(user_input[CONF_NETWORK], exclude=configured)
+            except ValueError:
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                if found:
+                    self._data.update({
+                        CONF_USERNAME: user_input[CONF_USERNAME],
+                        CONF_PASSWORD: user_input[CONF_PASSWORD],
+                    })
+                    self._discovered = {miner.host: miner for miner in found}
+                    return await self.async_step_select()
+                errors["base"] = "no_miners_found"
+
+        return self.async_show_form(
+            step_id="discovery",
+            data_schema=self.add_suggested_values_to_schema(STEP_DISCOVERY_DATA_SCHEMA, user_input),
+            errors=errors,
+        )
+
+    async def async_step_select(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Pick the discovered miners to add."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_HOSTS]:
+                self._batch = [
+                    {CONF_HOST: host, CONF_NAME: self._discovered[host].name}
+                    for host in user_input[CONF_HOSTS]
+                ]
+                return await self.async_step_validate()
+            errors["base"] = "no_miners_selected"
+
+        miners = {host: miner.label for host, miner in self._discovered.items()}
+        return self.async_show_form(
+            step_id="select",
+            data_schema=vol.Schema({
+                vol.Required(CONF_HOSTS, default=list(miners)): cv.multi_select(miners),
+            }),
+            errors=errors,
+            description_placeholders={"count": str(len(miners))},
+        )
+
+    async def async_step_bulk(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Add many miners from a pasted YAML or CSV list."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                self._batch = parse_miner_list(user_input[CONF_MINER_LIST])
+            except ValueError:
+                errors[CONF_MINER_LIST] = "invalid_miner_list"
+            else:
+                self._data.update({
+                    CONF_USERNAME: user_input[CONF_USERNAME],
+                    CONF_PASSWORD: user_input[CONF_PASSWORD],
+                })
+                return await self.async_step_validate()
+
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=self.add_suggested_values_to_schema(STEP_BULK_DATA_SCHEMA, user_input),
+            errors=errors,
+        )
+
+    async def async_step_validate(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Validate all listed miners at once and show the result per miner."""
+        if user_input is not None:
+            # Listed credentials override the ones entered for all miners
+            self._batch = [
+                {
+                    CONF_USERNAME: result.get(CONF_USERNAME, self._data[CONF_USERNAME]),
+                    CONF_PASSWORD: result.get(CONF_PASSWORD, self._data[CONF_PASSWORD]),
+                    CONF_HOST: result[CONF_HOST],
+                    CONF_NAME: result[CONF_NAME],
+                }
+                for result in self._results
+                if result["ok"]
+            ]
+            if not self._batch:
+                return await self.async_step_user()
+            self._data.update(self._batch[0])
+            return await self.async_step_power()
+
+        configured = {entry.data.get(CONF_HOST) for entry in self._async_current_entries()}
+        self._results = await async_validate_miners(self.hass, self._batch, self._data, configured)
+        passed = sum(result["ok"] for result in self._results)
+        return self.async_show_form(
+            step_id="validate",
+            data_schema=vol.Schema({}),
+            errors={} if passed else {"base": "no_valid_miners"},
+            description_placeholders={
+                "passed": str(passed),
+                "total": str(len(self._results)),
+                "results": _results_table(self._results),
+            },
+        )
+
     async def async_step_power(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Configure power settings."""
         errors = {}
@@ -146,6 +411,16 @@ class PVMinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             self._data.update(user_input)
             
+            # Further discovered miners share these settings
+            for miner in self._batch[1:]:
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_IMPORT},
+                        data={**self._data, **miner},
+                    )
+                )
+
             # Check for existing entries
             await self.async_set_unique_id(self._data[CONF_HOST])
             self._abort_if_unique_id_configured()
@@ -163,6 +438,12 @@ class PVMinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
+    async def async_step_import(self, import_data: Dict[str, Any]) -> FlowResult:
+        """Create an entry for a miner added together with others."""
+        await self.async_set_unique_id(import_data[CONF_HOST])
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=import_data[CONF_NAME], data=import_data)
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -179,8 +460,14 @@ class PVMinerOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Manage the options."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if user_input.get(CONF_BATTERY_FLOOR_SOC, DEFAULT_BATTERY_FLOOR_SOC) >= user_input.get(
+                CONF_BATTERY_MINE_SOC, DEFAULT_BATTERY_MINE_SOC
+            ):
+                errors["base"] = "invalid_soc_bands"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         options_schema = vol.Schema({
             vol.Optional(
@@ -203,9 +490,46 @@ class PVMinerOptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_PRIORITY,
                 default=self.config_entry.options.get(CONF_PRIORITY, 1)
             ): cv.positive_int,
+            vol.Optional(
+                CONF_FORECAST_ENTITY,
+                description={"suggested_value": self.config_entry.options.get(CONF_FORECAST_ENTITY)},
+            ): cv.string,
+            vol.Optional(
+                CONF_THERMAL_LIMIT,
+                default=self.config_entry.options.get(CONF_THERMAL_LIMIT, DEFAULT_THERMAL_LIMIT)
+            ): vol.All(vol.Coerce(int), vol.Range(min=50, max=95)),
+            vol.Optional(
+                CONF_BATTERY_SOC_ENTITY,
+                description={"suggested_value": self.config_entry.options.get(CONF_BATTERY_SOC_ENTITY)},
+            ): cv.string,
+            vol.Optional(
+                CONF_BATTERY_CHARGE_ENTITY,
+                description={"suggested_value": self.config_entry.options.get(CONF_BATTERY_CHARGE_ENTITY)},
+            ): cv.string,
+            vol.Optional(
+                CONF_BATTERY_DISCHARGE_ENTITY,
+                description={"suggested_value": self.config_entry.options.get(CONF_BATTERY_DISCHARGE_ENTITY)},
+            ): cv.string,
+            vol.Optional(
+                CONF_BATTERY_MINE_SOC,
+                default=self.config_entry.options.get(CONF_BATTERY_MINE_SOC, DEFAULT_BATTERY_MINE_SOC)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+            vol.Optional(
+                CONF_BATTERY_FLOOR_SOC,
+                default=self.config_entry.options.get(CONF_BATTERY_FLOOR_SOC, DEFAULT_BATTERY_FLOOR_SOC)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=99)),
+            vol.Optional(
+                CONF_BATTERY_MAX_CHARGE,
+                default=self.config_entry.options.get(CONF_BATTERY_MAX_CHARGE, DEFAULT_BATTERY_MAX_CHARGE)
+            ): cv.positive_int,
+            vol.Optional(
+                CONF_BATTERY_MAX_DISCHARGE,
+                default=self.config_entry.options.get(CONF_BATTERY_MAX_DISCHARGE, DEFAULT_BATTERY_MAX_DISCHARGE)
+            ): cv.positive_int,
         })
 
         return self.async_show_form(
             step_id="init",
-            data_schema=options_schema
+            data_schema=options_schema,
+            errors=errors,
         )
\ No newline at end of file
@@ -12,6 +12,18 @@ CONF_SOLAR_SCAN_INTERVAL = "solar_scan_interval"
 CONF_MIN_POWER = "min_power"
 CONF_MAX_POWER = "max_power"
 CONF_PRIORITY = "priority"
+CONF_FORECAST_ENTITY = "forecast_entity"
+CONF_THERMAL_LIMIT = "thermal_limit"
+CONF_BATTERY_SOC_ENTITY = "battery_soc_entity"
+CONF_BATTERY_CHARGE_ENTITY = "battery_charge_entity"
+CONF_BATTERY_DISCHARGE_ENTITY = "battery_discharge_entity"
+CONF_BATTERY_MINE_SOC = "battery_mine_soc"
+CONF_BATTERY_FLOOR_SOC = "battery_floor_soc"
+CONF_BATTERY_MAX_CHARGE = "battery_max_charge"
+CONF_BATTERY_MAX_DISCHARGE = "battery_max_discharge"
+CONF_NETWORK = "network"
+CONF_HOSTS = "hosts"
+CONF_MINER_LIST = "miner_list"
 
 # Default values
 DEFAULT_USERNAME = "root"
@@ -20,6 +32,36 @@ DEFAULT_SCAN_INTERVAL = 30
 DEFAULT_SOLAR_SCAN_INTERVAL = 600  # 10 minutes
 DEFAULT_MIN_POWER = 500
 DEFAULT_MAX_POWER = 4200
+DEFAULT_NETWORK = "192.168.1.0/24"  # subnet scanned for LuxOS miners
+DEFAULT_THERMAL_LIMIT = 75  # °C, hottest hashboard temperature to stay below
+SETUP_TIME_BUDGET = 2.0  # seconds a config entry setup may take before warning
+IMPORT_TIME_BUDGET = 0.25  # seconds for importing the integration package
+
+# Battery budget
+DEFAULT_BATTERY_MINE_SOC = 90  # % SOC from which the miners get all PV power
+DEFAULT_BATTERY_FLOOR_SOC = 30  # % SOC down to which mining may discharge the battery
+DEFAULT_BATTERY_MAX_CHARGE = 3000  # W reserved for charging below the mining band
+DEFAULT_BATTERY_MAX_DISCHARGE = 2500  # W the miners may draw from the battery
+
+# Solar signal conditioning
+DEFAULT_SOLAR_FILTER_WINDOW = 5  # samples in the rolling median
+DEFAULT_SOLAR_FILTER_ALPHA = 0.5  # EWMA smoothing factor applied after the median
+DEFAULT_SOLAR_SPIKE_THRESHOLD = 0.5  # reject samples deviating >50% from the median
+DEFAULT_SOLAR_SPIKE_MIN_WATTS = 300  # ...but never flag deviations below 300W
+DEFAULT_SOLAR_MAX_AGE = 600  # seconds without a reported reading before the signal is stale
+
+# Firmware capabilities (probed once per firmware version)
+CAP_BATCH = "batch_commands"
+CAP_BOARD_CONTROL = "board_control"
+CAP_CURTAIL = "curtail"
+CAP_ATM = "atm"
+CAP_PROFILES = "profiles"
+CAP_POWER_TARGET = "power_target"
+DATA_CAPABILITIES = f"{DOMAIN}_capabilities"
+
+# Connection verified by the config flow, picked up by the first setup
+DATA_HANDOFF = f"{DOMAIN}_handoff"
+HANDOFF_TTL = 300  # seconds
 
 # LuxOS API endpoints
 LUXOS_LOGIN_ENDPOINT = "/cgi-bin/luxcgi"
@@ -64,6 +106,13 @@ SERVICE_SET_POOL = "set_pool"
 SERVICE_SLEEP_MINER = "sleep_miner"
 SERVICE_WAKE_MINER = "wake_miner"
 
+# Maximum number of miners a service call talks to at once
+DEFAULT_FLEET_CONCURRENCY = 32
+
+# Service power presets (W)
+SOLAR_MAX_POWER = 4200
+ECO_MODE_POWER = 1500
+
 # Notification types
 NOTIFICATION_ERROR = "pv_miner_error"
 NOTIFICATION_WARNING = "pv_miner_warning"
@@ -0,0 +1,221 @@
+"""Sleep/wake cost model for riding through short solar dips."""
+import logging
+from collections import deque
+from statistics import median, pstdev
+from typing import Any, Dict, Optional
+
+from .solar_policy import DEFAULT_RETUNE_SECONDS, DEFAULT_WAKE_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Curtail choices
+CHOICE_SLEEP = "sleep"
+CHOICE_LOWEST = "lowest_profile"
+CHOICE_RIDE = "ride"
+
+# Fraction of the profile hashrate that counts as "fully awake"
+WAKE_HASHRATE_RATIO = 0.9
+# Relative sample-to-sample variation above which the signal counts as cloudy
+VOLATILE_CV = 0.1
+# Dip length assumed for a volatile signal before any dip has been observed
+DEFAULT_SHORT_DIP_SECONDS = 300
+# Never ride a dip for longer than this before sleeping
+DEFAULT_MAX_RIDE_SECONDS = 900
+# Completed dips older than this no longer inform the estimate
+DIP_MEMORY_SECONDS = 7200
+
+
+class CurtailCostModel:
+    """Decide between sleeping, dropping to the lowest profile, or riding a dip.
+
+    All options are compared in Wh:
+    - sleep: energy drawn without hashing while the boards re-initialize
+      (measured wake-to-full-hashrate time x profile power)
+    - lowest profile: grid import at the lowest profile for the expected dip
+      plus the re-tune down and back up
+    - ride: grid import at the current profile for the expected dip
+
+    The expected dip length comes from recently observed dips, or from the
+    volatility of the filtered solar signal when no dip has completed yet.
+    A smooth decline (sunset) has no expected end and always sleeps.
+    """
+
+    def __init__(
+        self,
+        sleep_threshold: float,
+        wake_seconds: float = DEFAULT_WAKE_SECONDS,
+        retune_seconds: float = DEFAULT_RETUNE_SECONDS,
+        max_ride_seconds: float = DEFAULT_MAX_RIDE_SECONDS,
+        volatility_window: int = 20,
+    ) -> None:
+        """Initialize the cost model."""
+        self.sleep_threshold = sleep_threshold
+        self.default_wake_seconds = wake_seconds
+        self.retune_seconds = retune_seconds
+        self.max_ride_seconds = max_ride_seconds
+
+        self._power_samples: deque = deque(maxlen=volatility_window)
+        self._dips: deque = deque(maxlen=20)  # (end time, duration)
+        self._wake_samples: deque = deque(maxlen=10)
+        self._dip_started: Optional[float] = None
+        self._wake_started: Optional[float] = None
+
+        # Bookkeeping for the dip currently being ridden
+        self._riding = False
+        self._ride_watts = 0.0
+        self._ride_sleep_cost_wh = 0.0
+        self._ride_import_wh = 0.0
+        self._last_choice_time: Optional[float] = None
+        self._dip_choice: Optional[str] = None
+
+        self.decisions: Dict[str, int] = {CHOICE_SLEEP: 0, CHOICE_LOWEST: 0, CHOICE_RIDE: 0}
+        self.energy_saved_wh = 0.0
+        self.last_choice: Optional[str] = None
+
+    @property
+    def wake_seconds(self) -> float:
+        """Return the measured (or default) wake-to-full-hashrate time."""
+        if self._wake_samples:
+            return median(self._wake_samples)
+        return self.default_wake_seconds
+
+    @property
+    def volatility(self) -> Optional[float]:
+        """Return the spread of sample-to-sample changes relative to mean power.
+
+        Using changes rather than levels keeps a smooth sunset ramp at ~0
+        while passing clouds score high.
+        """
+        if len(self._power_samples) < 3:
+            return None
+        mean = sum(self._power_samples) / len(self._power_samples)
+        if mean <= 0:
+            return None
+        samples = list(self._power_samples)
+        changes = [later - earlier for earlier, later in zip(samples, samples[1:])]
+        return pstdev(changes) / mean
+
+    def add_sample(self, timestamp: float, watts: float) -> None:
+        """Track filtered power to learn dip durations and volatility."""
+        self._power_samples.append(watts)
+        below = watts < self.sleep_threshold
+        if below and self._dip_started is None:
+            self._dip_started = timestamp
+        elif not below and self._dip_started is not None:
+            self._dips.append((timestamp, timestamp - self._dip_started))
+            self._dip_started = None
+            self._dip_choice = None
+            if self._riding:
+                self._accumulate_import(timestamp, watts)
+                # Rode the dip out without a wake cycle
+                self.energy_saved_wh += self._ride_sleep_cost_wh - self._ride_import_wh
+                self._end_ride()
+
+    def _accumulate_import(self, now: float, available_watts: float) -> None:
+        """Add grid import drawn while riding since the last evaluation."""
+        if self._last_choice_time is not None:
+            elapsed = now - self._last_choice_time
+            self._ride_import_wh += max(0.0, self._ride_watts - available_watts) * elapsed / 3600
+        self._last_choice_time = now
+
+    def _end_ride(self) -> None:
+        """Reset the ride bookkeeping."""
+        self._riding = False
+        self._ride_import_wh = 0.0
+        self._last_choice_time = None
+
+    def expected_dip_seconds(self, now: float) -> Optional[float]:
+        """Return the expected remaining dip length, or None if no end is expected."""
+        recent = [duration for end, duration in self._dips if now - end <= DIP_MEMORY_SECONDS]
+        if recent:
+            typical = median(recent)
+        elif self.volatility is not None and self.volatility >= VOLATILE_CV:
+            typical = DEFAULT_SHORT_DIP_SECONDS
+        else:
+            return None
+        elapsed = now - self._dip_started if self._dip_started is not None else 0.0
+        # A dip that outlasted the typical length is expected to last that long again
+        remaining = typical - elapsed
+        return remaining if remaining > 0 else typical
+
+    def wake_started(self, timestamp: float) -> None:
+        """Mark the start of a wake cycle."""
+        self._wake_started = timestamp
+
+    def observe_hashrate(self, timestamp: float, hashrate: Optional[float], expected: float) -> None:
+        """Record the wake time once hashrate reaches the expected level."""
+        if self._wake_started is None or hashrate is None or expected <= 0:
+            return
+        if hashrate >= expected * WAKE_HASHRATE_RATIO:
+            duration = timestamp - self._wake_started
+            self._wake_samples.append(duration)
+            self._wake_started = None
+            _LOGGER.debug("Measured wake-to-full-hashrate time: %.0fs", duration)
+
+    def choose(
+        self,
+        now: float,
+        available_watts: float,
+        current_watts: float,
+        lowest_watts: float,
+        at_lowest: bool = False,
+    ) -> str:
+        """Return the cheapest curtail option for the current dip.
+
+        Called on every update while power is below the sleep threshold.
+        Decisions are counted once per change, and the energy saved versus
+        sleeping is booked when a ridden dip ends.
+        """
+        if self._riding:
+            self._accumulate_import(now, available_watts)
+
+        dip = self.expected_dip_seconds(now)
+        riding_for = now - self._dip_started if self._dip_started is not None else 0.0
+
+        if dip is None or riding_for >= self.max_ride_seconds:
+            choice = CHOICE_SLEEP
+        else:
+            sleep_cost = current_watts * self.wake_seconds / 3600
+            ride_cost = max(0.0, current_watts - available_watts) * dip / 3600
+            lowest_cost = max(0.0, lowest_watts - available_watts) * dip / 3600
+            if not at_lowest:
+                lowest_cost += (lowest_watts + current_watts) * self.retune_seconds / 3600
+            options = {
+                CHOICE_SLEEP: sleep_cost,
+                CHOICE_LOWEST: lowest_cost,
+                CHOICE_RIDE: ride_cost,
+            }
+            choice = min(options, key=options.get)
+            if not self._riding and choice != CHOICE_SLEEP:
+                self._riding = True
+                self._ride_sleep_cost_wh = sleep_cost
+                self._last_choice_time = now
+            if choice == CHOICE_LOWEST:
+                self._ride_watts = lowest_watts
+            elif choice == CHOICE_RIDE:
+                self._ride_watts = current_watts
+
+        if choice == CHOICE_SLEEP and self._riding:
+            # The ride ended in a sleep after all - its import bought nothing
+            self.energy_saved_wh -= self._ride_import_wh
+            self._end_ride()
+
+        if choice != self._dip_choice:
+            self.decisions[choice] += 1
+            _LOGGER.debug("Curtail decision: %s (expected dip %s s)", choice, dip)
+        self._dip_choice = choice
+        self.last_choice = choice
+        return choice
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return cost model diagnostics for state attributes."""
+        return {
+            "last_choice": self.last_choice,
+            "sleep_decisions": self.decisions[CHOICE_SLEEP],
+            "lowest_profile_decisions": self.decisions[CHOICE_LOWEST],
+            "ride_decisions": self.decisions[CHOICE_RIDE],
+            "wake_seconds": round(self.wake_seconds),
+            "measured_wakes": len(self._wake_samples),
+            "volatility": round(self.volatility, 3) if self.volatility is not None else None,
+            "energy_saved_wh": round(self.energy_saved_wh, 1),
+        }
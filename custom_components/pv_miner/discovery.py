@@ -0,0 +1,122 @@
+"""Subnet scan for LuxOS miners on the cgminer API port."""
+import asyncio
+import ipaddress
+import json
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+API_PORT = 4028
+SCAN_CONCURRENCY = 128
+CONNECT_TIMEOUT = 0.5  # seconds, LAN hosts answer well within this
+REPLY_TIMEOUT = 2.0
+# Largest network scanned at once (a /22)
+MAX_SCAN_HOSTS = 1024
+
+
+class DiscoveredMiner(NamedTuple):
+    """A LuxOS miner answering on the API port."""
+
+    host: str
+    firmware: str
+    model: Optional[str]
+    hostname: Optional[str]
+
+    @property
+    def name(self) -> str:
+        """Return a default entry name, preferring the host name."""
+        if self.hostname:
+            return self.hostname.split(".")[0]
+        return f"{self.model or 'Miner'} {self.host}"
+
+    @property
+    def label(self) -> str:
+        """Return the text shown in the selection list."""
+        details = ", ".join(part for part in (self.model, f"LuxOS {self.firmware}") if part)
+        return f"{self.name} ({self.host}, {details})"
+
+
+def scan_hosts(network: str, exclude: Iterable[str] = ()) -> List[str]:
+    """Return the host addresses of a CIDR network, minus excluded ones.
+
+    Raises ValueError for an invalid or too large network.
+    """
+    net = ipaddress.ip_network(network.strip(), strict=False)
+    if net.num_addresses > MAX_SCAN_HOSTS + 2:
+        raise ValueError(f"{network} has more than {MAX_SCAN_HOSTS} hosts")
+    skipped = set(exclude)
+    return [str(host) for host in net.hosts() if str(host) not in skipped]
+
+
+def _parse_version(raw: bytes) -> Optional[Dict[str, Any]]:
+    """Return the VERSION record of a LuxOS ``version`` reply."""
+    try:
+        reply = json.loads(raw.rstrip(b"\x00").decode("utf-8", errors="ignore"))
+    except ValueError:
+        return None
+    versions = reply.get("VERSION") if isinstance(reply, dict) else None
+    if not versions or not isinstance(versions, list) or "LUXminer" not in versions[0]:
+        return None
+    return versions[0]
+
+
+async def _async_hostname(host: str) -> Optional[str]:
+    """Return the reverse DNS name of a host, if it has one."""
+    loop = asyncio.get_running_loop()
+    try:
+        name, _ = await asyncio.wait_for(loop.getnameinfo((host, 0)), REPLY_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    return None if name == host else name
+
+
+async def async_probe_host(
+    host: str,
+    port: int = API_PORT,
+    connect_timeout: float = CONNECT_TIMEOUT,
+    reply_timeout: float = REPLY_TIMEOUT,
+) -> Optional[DiscoveredMiner]:
+    """Fingerprint a host with ``version``; None unless it runs LuxOS."""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), connect_timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    try:
+        writer.write(json.dumps({"command": "version", "parameter": ""}).encode())
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), reply_timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        writer.close()
+
+    version = _parse_version(raw)
+    if version is None:
+        _LOGGER.debug("%s:%s answers but is not running LuxOS", host, port)
+        return None
+    return DiscoveredMiner(host, str(version["LUXminer"]), version.get("Type"), await _async_hostname(host))
+
+
+async def async_scan_network(
+    network: str,
+    exclude: Iterable[str] = (),
+    port: int = API_PORT,
+    concurrency: int = SCAN_CONCURRENCY,
+) -> List[DiscoveredMiner]:
+    """Scan a CIDR network concurrently for LuxOS miners.
+
+    Hosts in ``exclude`` (e.g. already configured miners) are not probed.
+    Raises ValueError for an invalid or too large network.
+    """
+    hosts = scan_hosts(network, exclude)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _probe(host: str) -> Optional[DiscoveredMiner]:
+        async with semaphore:
+            return await async_probe_host(host, port)
+
+    found = [miner for miner in await asyncio.gather(*(_probe(host) for host in hosts)) if miner]
+    _LOGGER.info("Found %d LuxOS miners in %s (%d hosts scanned)", len(found), network, len(hosts))
+    return found
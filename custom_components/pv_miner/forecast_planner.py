@@ -0,0 +1,248 @@
+"""Forecast-aware profile planner for the solar coordinator."""
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .solar_policy import (
+    DEFAULT_WAKE_SECONDS,
+    SLEEP_PROFILE,
+    ProfileModel,
+    SolarPolicy,
+    default_profile_models,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Planning defaults
+DEFAULT_PLANNER_HORIZON_HOURS = 12
+DEFAULT_PLANNER_SLOT_MINUTES = 15
+DEFAULT_PLANNER_REPLAN_INTERVAL = 900  # seconds between schedule rebuilds
+# Mined TH that one kWh of grid import is worth giving up. Above the best
+# TH/kWh any supported miner achieves, so importing only pays off when it
+# avoids a costly re-tune or wake cycle.
+DEFAULT_IMPORT_PENALTY_TH_PER_KWH = 250000
+# Forecast/measurement mismatch beyond which the plan is ignored
+DEFAULT_PLAN_TOLERANCE = 0.5
+
+
+class PlanSlot(NamedTuple):
+    """One slot of the profile schedule."""
+
+    start: float  # epoch seconds
+    end: float
+    forecast_watts: float
+    profile: str  # LuxOS profile name or SLEEP_PROFILE
+    planned_watts: float
+
+
+def _to_timestamp(value: Any) -> float:
+    """Convert an ISO string, datetime or epoch number to epoch seconds."""
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, (int, float)):
+        return float(value)
+    else:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def parse_forecast(data: Any) -> List[Tuple[float, float]]:
+    """Parse a PV forecast into sorted (epoch seconds, watts) points.
+
+    Accepted shapes:
+    - Solcast attributes: ``detailedForecast``/``detailedHourly``/``forecast``
+      lists with ``period_start`` and ``pv_estimate`` (kW)
+    - Forecast.Solar style: ``watts`` mapping of ISO timestamp -> W
+    - A plain list of ``{"time"|"datetime"|"period_start": ..., "watts"|"power": ...}``
+    """
+    if isinstance(data, dict):
+        if isinstance(data.get("watts"), dict):
+            points = [(_to_timestamp(key), float(value)) for key, value in data["watts"].items()]
+            return sorted(points)
+        for key in ("detailedForecast", "detailedHourly", "forecast"):
+            if isinstance(data.get(key), list):
+                return parse_forecast(data[key])
+        return []
+
+    points = []
+    for entry in data or []:
+        if not isinstance(entry, dict):
+            continue
+        start = entry.get("period_start", entry.get("datetime", entry.get("time")))
+        if start is None:
+            continue
+        try:
+            if "pv_estimate" in entry:
+                watts = float(entry["pv_estimate"]) * 1000
+            else:
+                watts = float(entry.get("watts", entry.get("power")))
+            points.append((_to_timestamp(start), watts))
+        except (TypeError, ValueError):
+            continue
+    return sorted(points)
+
+
+def load_forecast_file(path: str) -> List[Tuple[float, float]]:
+    """Load a forecast from a local JSON file (same shapes as parse_forecast)."""
+    with open(path, encoding="utf-8") as file:
+        return parse_forecast(json.load(file))
+
+
+def forecast_at(points: List[Tuple[float, float]], timestamp: float) -> Optional[float]:
+    """Linearly interpolate the forecast at a timestamp (None outside the series)."""
+    if not points or timestamp < points[0][0] or timestamp > points[-1][0]:
+        return None
+    for (t0, w0), (t1, w1) in zip(points, points[1:]):
+        if t0 <= timestamp <= t1:
+            if t1 == t0:
+                return w1
+            return w0 + (w1 - w0) * (timestamp - t0) / (t1 - t0)
+    return points[-1][1]
+
+
+class ForecastPlanner:
+    """Precompute a profile schedule that maximizes mined TH minus grid import.
+
+    The schedule is solved with dynamic programming over forecast slots and
+    miner states (sleep + every profile), charging re-tune and wake latency
+    as lost hashrate on every transition.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[SolarPolicy] = None,
+        profiles: Optional[Dict[str, ProfileModel]] = None,
+        horizon_hours: float = DEFAULT_PLANNER_HORIZON_HOURS,
+        slot_minutes: float = DEFAULT_PLANNER_SLOT_MINUTES,
+        import_penalty: float = DEFAULT_IMPORT_PENALTY_TH_PER_KWH,
+        wake_seconds: float = DEFAULT_WAKE_SECONDS,
+        tolerance: float = DEFAULT_PLAN_TOLERANCE,
+    ) -> None:
+        """Initialize the planner."""
+        self.policy = policy or SolarPolicy()
+        self.profiles = profiles if profiles is not None else default_profile_models(self.policy)
+        self.horizon = horizon_hours * 3600
+        self.slot = slot_minutes * 60
+        self.import_penalty = import_penalty
+        self.wake_seconds = wake_seconds
+        self.tolerance = tolerance
+        self.forecast: List[Tuple[float, float]] = []
+        self.schedule: List[PlanSlot] = []
+
+    def plan(
+        self,
+        forecast: List[Tuple[float, float]],
+        now: float,
+        current_profile: Optional[str] = None,
+    ) -> List[PlanSlot]:
+        """Build the profile schedule for the next ``horizon`` seconds."""
+        self.forecast = forecast
+        self.schedule = []
+
+        slots = []
+        start = now
+        while start < now + self.horizon:
+            watts = forecast_at(forecast, start + self.slot / 2)
+            if watts is None:
+                break
+            slots.append((start, start + self.slot, max(0.0, watts)))
+            start += self.slot
+        if not slots:
+            return self.schedule
+
+        states = [SLEEP_PROFILE] + [name for name in self.policy.profiles if name in self.profiles]
+
+        def slot_value(state: str, watts: float) -> float:
+            if state == SLEEP_PROFILE:
+                return 0.0
+            model = self.profiles[state]
+            imported_kwh = max(0.0, model.watts - watts) * self.slot / 3.6e6
+            return model.hashrate * self.slot - self.import_penalty * imported_kwh
+
+        def transition_cost(previous: Optional[str], state: str) -> float:
+            if previous == state or state == SLEEP_PROFILE:
+                return 0.0
+            model = self.profiles[state]
+            latency = self.wake_seconds if previous in (None, SLEEP_PROFILE) else model.retune_seconds
+            return model.hashrate * min(latency, self.slot)
+
+        # best[state] = (score, path) for schedules ending in state
+        best: Dict[str, Tuple[float, List[str]]] = {}
+        first_watts = slots[0][2]
+        for state in states:
+            score = slot_value(state, first_watts) - transition_cost(current_profile, state)
+            best[state] = (score, [state])
+
+        for _, _, watts in slots[1:]:
+            step: Dict[str, Tuple[float, List[str]]] = {}
+            for state in states:
+                value = slot_value(state, watts)
+                previous, (score, path) = max(
+                    best.items(),
+                    key=lambda item: item[1][0] - transition_cost(item[0], state),
+                )
+                step[state] = (score - transition_cost(previous, state) + value, path + [state])
+            best = step
+
+        _, path = max(best.values(), key=lambda item: item[0])
+        self.schedule = [
+            PlanSlot(start, end, watts, state, self._budget_for(state))
+            for (start, end, watts), state in zip(slots, path)
+        ]
+        _LOGGER.debug("Planned %d slots: %s", len(self.schedule), path)
+        return self.schedule
+
+    def _budget_for(self, state: str) -> float:
+        """Return the power at which the live policy selects ``state``."""
+        if state == SLEEP_PROFILE:
+            return 0.0
+        threshold = self.policy.thresholds[self.policy.profiles.index(state)]
+        return max(threshold, self.policy.sleep_threshold)
+
+    def slot_at(self, timestamp: float) -> Optional[PlanSlot]:
+        """Return the planned slot covering a timestamp."""
+        for slot in self.schedule:
+            if slot.start <= timestamp < slot.end:
+                return slot
+        return None
+
+    def corrected_power(self, measured: float, timestamp: float) -> float:
+        """Blend the plan (prior) with the measured power (correction).
+
+        The planned power budget is shifted by the current forecast error, so
+        the miner follows the plan while the forecast holds and the meter
+        takes over when reality diverges. Without a usable plan, or when the
+        forecast is off by more than ``tolerance``, the measurement is used.
+        """
+        slot = self.slot_at(timestamp)
+        if slot is None:
+            return measured
+        expected = forecast_at(self.forecast, timestamp)
+        if expected is None:
+            return measured
+        if abs(measured - expected) > self.tolerance * max(expected, measured, 1.0):
+            return measured
+        return max(0.0, slot.planned_watts + (measured - expected))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the schedule for state attributes."""
+        return {
+            "schedule": [
+                {
+                    "start": datetime.fromtimestamp(slot.start, timezone.utc).isoformat(),
+                    "profile": slot.profile,
+                    "forecast_watts": round(slot.forecast_watts),
+                }
+                for slot in self.schedule
+            ],
+            "expected_th": round(
+                sum(
+                    self.profiles[slot.profile].hashrate * (slot.end - slot.start)
+                    for slot in self.schedule
+                    if slot.profile != SLEEP_PROFILE
+                )
+            ),
+        }
@@ -0,0 +1,43 @@
+"""Short-lived handoff of a verified miner connection from config flow to setup."""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_HANDOFF, HANDOFF_TTL
+from .luxos_api import LuxOSAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_store_handoff(
+    hass: HomeAssistant,
+    api: LuxOSAPI,
+    capabilities: Optional[Dict[str, Optional[bool]]] = None,
+) -> None:
+    """Remember what the config flow verified about a miner."""
+    hass.data.setdefault(DATA_HANDOFF, {})[api.host] = {
+        "firmware": api.firmware_version,
+        "session_id": api._luxos_session_id,
+        "capabilities": capabilities,
+        "expires": time.monotonic() + HANDOFF_TTL,
+    }
+
+
+@callback
+def async_pop_handoff(hass: HomeAssistant, host: str) -> Optional[Dict[str, Any]]:
+    """Take the handoff of a miner if it is still fresh."""
+    handoff = hass.data.get(DATA_HANDOFF, {}).pop(host.rstrip("/"), None)
+    if handoff is None or handoff["expires"] < time.monotonic():
+        return None
+    return handoff
+
+
+@callback
+def async_apply_handoff(api: LuxOSAPI, handoff: Dict[str, Any]) -> None:
+    """Resume a verified connection without asking the miner again."""
+    api.firmware_version = handoff["firmware"]
+    api._luxos_session_id = handoff["session_id"]
+    _LOGGER.debug("Using the connection to %s verified by the config flow", api.host)
@@ -3,52 +3,185 @@ import asyncio
 import json
 import logging
 import socket
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 
 import aiohttp
 
+from .const import CAP_ATM, CAP_BATCH, CAP_BOARD_CONTROL, CAP_CURTAIL, CAP_POWER_TARGET, CAP_PROFILES
+from .miner_state import MinerState
+from .response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from .profile_catalog import ProfileCatalog
+
 _LOGGER = logging.getLogger(__name__)
 
+# LuxOS API ports: cgminer-style TCP and the HTTP layer
+TCP_PORT = 4028
+HTTP_PORT = 8080
+
+# Readiness polling defaults (seconds)
+DEFAULT_READY_TIMEOUT = 60
+DEFAULT_READY_INITIAL_DELAY = 0.25
+DEFAULT_READY_MAX_DELAY = 5.0
+
+# Profiles probed with profileget when the miner has no profiles command
+FALLBACK_PROFILES = ("default", "310MHz")
+# Consecutive unverified board changes before per-board control counts as unsupported
+BOARD_CONTROL_FAILURES = 3
+# cgminer reply to a command the firmware does not have
+INVALID_COMMAND_MSG = "Invalid command"
+PROFILE_PROBE_CONCURRENCY = 4
+
+# Write commands of the current task are recorded here while a trace is active
+_command_trace: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("luxos_command_trace", default=None)
+
+
+@contextmanager
+def trace_commands() -> Iterator[List[Dict[str, Any]]]:
+    """Record the write commands issued by the current task.
+
+    Each record holds the command, its LuxOS STATUS code and Msg, and the
+    number of retries it needed.
+    """
+    records: List[Dict[str, Any]] = []
+    token = _command_trace.set(records)
+    try:
+        yield records
+    finally:
+        _command_trace.reset(token)
+
+
+def _record_command(
+    command: str,
+    result: Optional[Dict[str, Any]] = None,
+    retries: int = 0,
+    error: Optional[str] = None,
+) -> None:
+    """Add a write command to the active trace, if any."""
+    records = _command_trace.get()
+    if records is None:
+        return
+    status, msg = "E", error
+    if result and result.get("STATUS"):
+        status = result["STATUS"][0].get("STATUS")
+        msg = result["STATUS"][0].get("Msg")
+    records.append({"command": command, "status": status, "msg": msg, "retries": retries})
+
 
 class LuxOSAPIError(Exception):
     """Exception raised for LuxOS API errors."""
 
 
+class LuxOSUnsupportedError(LuxOSAPIError):
+    """Exception raised for commands the miner's firmware does not support."""
+
+
+def _profile_details(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the details of one entry of a ``profiles``/``profileget`` reply."""
+    return {
+        "name": info["Profile Name"],
+        "frequency": info.get("Frequency", 0),
+        "hashrate": info.get("Hashrate", 0),
+        "watts": info.get("Watts", 0),
+        "voltage": info.get("Voltage", 0),
+        "step": info.get("Step", "0"),
+    }
+
+
+def firmware_version(result: Dict[str, Any]) -> str:
+    """Return the firmware version from a ``version`` reply."""
+    versions = result.get("VERSION") or [{}]
+    info = versions[0]
+    return str(info.get("LUXminer") or info.get("Firmware") or info.get("Miner") or "unknown")
+
+
 class LuxOSAPI:
     """Client for communicating with LuxOS API."""
 
-    def __init__(self, host: str, username: str = "root", password: str = "root"):
-        """Initialize the API client."""
+    def __init__(
+        self,
+        host: str,
+        username: str = "root",
+        password: str = "root",
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        """Initialize the API client.
+
+        A shared ``session`` (e.g. Home Assistant's) is used but never closed.
+        """
         self.host = host.rstrip("/")
+        self.tcp_port = TCP_PORT
+        self.http_port = HTTP_PORT
         self.username = username
         self.password = password
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self._luxos_session_id: Optional[str] = None
+        # Last observed readiness latency per operation (seconds)
+        self.readiness_latency: Dict[str, float] = {}
+        # Confirmed profile/curtail/ATM state used to skip no-op writes
+        self.state = MinerState()
+        self.firmware_version: Optional[str] = None
+        # Probed firmware capabilities: True/False, or None/missing if unknown
+        self.capabilities: Dict[str, Optional[bool]] = {}
+        self.capability_listener: Optional[Callable[[str, bool], None]] = None
+        self._board_control_failures = 0
+        # Replies of rarely changing read commands, dropped by related writes
+        self.cache = ResponseCache()
+
+    def supports(self, capability: str) -> bool:
+        """Return False only if the firmware is known not to support a capability."""
+        return self.capabilities.get(capability) is not False
+
+    def _require(self, capability: str) -> None:
+        """Fail fast on a command the firmware is known not to support."""
+        if not self.supports(capability):
+            raise LuxOSUnsupportedError(
+                f"{capability} is not supported by the firmware of {self.host} ({self.firmware_version})"
+            )
+
+    def learn_capability(self, capability: str, supported: bool) -> None:
+        """Record a capability observed from a real command."""
+        if self.capabilities.get(capability) == supported:
+            return
+        self.capabilities[capability] = supported
+        if self.capability_listener is not None:
+            self.capability_listener(capability, supported)
+
+    def _set_firmware_version(self, version: str) -> None:
+        """Record the firmware version, dropping replies cached from another one."""
+        if self.firmware_version is not None and version != self.firmware_version:
+            self.cache.clear()
+        self.firmware_version = version
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
-        if self._session is None or self._session.closed:
+        if self._owns_session and (self._session is None or self._session.closed):
             timeout = aiohttp.ClientTimeout(total=15)
             self._session = aiohttp.ClientSession(timeout=timeout)
         return self._session
 
     async def close(self):
-        """Close the API session."""
-        if self._session and not self._session.closed:
+        """Close the API session unless it is shared."""
+        if self._owns_session and self._session and not self._session.closed:
             await self._session.close()
 
     async def _tcp_command(self, command: str, parameter: str = "") -> Dict[str, Any]:
-        """Execute command via TCP API (port 4028) - Official LuxOS method."""
+        """Execute command via TCP API (port 4028 by default) - Official LuxOS method."""
         def _sync_tcp_call():
             try:
-                _LOGGER.debug(f"TCP API call to {self.host}:4028 - command: {command}")
+                _LOGGER.debug(f"TCP API call to {self.host}:{self.tcp_port} - command: {command}")
                 
                 # Create TCP socket
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 sock.settimeout(15)
                 
                 # Connect to LuxOS TCP API
-                sock.connect((self.host, 4028))
+                sock.connect((self.host, self.tcp_port))
                 
                 # Prepare command in official LuxOS format
                 cmd_data = {
@@ -109,13 +242,13 @@ class LuxOSAPI:
                     raise LuxOSAPIError(f"Invalid JSON response: {e}")
                     
             except socket.timeout:
-                _LOGGER.error(f"TCP API timeout connecting to {self.host}:4028")
+                _LOGGER.error(f"TCP API timeout connecting to {self.host}:{self.tcp_port}")
                 raise LuxOSAPIError("TCP connection timeout")
             except socket.gaierror as e:
                 _LOGGER.error(f"TCP API DNS error: {e}")
                 raise LuxOSAPIError(f"DNS resolution failed: {e}")
             except ConnectionRefusedError:
-                _LOGGER.error(f"TCP API connection refused to {self.host}:4028")
+                _LOGGER.error(f"TCP API connection refused to {self.host}:{self.tcp_port}")
                 raise LuxOSAPIError("Connection refused - check if miner is running LuxOS")
             except Exception as e:
                 # Check if it's the "already active" error wrapped in an exception
@@ -131,7 +264,7 @@ class LuxOSAPI:
         return await loop.run_in_executor(None, _sync_tcp_call)
 
     async def _http_command(self, command: str, parameter: str = "") -> Dict[str, Any]:
-        """Execute command via HTTP API (port 8080) - LuxOS HTTP layer."""
+        """Execute command via HTTP API (port 8080 by default) - LuxOS HTTP layer."""
         session = await self._get_session()
         
         payload = {
@@ -140,11 +273,12 @@ class LuxOSAPI:
         }
         
         try:
-            _LOGGER.debug(f"HTTP API call to {self.host}:8080/api - command: {command}")
+            _LOGGER.debug(f"HTTP API call to {self.host}:{self.http_port}/api - command: {command}")
             async with session.post(
-                f"http://{self.host}:8080/api",
+                f"http://{self.host}:{self.http_port}/api",
                 json=payload,
-                headers={'Content-Type': 'application/json'}
+                headers={'Content-Type': 'application/json'},
+                timeout=aiohttp.ClientTimeout(total=15),
             ) as response:
                 if response.status == 200:
                     text = await response.text()
@@ -181,29 +315,50 @@ class LuxOSAPI:
     async def _execute_command(self, command: str, parameter: str = "") -> Dict[str, Any]:
         """Execute command using the best available method."""
         last_error = None
-        
-        # Method 1: TCP API (port 4028) - Official LuxOS recommended method
         try:
-            return await self._tcp_command(command, parameter)
-        except LuxOSAPIError as e:
-            last_error = f"TCP API failed: {e}"
-            _LOGGER.debug(last_error)
+            # Method 1: TCP API (port 4028) - Official LuxOS recommended method
+            try:
+                return await self._tcp_command(command, parameter)
+            except LuxOSAPIError as e:
+                last_error = f"TCP API failed: {e}"
+                _LOGGER.debug(last_error)
         
-        # Method 2: HTTP API (port 8080) - LuxOS HTTP layer fallback
+            # Method 2: HTTP API (port 8080) - LuxOS HTTP layer fallback
+            try:
+                return await self._http_command(command, parameter)
+            except LuxOSAPIError as e:
+                last_error = f"HTTP API failed: {e}"
+                _LOGGER.debug(last_error)
+
+            # All methods failed
+            error_msg = f"All API methods failed. Last error: {last_error}"
+            # Don't log "already active" as error - it's expected
+            if "already active" not in error_msg.lower():
+                _LOGGER.error(error_msg)
+            else:
+                _LOGGER.debug(error_msg + " (expected)")
+            raise LuxOSAPIError(error_msg)
+        finally:
+            # Writes drop the cached replies they change, even if they failed
+            self.cache.written(command)
+
+    async def _cached_command(self, command: str, parameter: str = "") -> Dict[str, Any]:
+        """Execute a read command, answering from the response cache while fresh."""
+        result = self.cache.get(command, parameter)
+        if result is None:
+            result = await self._execute_command(command, parameter)
+            self.cache.put(command, parameter, result)
+        return result
+
+    async def _execute_write_command(self, command: str, parameter: str = "") -> Dict[str, Any]:
+        """Execute a command without session and record it in the active trace."""
         try:
-            return await self._http_command(command, parameter)
+            result = await self._execute_command(command, parameter)
         except LuxOSAPIError as e:
-            last_error = f"HTTP API failed: {e}"
-            _LOGGER.debug(last_error)
-
-        # All methods failed
-        error_msg = f"All API methods failed. Last error: {last_error}"
-        # Don't log "already active" as error - it's expected
-        if "already active" not in error_msg.lower():
-            _LOGGER.error(error_msg)
-        else:
-            _LOGGER.debug(error_msg + " (expected)")
-        raise LuxOSAPIError(error_msg)
+            _record_command(command, error=str(e))
+            raise
+        _record_command(command, result)
+        return result
 
     async def _get_luxos_session_id(self) -> Optional[str]:
         """Get or create a LuxOS session ID."""
@@ -252,6 +407,7 @@ class LuxOSAPI:
                     status_info = result["STATUS"][0]
                     if status_info.get("STATUS") == "S":
                         _LOGGER.info(f"Curtail {action} command successful")
+                        _record_command("curtail", result, attempt)
                         return result
                     else:
                         error_msg = status_info.get("Msg", "Unknown curtail error")
@@ -264,18 +420,22 @@ class LuxOSAPI:
                         elif "already active" in error_msg.lower() and action == "wakeup":
                             # Miner is already running - this is expected and OK
                             _LOGGER.debug("Miner is already active (expected)")
+                            _record_command("curtail", result, attempt)
                             return result
                         elif "curtail mode is idle or sleep" in error_msg and action == "wakeup":
                             # The miner might already be awake or in transition
                             _LOGGER.info("Miner may already be awake or transitioning")
+                            _record_command("curtail", result, attempt)
                             return result
                         elif "curtail mode is idle or sleep" in error_msg and action == "sleep":
                             # The miner might already be in sleep mode
                             _LOGGER.info("Miner may already be in sleep mode")
+                            _record_command("curtail", result, attempt)
                             return result
                         else:
                             raise LuxOSAPIError(f"Curtail {action} failed: {error_msg}")
                 
+                _record_command("curtail", result, attempt)
                 return result
                 
             except Exception as e:
@@ -290,6 +450,7 @@ class LuxOSAPI:
                 # Clear session ID to force renewal on next attempt
                 self._luxos_session_id = None
                 
+        _record_command("curtail", retries=max_retries - 1, error=str(last_error))
         raise LuxOSAPIError(f"All curtail {action} attempts failed. Last error: {last_error}")
 
     async def _execute_session_command(self, command: str, parameter: str) -> Dict[str, Any]:
@@ -314,6 +475,7 @@ class LuxOSAPI:
                     status_info = result["STATUS"][0]
                     if status_info.get("STATUS") == "S":
                         _LOGGER.debug(f"{command} command successful")
+                        _record_command(command, result, attempt)
                         return result
                     else:
                         error_msg = status_info.get("Msg", f"Unknown {command} error")
@@ -326,6 +488,7 @@ class LuxOSAPI:
                         else:
                             raise LuxOSAPIError(f"{command} failed: {error_msg}")
                 
+                _record_command(command, result, attempt)
                 return result
                 
             except Exception as e:
@@ -337,8 +500,21 @@ class LuxOSAPI:
                 # Clear session ID to force renewal on next attempt
                 self._luxos_session_id = None
                 
+        _record_command(command, retries=max_retries - 1, error=str(last_error))
         raise LuxOSAPIError(f"All {command} attempts failed. Last error: {last_error}")
 
+    async def check_alive(self) -> bool:
+        """Check with a single ``version`` call that the miner answers."""
+        try:
+            result = await self._execute_command("version")
+        except LuxOSAPIError as e:
+            _LOGGER.warning(f"Miner at {self.host} is not answering: {e}")
+            return False
+        if not result.get("STATUS") or result["STATUS"][0].get("STATUS") != "S":
+            return False
+        self._set_firmware_version(firmware_version(result))
+        return True
+
     async def test_connection(self) -> bool:
         """Test if the miner is reachable."""
         try:
@@ -352,6 +528,7 @@ class LuxOSAPI:
                     status = status_list[0]
                     if status.get("STATUS") == "S":
                         _LOGGER.info(f"Connection successful: {status.get('Description', 'LuxOS miner')}")
+                        self._set_firmware_version(firmware_version(result))
                         
                         # Get session ID for commands that need it
                         await self._get_luxos_session_id()
@@ -365,6 +542,33 @@ class LuxOSAPI:
             _LOGGER.error(f"Connection test failed: {e}")
             return False
 
+    async def execute_batch(self, commands: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Execute read commands, in one round-trip where the firmware allows.
+
+        Commands with a fresh cached reply are not sent. Returns the reply
+        per command.
+        """
+        replies: Dict[str, Dict[str, Any]] = {}
+        for command in commands:
+            if self.cache.cacheable(command):
+                cached = self.cache.get(command)
+                if cached is not None:
+                    replies[command] = cached
+        pending = [command for command in commands if command not in replies]
+
+        if self.capabilities.get(CAP_BATCH) and len(pending) > 1:
+            result = await self._execute_command("+".join(pending), "")
+            for command in pending:
+                reply = result.get(command)
+                if isinstance(reply, list) and reply:
+                    replies[command] = reply[0]
+        for command in pending:
+            if command not in replies:
+                replies[command] = await self._execute_command(command, "")
+            if self.cache.cacheable(command):
+                self.cache.put(command, "", replies[command])
+        return replies
+
     async def get_stats(self) -> Dict[str, Any]:
         """Get miner statistics."""
         return await self._execute_command("stats")
@@ -375,7 +579,7 @@ class LuxOSAPI:
 
     async def get_pools(self) -> Dict[str, Any]:
         """Get mining pool information."""
-        return await self._execute_command("pools")
+        return await self._cached_command("pools")
 
     async def get_summary(self) -> Dict[str, Any]:
         """Get miner summary."""
@@ -383,7 +587,7 @@ class LuxOSAPI:
 
     async def get_version(self) -> Dict[str, Any]:
         """Get version information."""
-        return await self._execute_command("version")
+        return await self._cached_command("version")
 
     # Authentication-based methods (for web interface access)
     async def login(self) -> bool:
@@ -409,48 +613,132 @@ class LuxOSAPI:
             _LOGGER.error(f"Login error: {e}")
             return False
 
+    async def wait_until_ready(
+        self,
+        command: str,
+        predicate: Callable[[Dict[str, Any]], bool],
+        key: str,
+        timeout: float = DEFAULT_READY_TIMEOUT,
+        initial_delay: float = DEFAULT_READY_INITIAL_DELAY,
+        max_delay: float = DEFAULT_READY_MAX_DELAY,
+    ) -> bool:
+        """Poll a cheap read command with backoff until the predicate holds.
+
+        Returns True as soon as the miner reports the expected state, or
+        False once the deadline passes. The observed latency is recorded in
+        ``readiness_latency[key]``.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        delay = initial_delay
+
+        while True:
+            try:
+                if predicate(await self._execute_command(command, "")):
+                    latency = time.monotonic() - start
+                    self.readiness_latency[key] = round(latency, 2)
+                    _LOGGER.debug(f"{self.host} ready for {key} after {latency:.2f}s")
+                    return True
+            except (LuxOSAPIError, KeyError, IndexError, TypeError, ValueError) as e:
+                _LOGGER.debug(f"Readiness poll {command} for {key} failed: {e}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _LOGGER.warning(f"{self.host} not ready for {key} after {timeout:.0f}s")
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+
+    async def wait_for_mining(self, timeout: float = DEFAULT_READY_TIMEOUT) -> bool:
+        """Wait until the miner reports hashrate again (e.g. after curtail wakeup)."""
+        def _is_mining(result: Dict[str, Any]) -> bool:
+            summary = result["SUMMARY"][0]
+            return float(summary.get("MHS 5s", summary.get("GHS 5s", 0))) > 0
+
+        return await self.wait_until_ready("summary", _is_mining, "wake", timeout)
+
+    async def wait_for_board_state(
+        self, board: int, enabled: bool, timeout: float = DEFAULT_READY_TIMEOUT
+    ) -> bool:
+        """Wait until a hashboard reports the expected Enabled state."""
+        key = "enableboard" if enabled else "disableboard"
+        return await self.wait_for_board_states({board: enabled}, timeout, key)
+
+    async def wait_for_board_states(
+        self, boards: Dict[int, bool], timeout: float = DEFAULT_READY_TIMEOUT, key: str = "boards"
+    ) -> bool:
+        """Wait until every hashboard reports its expected Enabled state."""
+        def _boards_match(result: Dict[str, Any]) -> bool:
+            devs = result["DEVS"]
+            return all((devs[board].get("Enabled", "N") == "Y") == enabled for board, enabled in boards.items())
+
+        return await self.wait_until_ready("devs", _boards_match, key, timeout)
+
+    async def wait_for_atm_state(self, enabled: bool, timeout: float = DEFAULT_READY_TIMEOUT) -> bool:
+        """Wait until ATM reports the expected enabled state."""
+        def _atm_matches(result: Dict[str, Any]) -> bool:
+            return bool(result["ATM"][0].get("Enabled")) == enabled
+
+        key = f"atm_{'enable' if enabled else 'disable'}"
+        return await self.wait_until_ready("atm", _atm_matches, key, timeout)
+
     async def get_temps(self) -> Dict[str, Any]:
         """Get temperature information."""
         # LuxOS includes temperature data in stats and devs commands
         return await self.get_stats()
 
-    async def get_available_profiles(self) -> List[str]:
-        """Get list of available profiles dynamically from the miner."""
+    async def discover_profiles(self) -> "ProfileCatalog":
+        """Discover the miner's profiles with their details.
+
+        A single ``profiles`` call answers for all profiles. Firmware without
+        it is probed for the known S21+ profiles with concurrent ``profileget``
+        calls.
+        """
         try:
-            # Use the 'profiles' command to get all available profiles with details
-            result = await self._execute_command("profiles", "")
-            
-            if "PROFILES" in result and result["PROFILES"]:
-                profiles = []
-                for profile_info in result["PROFILES"]:
-                    if "Profile Name" in profile_info:
-                        profiles.append(profile_info["Profile Name"])
-                
-                if profiles:
-                    _LOGGER.info(f"Found {len(profiles)} dynamic profiles from miner: {profiles}")
-                    return profiles
+            result = await self._cached_command("profiles")
         except Exception as e:
             _LOGGER.warning(f"Dynamic profile discovery failed: {e}")
-        
-        # Fallback: check only known working profiles for S21+
-        available_profiles = []
-        known_s21_profiles = ["default", "310MHz"]
-        
-        for profile_name in known_s21_profiles:
-            try:
-                result = await self._execute_command("profileget", profile_name)
-                if "PROFILE" in result and result["PROFILE"]:
-                    available_profiles.append(profile_name)
-                    _LOGGER.debug(f"Found fallback profile: {profile_name}")
-            except Exception as e:
-                _LOGGER.debug(f"Fallback profile {profile_name} check failed: {e}")
-        
-        # If no profiles found, return default safe list
-        if not available_profiles:
-            _LOGGER.warning("No profiles detected, using default list for S21+")
-            available_profiles = ["default", "310MHz"]
-        
-        return available_profiles
+            result = {}
+
+        details = {
+            info["Profile Name"]: _profile_details(info)
+            for info in result.get("PROFILES") or []
+            if "Profile Name" in info
+        }
+        if details:
+            _LOGGER.debug(f"Found {len(details)} dynamic profiles from miner: {list(details)}")
+        else:
+            details = await self._probe_profiles(FALLBACK_PROFILES)
+        from .profile_catalog import ProfileCatalog
+
+        return ProfileCatalog.from_details(details)
+
+    async def _probe_profiles(self, names) -> Dict[str, Dict[str, Any]]:
+        """Fetch known profiles one by one, a few at a time."""
+        semaphore = asyncio.Semaphore(PROFILE_PROBE_CONCURRENCY)
+
+        async def _probe(name: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    result = await self._execute_command("profileget", name)
+                except Exception as e:
+                    _LOGGER.debug(f"Fallback profile {name} check failed: {e}")
+                    return None
+            profile = result.get("PROFILE")
+            if not profile:
+                return None
+            return _profile_details({"Profile Name": name, **profile[0]})
+
+        probed = await asyncio.gather(*(_probe(name) for name in names))
+        return {details["name"]: details for details in probed if details}
+
+    async def get_available_profiles(self) -> List[str]:
+        """Get list of available profiles dynamically from the miner."""
+        catalog = await self.discover_profiles()
+        if catalog:
+            return catalog.names
+        _LOGGER.warning("No profiles detected, using default list for S21+")
+        return list(FALLBACK_PROFILES)
 
     async def get_profile_details(self, profile_name: str) -> Dict[str, Any]:
         """Get details for a specific profile."""
@@ -458,154 +746,132 @@ class LuxOSAPI:
 
     async def get_all_profiles_with_details(self) -> Dict[str, Dict[str, Any]]:
         """Get all available profiles with their detailed information."""
-        try:
-            result = await self._execute_command("profiles", "")
-            
-            if "PROFILES" in result and result["PROFILES"]:
-                profiles_dict = {}
-                for profile_info in result["PROFILES"]:
-                    if "Profile Name" in profile_info:
-                        profile_name = profile_info["Profile Name"]
-                        profiles_dict[profile_name] = {
-                            "name": profile_name,
-                            "frequency": profile_info.get("Frequency", 0),
-                            "hashrate": profile_info.get("Hashrate", 0),
-                            "watts": profile_info.get("Watts", 0),
-                            "voltage": profile_info.get("Voltage", 0),
-                            "step": profile_info.get("Step", "0"),
-                            "description": f"{profile_info.get('Frequency', 0)}MHz - {profile_info.get('Hashrate', 0)}TH/s - {profile_info.get('Watts', 0)}W"
-                        }
-                
-                _LOGGER.debug(f"Retrieved detailed info for {len(profiles_dict)} profiles")
-                return profiles_dict
-        except Exception as e:
-            _LOGGER.warning(f"Failed to get detailed profile information: {e}")
-        
-        return {}
+        return (await self.discover_profiles()).as_details()
 
-    async def set_profile(self, profile_name: str, board: int = None) -> Dict[str, Any]:
+    async def set_profile(self, profile_name: str, board: int = None, force: bool = False) -> Dict[str, Any]:
         """Set power profile. LuxOS profileset applies to appropriate boards automatically."""
+        self._require(CAP_PROFILES)
+        if not force and self.state.profile == profile_name:
+            return self._skip("profileset", f"profile {profile_name} already active")
         # LuxOS profileset format: session_id,profile_name (board ID not needed)
-        return await self._execute_session_command("profileset", profile_name)
+        result = await self._execute_session_command("profileset", profile_name)
+        self.state.confirm_profile(profile_name)
+        return result
+
+    async def set_power_target(self, watts: int) -> Dict[str, Any]:
+        """Set the miner's power target in watts (firmware permitting)."""
+        self._require(CAP_POWER_TARGET)
+        return await self._execute_session_command("powertargetset", str(int(watts)))
 
     async def set_frequency(self, freq: int) -> Dict[str, Any]:
         """Set frequency (overclock/underclock)."""
-        return await self._execute_command("frequencyset", str(freq))
+        return await self._execute_write_command("frequencyset", str(freq))
 
     async def enable_hashboard(self, board: int) -> Dict[str, Any]:
         """Enable specific hashboard (pauses ATM temporarily)."""
-        return await self._hashboard_control_with_atm("enableboard", board)
+        return (await self.set_hashboards({board: True}))["results"][board]
 
     async def disable_hashboard(self, board: int) -> Dict[str, Any]:
         """Disable specific hashboard (pauses ATM temporarily)."""
-        return await self._hashboard_control_with_atm("disableboard", board)
-
-    async def _hashboard_control_with_atm(self, command: str, board: int) -> Dict[str, Any]:
-        """Control hashboard by temporarily pausing ATM."""
-        max_retries = 2
-        last_error = None
-
-        for attempt in range(max_retries):
-            try:
-                # Ensure we have a session ID
-                if not self._luxos_session_id:
-                    await self._get_luxos_session_id()
-
-                if not self._luxos_session_id:
-                    raise LuxOSAPIError(f"No LuxOS session ID available for {command}")
-
-                # Step 1: Disable ATM
-                _LOGGER.debug(f"Pausing ATM for {command} on board {board}")
-                atm_disable = await self._execute_command("atmset", f"{self._luxos_session_id},enabled=false")
-
-                # Check if ATM was disabled successfully
-                if "STATUS" in atm_disable and atm_disable["STATUS"]:
-                    status = atm_disable["STATUS"][0]
-                    if status.get("STATUS") != "S":
-                        _LOGGER.warning(f"ATM disable warning: {status.get('Msg')}")
-
-                # Small delay to let ATM stop
-                await asyncio.sleep(0.5)
-
-                # Step 2: Execute hashboard command
-                _LOGGER.debug(f"Executing {command} for board {board}")
-                board_param = f"{self._luxos_session_id},{board}"
-                result = await self._execute_command(command, board_param)
-
-                # Check command result
-                if "STATUS" in result and result["STATUS"]:
-                    status_info = result["STATUS"][0]
-                    if status_info.get("STATUS") == "S":
-                        _LOGGER.info(f"{command} board {board} successful")
-                    else:
-                        error_msg = status_info.get("Msg", f"Unknown {command} error")
+        return (await self.set_hashboards({board: False}))["results"][board]
 
-                        # Handle session expiry
-                        if "Invalid session_id" in error_msg:
-                            _LOGGER.warning(f"Session expired during {command}, retrying (attempt {attempt + 1})")
-                            self._luxos_session_id = None
-                            continue
-                        else:
-                            _LOGGER.error(f"{command} board {board} failed: {error_msg}")
-                            # Continue to re-enable ATM even if command failed
-
-                # Step 3: Verify the change took effect before re-enabling ATM
-                _LOGGER.debug(f"Verifying {command} for board {board}")
-                await asyncio.sleep(1)  # Give the board time to change state
-
-                verification = await self._execute_command("devs", "")
-                expected_state = command == "enableboard"  # True for enable, False for disable
-
-                if "DEVS" in verification and len(verification["DEVS"]) > board:
-                    board_data = verification["DEVS"][board]
-                    actual_enabled = board_data.get("Enabled", "N") == "Y"
-
-                    if actual_enabled != expected_state:
-                        _LOGGER.warning(
-                            f"Hashboard {board} {command} command succeeded, but board state did not change. "
-                            f"Expected Enabled={expected_state}, got Enabled={actual_enabled}. "
-                            f"This LuxOS firmware version may not support per-board control. "
-                            f"Consider using power profiles instead for solar following."
-                        )
-                    else:
-                        _LOGGER.info(f"Verified: Board {board} is now {'enabled' if expected_state else 'disabled'}")
-
-                # Step 4: Re-enable ATM
-                _LOGGER.debug("Re-enabling ATM")
-                atm_enable = await self._execute_command("atmset", f"{self._luxos_session_id},enabled=true")
-
-                # Check if ATM was re-enabled
-                if "STATUS" in atm_enable and atm_enable["STATUS"]:
-                    status = atm_enable["STATUS"][0]
-                    if status.get("STATUS") != "S":
-                        _LOGGER.warning(f"ATM re-enable warning: {status.get('Msg')}")
-
-                return result
-
-            except Exception as e:
-                last_error = e
-                if attempt == max_retries - 1:
-                    break
-
-                _LOGGER.warning(f"{command} board {board} attempt {attempt + 1} failed: {e}")
-                self._luxos_session_id = None
+    async def _set_atm(self, enabled: bool) -> Dict[str, Any]:
+        """Enable or disable ATM and record the acknowledged state."""
+        result = await self._execute_session_command("atmset", f"enabled={'true' if enabled else 'false'}")
+        self.state.confirm_atm(enabled)
+        return result
 
-                # Try to re-enable ATM even after error
-                try:
-                    if self._luxos_session_id:
-                        await self._execute_command("atmset", f"{self._luxos_session_id},enabled=true")
-                except:
-                    pass
+    async def _restore_atm(self) -> None:
+        """Re-enable ATM after a pause window, logging instead of raising."""
+        try:
+            await self._set_atm(True)
+            _LOGGER.debug("ATM re-enabled")
+        except LuxOSAPIError as e:
+            _LOGGER.error(f"Failed to re-enable ATM on {self.host}, ATM stays disabled: {e}")
 
-        raise LuxOSAPIError(f"All {command} board {board} attempts failed. Last error: {last_error}")
+    @asynccontextmanager
+    async def atm_paused(self) -> AsyncIterator[None]:
+        """Pause ATM for a batch of board operations.
 
-    async def pause_mining(self) -> Dict[str, Any]:
+        ATM is re-enabled when the block exits - also on errors and
+        cancellation. ATM that is already known to be off is left off.
+        """
+        restore = self.supports(CAP_ATM) and self.state.atm_enabled is not False
+        try:
+            if restore:
+                _LOGGER.debug("Pausing ATM")
+                await self._set_atm(False)
+                # Proceed as soon as ATM reports stopped
+                await self.wait_for_atm_state(False, timeout=10)
+            elif self.supports(CAP_ATM):
+                self._skip("atmset", "ATM already disabled")
+            yield
+        finally:
+            if restore:
+                # Shielded so a second cancellation cannot leave ATM off
+                await asyncio.shield(self._restore_atm())
+
+    async def set_hashboards(self, boards: Dict[int, bool], timeout: float = 15) -> Dict[str, Any]:
+        """Enable/disable several hashboards within one ATM pause window.
+
+        ``boards`` maps board index to the wanted Enabled state. All boards
+        are verified together against ``devs``. Returns the command result
+        per board and whether the miner reported the wanted states.
+        """
+        self._require(CAP_BOARD_CONTROL)
+        results: Dict[int, Dict[str, Any]] = {}
+        try:
+            async with self.atm_paused():
+                for board, enabled in boards.items():
+                    command = "enableboard" if enabled else "disableboard"
+                    results[board] = await self._execute_session_command(command, str(board))
+                    _LOGGER.info(f"{command} board {board} successful")
+
+                # Verify before ATM takes over again
+                verified = await self.wait_for_board_states(boards, timeout=timeout)
+        except LuxOSAPIError as e:
+            if INVALID_COMMAND_MSG in str(e):
+                self.learn_capability(CAP_BOARD_CONTROL, False)
+            raise
+
+        # A single slow verification is not proof; only repeated ones are
+        if verified:
+            self._board_control_failures = 0
+            self.learn_capability(CAP_BOARD_CONTROL, True)
+        else:
+            self._board_control_failures += 1
+            if self._board_control_failures >= BOARD_CONTROL_FAILURES:
+                self.learn_capability(CAP_BOARD_CONTROL, False)
+            _LOGGER.warning(
+                f"Hashboard commands succeeded, but the boards did not reach {boards}. "
+                f"This LuxOS firmware version may not support per-board control. "
+                f"Consider using power profiles instead for solar following."
+            )
+        return {"results": results, "verified": verified}
+
+    def _skip(self, command: str, reason: str) -> Dict[str, Any]:
+        """Skip a no-op write and return its synthetic reply."""
+        result = self.state.skip(command, reason)
+        _record_command(command, result)
+        return result
+
+    async def pause_mining(self, force: bool = False) -> Dict[str, Any]:
         """Pause mining operations using curtail sleep."""
-        return await self._execute_curtail_command("sleep")
-
-    async def resume_mining(self) -> Dict[str, Any]:
+        self._require(CAP_CURTAIL)
+        if not force and self.state.curtailed is True:
+            return self._skip("curtail", "miner already sleeping")
+        result = await self._execute_curtail_command("sleep")
+        self.state.confirm_curtail(True)
+        return result
+
+    async def resume_mining(self, force: bool = False) -> Dict[str, Any]:
         """Resume mining operations using curtail wakeup."""
-        return await self._execute_curtail_command("wakeup")
+        self._require(CAP_CURTAIL)
+        if not force and self.state.curtailed is False:
+            return self._skip("curtail", "miner already mining")
+        result = await self._execute_curtail_command("wakeup")
+        self.state.confirm_curtail(False)
+        return result
 
     async def restart_miner(self) -> Dict[str, Any]:
         """Restart the miner."""
@@ -614,11 +880,11 @@ class LuxOSAPI:
     async def add_pool(self, url: str, user: str, password: str = "x", priority: int = 0) -> Dict[str, Any]:
         """Add a mining pool."""
         params = f"{url},{user},{password},{priority}"
-        return await self._execute_command("addpool", params)
+        return await self._execute_write_command("addpool", params)
 
     async def switch_pool(self, pool_id: int) -> Dict[str, Any]:
         """Switch to a different mining pool."""
-        return await self._execute_command("switchpool", str(pool_id))
+        return await self._execute_write_command("switchpool", str(pool_id))
 
     async def get_preset_profiles(self) -> Dict[str, Any]:
         """Get available preset profiles."""
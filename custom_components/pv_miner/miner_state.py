@@ -0,0 +1,160 @@
+"""Confirmed miner state used to skip no-op writes."""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hashrate (GH/s) above which the miner is certainly not curtailed
+MINING_HASHRATE_GHS = 1000
+# Curtail modes in which the miner does not hash
+CURTAILED_MODES = ("sleep", "idle")
+# After a wakeup, low hashrate is expected for this long (seconds)
+WAKE_GRACE_SECONDS = 600
+# After a sleep, hashrate may still be reported for this long (seconds)
+SLEEP_GRACE_SECONDS = 60
+
+
+def _observed_profile(data: Dict[str, Any]) -> Optional[str]:
+    """Return the active profile reported in coordinator data, if any."""
+    devs = data.get("devs", {})
+    if isinstance(devs, dict) and isinstance(devs.get("DEVS"), list):
+        profiles = {
+            dev.get("Profile")
+            for dev in devs["DEVS"]
+            if isinstance(dev, dict) and dev.get("Profile")
+        }
+        if len(profiles) == 1:
+            return profiles.pop()
+    config = data.get("config", {})
+    if isinstance(config, dict) and isinstance(config.get("CONFIG"), list) and config["CONFIG"]:
+        profile = config["CONFIG"][0].get("Profile")
+        if profile:
+            return profile
+    return None
+
+
+def _observed_curtail(data: Dict[str, Any]) -> Optional[bool]:
+    """Return the curtail state reported in coordinator data, if any."""
+    config = data.get("config", {})
+    if isinstance(config, dict) and isinstance(config.get("CONFIG"), list) and config["CONFIG"]:
+        mode = config["CONFIG"][0].get("CurtailMode")
+        if isinstance(mode, str) and mode:
+            return mode.lower() in CURTAILED_MODES
+    return None
+
+
+def _observed_atm(data: Dict[str, Any]) -> Optional[bool]:
+    """Return the ATM state reported in coordinator data, if any."""
+    atm = data.get("atm", {})
+    if isinstance(atm, dict) and isinstance(atm.get("ATM"), list) and atm["ATM"]:
+        return bool(atm["ATM"][0].get("Enabled"))
+    return None
+
+
+def observed_state(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the profile, curtail and ATM state the miner reported in ``data``.
+
+    States the data does not report are left out.
+    """
+    state = {
+        "profile": _observed_profile(data),
+        "curtailed": _observed_curtail(data),
+        "atm_enabled": _observed_atm(data),
+    }
+    return {key: value for key, value in state.items() if value is not None}
+
+
+def _observed_hashrate(data: Dict[str, Any]) -> Optional[float]:
+    """Return the 5s hashrate in GH/s from coordinator data."""
+    stats = data.get("stats", {})
+    if isinstance(stats, dict) and isinstance(stats.get("STATS"), list) and len(stats["STATS"]) > 1:
+        try:
+            return float(stats["STATS"][1]["GHS 5s"])
+        except (KeyError, TypeError, ValueError):
+            return None
+    return None
+
+
+class MinerState:
+    """Track the miner's confirmed profile, curtail state and ATM state.
+
+    State is confirmed by successful write acknowledgements and by the
+    coordinator's polled data, which wins over earlier writes. Sleep is only
+    trusted from a sleep acknowledgement or a reported curtail mode; low
+    hashrate alone (reboot, board initialisation) makes it unknown. Unknown
+    state (None) never causes a write to be skipped.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with unknown state."""
+        self.profile: Optional[str] = None
+        self.curtailed: Optional[bool] = None
+        self.atm_enabled: Optional[bool] = None
+        self.skipped: Dict[str, int] = {}
+        self._woken_at: Optional[float] = None
+        self._slept_at: Optional[float] = None
+
+    @property
+    def skipped_total(self) -> int:
+        """Return the number of writes skipped as no-ops."""
+        return sum(self.skipped.values())
+
+    def observe(self, data: Dict[str, Any]) -> None:
+        """Update the confirmed state from coordinator data."""
+        profile = _observed_profile(data)
+        if profile is not None:
+            self.profile = profile
+
+        curtailed = _observed_curtail(data)
+        hashrate = _observed_hashrate(data)
+        if curtailed is not None:
+            self.curtailed = curtailed
+            self._woken_at = self._slept_at = None
+        elif hashrate is not None:
+            now = time.monotonic()
+            if hashrate > MINING_HASHRATE_GHS:
+                if self._slept_at is None or now - self._slept_at > SLEEP_GRACE_SECONDS:
+                    # Hashing and no sleep in progress - the miner mines
+                    self.curtailed = False
+                    self._woken_at = self._slept_at = None
+            elif self.curtailed is False and (
+                self._woken_at is None or now - self._woken_at > WAKE_GRACE_SECONDS
+            ):
+                # No hashrate and no wakeup in progress - sleeping or rebooting
+                self.curtailed = None
+                self._woken_at = None
+
+        atm_enabled = _observed_atm(data)
+        if atm_enabled is not None:
+            self.atm_enabled = atm_enabled
+
+    def confirm_profile(self, profile: str) -> None:
+        """Record an acknowledged profileset."""
+        self.profile = profile
+
+    def confirm_curtail(self, curtailed: bool) -> None:
+        """Record an acknowledged curtail sleep/wakeup."""
+        self.curtailed = curtailed
+        now = time.monotonic()
+        self._woken_at = None if curtailed else now
+        self._slept_at = now if curtailed else None
+
+    def confirm_atm(self, enabled: bool) -> None:
+        """Record an acknowledged atmset."""
+        self.atm_enabled = enabled
+
+    def skip(self, command: str, reason: str) -> Dict[str, Any]:
+        """Count a skipped write and return a LuxOS-style success reply."""
+        self.skipped[command] = self.skipped.get(command, 0) + 1
+        _LOGGER.debug("Skipping %s: %s", command, reason)
+        return {"STATUS": [{"STATUS": "S", "Msg": f"Skipped: {reason}"}], "skipped": True}
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return state for state attributes."""
+        return {
+            "confirmed_profile": self.profile,
+            "curtailed": self.curtailed,
+            "atm_enabled": self.atm_enabled,
+            "skipped_commands": self.skipped_total,
+        }
@@ -9,8 +9,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import CAP_POWER_TARGET, CAP_PROFILES, DOMAIN
 from .luxos_api import LuxOSAPIError
+from .power_limit import async_set_power_limit
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,15 +28,16 @@ async def async_setup_entry(
     
     entities = []
     
-    # Power limit control
-    entities.append(
-        PVMinerPowerLimit(
-            coordinator,
-            api,
-            config_entry.entry_id,
-            config[CONF_NAME],
+    # Power limit control (via profiles or the firmware's power target)
+    if api.supports(CAP_PROFILES) or api.capabilities.get(CAP_POWER_TARGET):
+        entities.append(
+            PVMinerPowerLimit(
+                coordinator,
+                api,
+                config_entry.entry_id,
+                config[CONF_NAME],
+            )
         )
-    )
     
     # Manual frequency control
     entities.append(
@@ -83,6 +85,8 @@ class PVMinerPowerLimit(CoordinatorEntity, NumberEntity):
         self._attr_native_min_value = 500
         self._attr_native_max_value = 50000
         self._attr_native_step = 100
+        self._target: Optional[float] = None
+        self._report: Dict[str, Any] = {}
 
     @property
     def device_info(self) -> Dict[str, Any]:
@@ -100,6 +104,8 @@ class PVMinerPowerLimit(CoordinatorEntity, NumberEntity):
         """Return the current power limit."""
         if not self.coordinator.data or not self.coordinator.data.get("connected"):
             return None
+        if self._target is not None:
+            return self._target
             
         # This would come from the miner's current power configuration
         # For now, return a default value or extract from miner data
@@ -113,21 +119,37 @@ class PVMinerPowerLimit(CoordinatorEntity, NumberEntity):
                     return float(miner_stats["Power"])
         return 3000  # Default value
 
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the achieved power of the last limit change."""
+        return self._report
+
     async def async_set_native_value(self, value: float) -> None:
         """Set the power limit."""
+        _LOGGER.info("Setting power limit to %dW for miner %s", value, self._miner_name)
+        self._target = value
+        self._report = {"target_watts": value}
+        self.async_write_ha_state()
+        # Settling takes minutes - verify in the background, cancelled on unload
+        self.platform.config_entry.async_create_background_task(
+            self.hass,
+            self._async_apply_limit(value),
+            f"{DOMAIN} power limit {self._miner_name}",
+        )
+
+    async def _async_apply_limit(self, value: float) -> None:
+        """Apply the limit, verify it against the measured power and report."""
         try:
-            # This would involve setting power limits via LuxOS API
-            # The exact command depends on how LuxOS handles power limiting
-            _LOGGER.info("Setting power limit to %dW for miner %s", value, self._miner_name)
-            
-            # For now, we'll use frequency adjustment as a proxy for power control
-            # Higher frequency = more power, lower frequency = less power
-            # This is a simplified approach
-            
-            await self.coordinator.async_request_refresh()
+            report = await async_set_power_limit(
+                self.hass.data[DOMAIN][self._config_entry_id], value
+            )
         except LuxOSAPIError as e:
             _LOGGER.error("Error setting power limit: %s", e)
-            raise
+            self._report = {"target_watts": value, "error": str(e)}
+        else:
+            if self._target == value:
+                self._report = report
+        self.async_write_ha_state()
 
 
 class PVMinerFrequency(CoordinatorEntity, NumberEntity):
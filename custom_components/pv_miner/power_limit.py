@@ -0,0 +1,163 @@
+"""Closed-loop power limit control verified against the measured power."""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from .const import CAP_POWER_TARGET
+from .solar_policy import DEFAULT_RETUNE_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SETTLE_TIMEOUT = 120  # seconds, covers a profile retune
+SETTLE_INITIAL_DELAY = 5.0
+SETTLE_MAX_DELAY = 20.0
+# Two consecutive readings this close (relative) count as settled
+SETTLE_TOLERANCE = 0.02
+# Measured power may exceed the limit by this much before refining
+OVERSHOOT_TOLERANCE = 0.03
+
+
+async def async_apply_profile(entry_data: Dict[str, Any], profile: str) -> str:
+    """Set a profile, limited by the thermal cap. Returns the applied profile."""
+    governor = entry_data["coordinator"].thermal_governor
+    if governor is not None:
+        capped = governor.cap(profile)
+        if capped != profile:
+            _LOGGER.warning("Power profile '%s' exceeds thermal cap, using '%s'", profile, capped)
+            profile = capped
+    await entry_data["api"].set_profile(profile)
+    if governor is not None:
+        governor.record_profile(profile)
+    return profile
+
+
+async def async_settled_power(
+    coordinator,
+    timeout: float = DEFAULT_SETTLE_TIMEOUT,
+    min_wait: float = 0.0,
+) -> Optional[int]:
+    """Refresh a miner coordinator until its measured power stops moving.
+
+    The first reading is taken after ``min_wait`` seconds at the earliest,
+    so the steady low draw during a retune is not taken as settled. Returns
+    the last measured watts (None if the miner reports no power).
+    """
+    deadline = time.monotonic() + max(timeout, min_wait)
+    delay = max(SETTLE_INITIAL_DELAY, min_wait)
+    previous = None
+    while True:
+        await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        await coordinator.async_refresh()
+        watts = coordinator.power_watts
+        if watts is None:
+            return None
+        if previous is not None and abs(watts - previous) <= SETTLE_TOLERANCE * max(previous, 1):
+            return watts
+        if time.monotonic() >= deadline:
+            _LOGGER.debug("Power still moving after %.0fs (last %sW)", timeout, watts)
+            return watts
+        previous = watts
+        delay = min(delay * 2, SETTLE_MAX_DELAY)
+
+
+def _retune_wait(previous: Optional[str], applied: str) -> float:
+    """Return the minimum wait before reading power after applying a profile.
+
+    No write is sent when the miner already runs the profile, so there is
+    no retune to wait out.
+    """
+    return 0.0 if previous == applied else DEFAULT_RETUNE_SECONDS
+
+
+def _overshoots(watts: Optional[int], target: float) -> bool:
+    """Return True if the measured power is clearly above the target."""
+    return watts is not None and watts > target * (1 + OVERSHOOT_TOLERANCE)
+
+
+async def async_set_power_limit(
+    entry_data: Dict[str, Any],
+    target_watts: float,
+    settle_timeout: float = DEFAULT_SETTLE_TIMEOUT,
+) -> Dict[str, Any]:
+    """Limit a miner to ``target_watts`` and report the achieved power.
+
+    Uses the firmware's power target where supported. Otherwise applies the
+    highest catalog profile rated at or below the target (the lowest
+    profile if none is). Either way the measured power is awaited to settle
+    and the setting is refined by one step if the miner still overshoots.
+    """
+    if entry_data["api"].capabilities.get(CAP_POWER_TARGET):
+        return await _async_set_power_target(entry_data, target_watts, settle_timeout)
+
+    catalog = entry_data["profile_catalog"]
+    coordinator = entry_data["coordinator"]
+
+    chosen = catalog.for_budget(target_watts) or catalog.lowest
+    previous = entry_data["api"].state.profile
+    profile = await async_apply_profile(entry_data, chosen.name)
+    watts = await async_settled_power(coordinator, settle_timeout, _retune_wait(previous, profile))
+
+    refined = False
+    if _overshoots(watts, target_watts):
+        lower = catalog.step_down(profile)
+        if lower is not None:
+            _LOGGER.info(
+                "Profile %s draws %sW above the %.0fW limit, stepping down to %s",
+                profile,
+                watts,
+                target_watts,
+                lower.name,
+            )
+            previous = profile
+            profile = await async_apply_profile(entry_data, lower.name)
+            watts = await async_settled_power(coordinator, settle_timeout, _retune_wait(previous, profile))
+            refined = True
+
+    expected = catalog.get(profile)
+    report = {
+        "method": "profile",
+        "target_watts": target_watts,
+        "profile": profile,
+        "expected_watts": expected.watts if expected else None,
+        "power": watts,
+        "deviation_watts": watts - target_watts if watts is not None else None,
+        "within_limit": watts is not None and not _overshoots(watts, target_watts),
+        "refined": refined,
+    }
+    if watts is None:
+        _LOGGER.warning("Power limit %.0fW set via profile %s, but no power reading to verify", target_watts, profile)
+    else:
+        _LOGGER.info("Power limit %.0fW: profile %s draws %sW", target_watts, profile, watts)
+    return report
+
+
+async def _async_set_power_target(
+    entry_data: Dict[str, Any], target_watts: float, settle_timeout: float
+) -> Dict[str, Any]:
+    """Limit a miner through its power target, correcting one overshoot."""
+    api = entry_data["api"]
+    coordinator = entry_data["coordinator"]
+
+    setpoint = int(target_watts)
+    await api.set_power_target(setpoint)
+    watts = await async_settled_power(coordinator, settle_timeout, DEFAULT_RETUNE_SECONDS)
+
+    refined = False
+    if _overshoots(watts, target_watts):
+        setpoint = int(target_watts - (watts - target_watts))
+        _LOGGER.info("Miner draws %sW above the %.0fW limit, lowering power target to %dW", watts, target_watts, setpoint)
+        await api.set_power_target(setpoint)
+        watts = await async_settled_power(coordinator, settle_timeout, DEFAULT_RETUNE_SECONDS)
+        refined = True
+
+    _LOGGER.info("Power limit %.0fW: power target %dW draws %sW", target_watts, setpoint, watts)
+    return {
+        "method": "power_target",
+        "target_watts": target_watts,
+        "power_target": setpoint,
+        "power": watts,
+        "deviation_watts": watts - target_watts if watts is not None else None,
+        "within_limit": watts is not None and not _overshoots(watts, target_watts),
+        "refined": refined,
+    }
@@ -0,0 +1,187 @@
+"""Per-miner profile catalog compiled from the LuxOS ``profiles`` response."""
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .solar_policy import DEFAULT_RETUNE_SECONDS, ProfileModel
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CatalogProfile(NamedTuple):
+    """One LuxOS power profile."""
+
+    name: str
+    frequency: float  # MHz
+    watts: float
+    hashrate: float  # TH/s
+    step: str
+    voltage: float
+
+    @property
+    def efficiency(self) -> float:
+        """Return the efficiency in J/TH (infinite without hashrate)."""
+        if self.hashrate <= 0:
+            return float("inf")
+        return self.watts / self.hashrate
+
+
+def _to_float(value: Any) -> float:
+    """Convert a LuxOS numeric field to float (0 when missing or invalid)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ProfileCatalog:
+    """Profiles of one miner ordered by power draw.
+
+    Lookups by power budget, target hashrate and best efficiency under a
+    power cap are answered with a binary search over precomputed indexes.
+    """
+
+    def __init__(self, profiles: Iterable[CatalogProfile]) -> None:
+        """Build the catalog indexes."""
+        ordered = []
+        for profile in profiles:
+            if profile.watts > 0:
+                ordered.append(profile)
+            else:
+                _LOGGER.debug("Skipping profile %s without power figure", profile.name)
+        ordered.sort(key=lambda profile: (profile.watts, profile.hashrate))
+
+        self.profiles: List[CatalogProfile] = ordered
+        self.names: List[str] = [profile.name for profile in ordered]
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._watts = [profile.watts for profile in ordered]
+
+        # Most efficient profile among profiles[0..i]
+        self._best_upto: List[int] = []
+        best = 0
+        for i, profile in enumerate(ordered):
+            if profile.efficiency < ordered[best].efficiency:
+                best = i
+            self._best_upto.append(best)
+
+        # Profiles sorted by hashrate, with the cheapest one at or above each rank
+        by_hashrate = sorted(range(len(ordered)), key=lambda i: ordered[i].hashrate)
+        self._hashrates = [ordered[i].hashrate for i in by_hashrate]
+        self._cheapest_from: List[int] = [0] * len(by_hashrate)
+        cheapest: Optional[int] = None
+        for rank in range(len(by_hashrate) - 1, -1, -1):
+            i = by_hashrate[rank]
+            if cheapest is None or ordered[i].watts < ordered[cheapest].watts:
+                cheapest = i
+            self._cheapest_from[rank] = cheapest
+
+    @classmethod
+    def from_details(cls, details: Dict[str, Dict[str, Any]]) -> "ProfileCatalog":
+        """Build a catalog from profile details keyed by name."""
+        return cls(
+            CatalogProfile(
+                name,
+                _to_float(info.get("frequency")),
+                _to_float(info.get("watts")),
+                _to_float(info.get("hashrate")),
+                str(info.get("step", "0")),
+                _to_float(info.get("voltage")),
+            )
+            for name, info in details.items()
+        )
+
+    @classmethod
+    def from_models(cls, models: Dict[str, ProfileModel]) -> "ProfileCatalog":
+        """Build a catalog from profile models (e.g. the built-in S21+ table)."""
+        return cls(
+            CatalogProfile(model.name, 0.0, model.watts, model.hashrate, "0", 0.0)
+            for model in models.values()
+        )
+
+    def __len__(self) -> int:
+        """Return the number of profiles."""
+        return len(self.profiles)
+
+    def __contains__(self, name: object) -> bool:
+        """Return True if the miner has a profile of this name."""
+        return name in self._index
+
+    def __iter__(self) -> Iterator[CatalogProfile]:
+        """Iterate over profiles from lowest to highest power."""
+        return iter(self.profiles)
+
+    def get(self, name: Optional[str]) -> Optional[CatalogProfile]:
+        """Return a profile by name."""
+        index = self._index.get(name)
+        return self.profiles[index] if index is not None else None
+
+    @property
+    def lowest(self) -> Optional[CatalogProfile]:
+        """Return the profile with the lowest power draw."""
+        return self.profiles[0] if self.profiles else None
+
+    @property
+    def highest(self) -> Optional[CatalogProfile]:
+        """Return the profile with the highest power draw."""
+        return self.profiles[-1] if self.profiles else None
+
+    def for_budget(self, watts: float) -> Optional[CatalogProfile]:
+        """Return the highest-power profile drawing at most ``watts``."""
+        i = bisect_right(self._watts, watts) - 1
+        return self.profiles[i] if i >= 0 else None
+
+    def for_hashrate(self, hashrate: float) -> Optional[CatalogProfile]:
+        """Return the lowest-power profile delivering at least ``hashrate`` TH/s."""
+        rank = bisect_left(self._hashrates, hashrate)
+        if rank >= len(self._hashrates):
+            return None
+        return self.profiles[self._cheapest_from[rank]]
+
+    def most_efficient(self, max_watts: float) -> Optional[CatalogProfile]:
+        """Return the profile with the best J/TH drawing at most ``max_watts``."""
+        i = bisect_right(self._watts, max_watts) - 1
+        return self.profiles[self._best_upto[i]] if i >= 0 else None
+
+    def step_down(self, name: str) -> Optional[CatalogProfile]:
+        """Return the next lower-power profile."""
+        index = self._index.get(name)
+        if index is None or index == 0:
+            return None
+        return self.profiles[index - 1]
+
+    def step_up(self, name: str) -> Optional[CatalogProfile]:
+        """Return the next higher-power profile."""
+        index = self._index.get(name)
+        if index is None or index >= len(self.profiles) - 1:
+            return None
+        return self.profiles[index + 1]
+
+    def policy_map(self) -> List[Tuple[float, str]]:
+        """Return a ``SolarPolicy`` map selecting each profile at its own power."""
+        return [
+            (0.0 if i == 0 else profile.watts, profile.name)
+            for i, profile in enumerate(self.profiles)
+        ]
+
+    def profile_models(self, retune_seconds: float = DEFAULT_RETUNE_SECONDS) -> Dict[str, ProfileModel]:
+        """Return planner/cost models for every profile."""
+        return {
+            profile.name: ProfileModel(profile.name, profile.watts, profile.hashrate, retune_seconds)
+            for profile in self.profiles
+        }
+
+    def as_details(self) -> Dict[str, Dict[str, Any]]:
+        """Return profile details in the shape accepted by ``from_details``."""
+        return {
+            profile.name: {
+                "name": profile.name,
+                "frequency": profile.frequency,
+                "hashrate": profile.hashrate,
+                "watts": profile.watts,
+                "voltage": profile.voltage,
+                "step": profile.step,
+                "efficiency": round(profile.efficiency, 1) if profile.hashrate > 0 else None,
+                "description": f"{profile.frequency:g}MHz - {profile.hashrate:g}TH/s - {profile.watts:g}W",
+            }
+            for profile in self.profiles
+        }
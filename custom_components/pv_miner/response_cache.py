@@ -0,0 +1,83 @@
+"""TTL cache for LuxOS replies that only change when we change them."""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Seconds a successful reply stays valid, per command
+CACHE_TTLS = {
+    "version": 3600,
+    "profiles": 3600,
+    "config": 300,
+    "pools": 60,
+    "atm": 60,
+}
+
+# Cached commands whose replies a write command changes
+INVALIDATED_BY = {
+    "addpool": ("pools",),
+    "removepool": ("pools",),
+    "switchpool": ("pools",),
+    "enablepool": ("pools",),
+    "disablepool": ("pools",),
+    "profileset": ("profiles", "config"),
+    "frequencyset": ("profiles", "config"),
+    "powertargetset": ("config",),
+    "atmset": ("atm", "config"),
+    "curtail": ("config",),
+}
+
+
+class ResponseCache:
+    """Replies keyed by (command, parameter) with per-command TTLs."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None) -> None:
+        """Initialize the cache."""
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self._entries: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cacheable(self, command: str) -> bool:
+        """Return True if replies to this command are cached."""
+        return command in self.ttls
+
+    def get(self, command: str, parameter: str = "") -> Optional[Dict[str, Any]]:
+        """Return a fresh cached reply, counting the hit or miss."""
+        entry = self._entries.get((command, parameter))
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self._entries.pop((command, parameter), None)
+        self.misses += 1
+        return None
+
+    def put(self, command: str, parameter: str, result: Dict[str, Any]) -> None:
+        """Store a successful reply."""
+        status = result.get("STATUS")
+        if status and isinstance(status, list) and status[0].get("STATUS") not in ("S", "I"):
+            return
+        self._entries[(command, parameter)] = (time.monotonic() + self.ttls[command], result)
+
+    def invalidate(self, *commands: str) -> None:
+        """Drop all cached replies of these commands."""
+        for key in [key for key in self._entries if key[0] in commands]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached replies."""
+        self._entries.clear()
+
+    def written(self, command: str) -> None:
+        """Drop the replies a write command may have changed."""
+        related = INVALIDATED_BY.get(command)
+        if related:
+            self.invalidate(*related)
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        """Return the share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 3) if lookups else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {"cache_hits": self.hits, "cache_misses": self.misses, "cache_hit_ratio": self.hit_ratio}
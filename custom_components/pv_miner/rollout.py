@@ -0,0 +1,71 @@
+"""Staged fleet rollout for power-changing service calls."""
+import asyncio
+import logging
+import time
+from typing import List, Optional, Sequence, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fraction of the expected power step that counts as "ramped up"
+RAMP_SETTLE_RATIO = 0.8
+DEFAULT_VERIFY_TIMEOUT = 300  # seconds, covers a curtail wakeup
+VERIFY_INITIAL_DELAY = 2.0
+VERIFY_MAX_DELAY = 15.0
+
+
+def plan_batches(
+    steps: Sequence[Tuple[str, float]],
+    batch_size: Optional[int] = None,
+    max_ramp_watts: Optional[float] = None,
+) -> List[List[str]]:
+    """Split miners into batches by count and by summed power increase.
+
+    ``steps`` holds (key, expected power increase in W) per miner, in
+    rollout order. Power decreases count as zero. A miner whose step alone
+    exceeds the ramp limit still gets a batch of its own.
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    ramp = 0.0
+    for key, step in steps:
+        step = max(0.0, step)
+        full = batch_size is not None and len(current) >= batch_size
+        too_steep = max_ramp_watts is not None and current and ramp + step > max_ramp_watts
+        if full or too_steep:
+            batches.append(current)
+            current, ramp = [], 0.0
+        current.append(key)
+        ramp += step
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def async_wait_for_power(
+    coordinator,
+    target_watts: float,
+    timeout: float = DEFAULT_VERIFY_TIMEOUT,
+) -> Tuple[bool, Optional[int]]:
+    """Refresh a miner coordinator until its measured power reaches the target.
+
+    Returns (reached, last measured watts).
+    """
+    deadline = time.monotonic() + timeout
+    delay = VERIFY_INITIAL_DELAY
+    watts = None
+    while True:
+        await coordinator.async_refresh()
+        watts = coordinator.power_watts
+        if watts is not None and watts >= target_watts:
+            return True, watts
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _LOGGER.warning(
+                "Power did not reach %.0fW within %.0fs (last %sW)",
+                target_watts,
+                timeout,
+                watts,
+            )
+            return False, watts
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, VERIFY_MAX_DELAY)
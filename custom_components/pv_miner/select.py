@@ -9,7 +9,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, SOLAR_MODES
+from .const import CAP_PROFILES, DOMAIN, SOLAR_MODES
 from .luxos_api import LuxOSAPIError
 
 _LOGGER = logging.getLogger(__name__)
@@ -28,20 +28,18 @@ async def async_setup_entry(
     entities = []
     
     # Power profile selector
-    power_profile_entity = PVMinerPowerProfile(
-        coordinator,
-        api,
-        config_entry.entry_id,
-        config[CONF_NAME],
-    )
-    
-    # Update available profiles from miner
-    try:
-        await power_profile_entity.async_update_available_profiles()
-    except Exception as e:
-        _LOGGER.debug("Could not initialize profiles: %s", e)
-    
-    entities.append(power_profile_entity)
+    if api.supports(CAP_PROFILES):
+        entities.append(
+            PVMinerPowerProfile(
+                coordinator,
+                api,
+                config_entry.entry_id,
+                config[CONF_NAME],
+                hass.data[DOMAIN][config_entry.entry_id]["profile_catalog"],
+            )
+        )
+    else:
+        _LOGGER.info("Profiles not supported by %s, profile select not created", config[CONF_NAME])
     
     # Solar operation mode selector
     entities.append(
@@ -65,6 +63,7 @@ class PVMinerPowerProfile(CoordinatorEntity, SelectEntity):
         api,
         config_entry_id: str,
         miner_name: str,
+        profile_catalog,
     ) -> None:
         """Initialize the power profile selector."""
         super().__init__(coordinator)
@@ -72,8 +71,9 @@ class PVMinerPowerProfile(CoordinatorEntity, SelectEntity):
         self._config_entry_id = config_entry_id
         self._miner_name = miner_name
         self._current_profile = "default"  # Start with default profile
-        self._available_profiles = ["default"]  # Will be updated dynamically
-        self._profile_details = {}  # Store profile details for display
+        # Profiles from the miner's catalog, ordered by power draw
+        self._available_profiles = profile_catalog.names or ["default"]
+        self._profile_details = profile_catalog.as_details()
         
         self._attr_name = f"{miner_name} Power Profile"
         self._attr_unique_id = f"{config_entry_id}_power_profile"
@@ -94,22 +94,25 @@ class PVMinerPowerProfile(CoordinatorEntity, SelectEntity):
     @property
     def current_option(self) -> Optional[str]:
         """Return the current power profile."""
-        return self._current_profile
+        # The profile confirmed by the miner wins over the last selection
+        return self._api.state.profile or self._current_profile
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return additional state attributes."""
         attributes = {}
+        current_profile = self.current_option
         
         # Add current profile details if available
-        if self._current_profile and self._current_profile in self._profile_details:
-            details = self._profile_details[self._current_profile]
+        if current_profile and current_profile in self._profile_details:
+            details = self._profile_details[current_profile]
             attributes.update({
                 "frequency_mhz": details.get("frequency"),
                 "hashrate_ths": details.get("hashrate"),
                 "power_watts": details.get("watts"),
                 "voltage": details.get("voltage"),
                 "step": details.get("step"),
+                "efficiency_jth": details.get("efficiency"),
                 "description": details.get("description")
             })
         
@@ -121,6 +124,7 @@ class PVMinerPowerProfile(CoordinatorEntity, SelectEntity):
             attributes["available_profiles"] = profiles_summary
             
         attributes["total_profiles"] = len(self._available_profiles)
+        attributes["skipped_commands"] = self._api.state.skipped_total
         
         return attributes
 
@@ -130,10 +134,25 @@ class PVMinerPowerProfile(CoordinatorEntity, SelectEntity):
             _LOGGER.error("Invalid power profile: %s", option)
             return
         
+        # Hot hashboards cap the selectable profile
+        governor = getattr(self.coordinator, "thermal_governor", None)
+        if governor is not None:
+            capped = governor.cap(option)
+            if capped != option:
+                _LOGGER.warning(
+                    "Power profile '%s' exceeds thermal cap, using '%s' for miner %s",
+                    option,
+                    capped,
+                    self._miner_name,
+                )
+                option = capped
+        
         try:
             # Set profile for all boards (board=None means all boards)
             await self._api.set_profile(option)
             self._current_profile = option
+            if governor is not None:
+                governor.record_profile(option)
             
             _LOGGER.info(
                 "Set power profile '%s' for miner %s",
@@ -146,39 +165,6 @@ class PVMinerPowerProfile(CoordinatorEntity, SelectEntity):
             _LOGGER.error("Error setting power profile: %s", e)
             raise
 
-    async def async_update_available_profiles(self) -> None:
-        """Update the list of available profiles from the miner."""
-        try:
-            # Get profile names
-            profiles = await self._api.get_available_profiles()
-            
-            # Get detailed profile information
-            profile_details = await self._api.get_all_profiles_with_details()
-            
-            if profiles and profile_details:
-                self._available_profiles = profiles
-                self._profile_details = profile_details
-                self._attr_options = profiles
-                
-                _LOGGER.info(f"Updated {len(profiles)} dynamic profiles from miner")
-                _LOGGER.debug("Available profiles: %s", profiles)
-                
-                # Log some example profile details
-                for i, profile_name in enumerate(profiles[:3]):  # Show first 3
-                    if profile_name in profile_details:
-                        details = profile_details[profile_name]
-                        _LOGGER.debug(f"  {profile_name}: {details['description']}")
-                        
-            elif profiles:
-                # Fallback: just use profile names without details
-                self._available_profiles = profiles
-                self._attr_options = profiles
-                _LOGGER.info(f"Updated {len(profiles)} profiles (no details available)")
-                
-        except Exception as e:
-            _LOGGER.warning("Could not update available profiles: %s", e)
-            # Keep default profiles if API call fails
-
 
 class PVMinerSolarMode(CoordinatorEntity, SelectEntity):
     """Select entity for solar operation mode."""
@@ -2,12 +2,13 @@
 import logging
 from typing import Any, Dict, Optional
 
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN, SENSOR_TYPES
 
@@ -50,6 +51,54 @@ async def async_setup_entry(
             )
         )
     
+    # Profile cap applied by the thermal governor
+    if coordinator.thermal_governor is not None:
+        entities.append(
+            PVMinerThermalCapSensor(
+                coordinator,
+                config_entry.entry_id,
+                config[CONF_NAME],
+            )
+        )
+    
+    # Conditioned solar input used by the automatic solar control
+    solar_coordinator = hass.data[DOMAIN][config_entry.entry_id].get("solar_coordinator")
+    if solar_coordinator:
+        entities.append(
+            PVMinerFilteredSolarSensor(
+                coordinator,
+                solar_coordinator,
+                config_entry.entry_id,
+                config[CONF_NAME],
+            )
+        )
+        entities.append(
+            PVMinerCurtailSavingsSensor(
+                coordinator,
+                solar_coordinator,
+                config_entry.entry_id,
+                config[CONF_NAME],
+            )
+        )
+        if solar_coordinator.battery_budget is not None:
+            entities.append(
+                PVMinerBatteryBudgetSensor(
+                    coordinator,
+                    solar_coordinator,
+                    config_entry.entry_id,
+                    config[CONF_NAME],
+                )
+            )
+        if solar_coordinator.planner is not None:
+            entities.append(
+                PVMinerPlannedProfileSensor(
+                    coordinator,
+                    solar_coordinator,
+                    config_entry.entry_id,
+                    config[CONF_NAME],
+                )
+            )
+    
     async_add_entities(entities)
 
 
@@ -281,4 +330,256 @@ class PVMinerHashboardSensor(CoordinatorEntity, SensorEntity):
                 if temp_key in miner_stats:
                     return float(miner_stats[temp_key])
         
-        return None
\ No newline at end of file
+        return None
+
+
+class PVMinerThermalCapSensor(CoordinatorEntity, SensorEntity):
+    """Representation of the profile cap imposed by the thermal governor."""
+
+    def __init__(
+        self,
+        coordinator,
+        config_entry_id: str,
+        miner_name: str,
+    ) -> None:
+        """Initialize the thermal cap sensor."""
+        super().__init__(coordinator)
+        self._config_entry_id = config_entry_id
+        self._miner_name = miner_name
+        
+        self._attr_name = f"{miner_name} Thermal Profile Cap"
+        self._attr_unique_id = f"{config_entry_id}_thermal_profile_cap"
+        self._attr_icon = "mdi:thermometer-alert"
+
+    @property
+    def device_info(self) -> Dict[str, Any]:
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._config_entry_id)},
+            "name": self._miner_name,
+            "manufacturer": "Antminer",
+            "model": "Bitcoin Miner",
+            "sw_version": "LuxOS",
+        }
+
+    @property
+    def native_value(self) -> str:
+        """Return the highest allowed profile, or 'none' when uncapped."""
+        return self.coordinator.thermal_governor.cap_profile or "none"
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return governor diagnostics."""
+        return self.coordinator.thermal_governor.as_dict()
+
+
+class PVMinerFilteredSolarSensor(CoordinatorEntity, SensorEntity):
+    """Representation of the filtered solar power fed to the solar control."""
+
+    def __init__(
+        self,
+        coordinator,
+        solar_coordinator,
+        config_entry_id: str,
+        miner_name: str,
+    ) -> None:
+        """Initialize the filtered solar power sensor."""
+        super().__init__(coordinator)
+        self._solar_coordinator = solar_coordinator
+        self._config_entry_id = config_entry_id
+        self._miner_name = miner_name
+        
+        self._attr_name = f"{miner_name} Filtered Solar Power"
+        self._attr_unique_id = f"{config_entry_id}_filtered_solar_power"
+        self._attr_icon = "mdi:solar-power-variant"
+        self._attr_native_unit_of_measurement = "W"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to solar coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._solar_coordinator.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def device_info(self) -> Dict[str, Any]:
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._config_entry_id)},
+            "name": self._miner_name,
+            "manufacturer": "Antminer",
+            "model": "Bitcoin Miner",
+            "sw_version": "LuxOS",
+        }
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the filtered solar power."""
+        value = self._solar_coordinator.filtered_power
+        if value is None:
+            return None
+        return round(value)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return filter diagnostics."""
+        return self._solar_coordinator.signal_filter.as_dict()
+
+
+class PVMinerBatteryBudgetSensor(CoordinatorEntity, SensorEntity):
+    """Representation of the power budget left for mining after the battery."""
+
+    def __init__(
+        self,
+        coordinator,
+        solar_coordinator,
+        config_entry_id: str,
+        miner_name: str,
+    ) -> None:
+        """Initialize the battery budget sensor."""
+        super().__init__(coordinator)
+        self._solar_coordinator = solar_coordinator
+        self._config_entry_id = config_entry_id
+        self._miner_name = miner_name
+        
+        self._attr_name = f"{miner_name} Mining Power Budget"
+        self._attr_unique_id = f"{config_entry_id}_mining_power_budget"
+        self._attr_icon = "mdi:home-battery"
+        self._attr_native_unit_of_measurement = "W"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to solar coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._solar_coordinator.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def device_info(self) -> Dict[str, Any]:
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._config_entry_id)},
+            "name": self._miner_name,
+            "manufacturer": "Antminer",
+            "model": "Bitcoin Miner",
+            "sw_version": "LuxOS",
+        }
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the watts the miner may draw."""
+        budget = self._solar_coordinator.battery_budget.budget
+        if budget is None:
+            return None
+        return round(budget)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the battery band state."""
+        return self._solar_coordinator.battery_budget.as_dict()
+
+
+class PVMinerPlannedProfileSensor(CoordinatorEntity, SensorEntity):
+    """Representation of the forecast planner's profile for the current slot."""
+
+    def __init__(
+        self,
+        coordinator,
+        solar_coordinator,
+        config_entry_id: str,
+        miner_name: str,
+    ) -> None:
+        """Initialize the planned profile sensor."""
+        super().__init__(coordinator)
+        self._solar_coordinator = solar_coordinator
+        self._config_entry_id = config_entry_id
+        self._miner_name = miner_name
+        
+        self._attr_name = f"{miner_name} Planned Profile"
+        self._attr_unique_id = f"{config_entry_id}_planned_profile"
+        self._attr_icon = "mdi:calendar-clock"
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to solar coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._solar_coordinator.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def device_info(self) -> Dict[str, Any]:
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._config_entry_id)},
+            "name": self._miner_name,
+            "manufacturer": "Antminer",
+            "model": "Bitcoin Miner",
+            "sw_version": "LuxOS",
+        }
+
+    @property
+    def native_value(self) -> Optional[str]:
+        """Return the profile planned for the current slot."""
+        slot = self._solar_coordinator.planner.slot_at(dt_util.utcnow().timestamp())
+        if slot is None:
+            return None
+        return slot.profile
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the planned schedule."""
+        return self._solar_coordinator.planner.as_dict()
+
+
+class PVMinerCurtailSavingsSensor(CoordinatorEntity, SensorEntity):
+    """Representation of the energy saved by riding dips instead of sleeping."""
+
+    def __init__(
+        self,
+        coordinator,
+        solar_coordinator,
+        config_entry_id: str,
+        miner_name: str,
+    ) -> None:
+        """Initialize the curtail savings sensor."""
+        super().__init__(coordinator)
+        self._solar_coordinator = solar_coordinator
+        self._config_entry_id = config_entry_id
+        self._miner_name = miner_name
+        
+        self._attr_name = f"{miner_name} Curtail Energy Saved"
+        self._attr_unique_id = f"{config_entry_id}_curtail_energy_saved"
+        self._attr_icon = "mdi:weather-partly-cloudy"
+        self._attr_native_unit_of_measurement = "Wh"
+        self._attr_device_class = SensorDeviceClass.ENERGY
+        self._attr_state_class = SensorStateClass.TOTAL
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to solar coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._solar_coordinator.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def device_info(self) -> Dict[str, Any]:
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._config_entry_id)},
+            "name": self._miner_name,
+            "manufacturer": "Antminer",
+            "model": "Bitcoin Miner",
+            "sw_version": "LuxOS",
+        }
+
+    @property
+    def native_value(self) -> float:
+        """Return the energy saved versus sleeping through every dip."""
+        return round(self._solar_coordinator.cost_model.energy_saved_wh, 1)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return curtail decision counters."""
+        return self._solar_coordinator.cost_model.as_dict()
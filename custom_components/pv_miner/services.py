@@ -1,13 +1,28 @@
 """Service calls for PV Miner integration."""
+import asyncio
 import logging
-from typing import Any, Dict
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 import voluptuous as vol
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import CONF_NAME
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 
 from .const import (
+    DEFAULT_FLEET_CONCURRENCY,
     DOMAIN,
+    ECO_MODE_POWER,
     SERVICE_ECO_MODE,
     SERVICE_EMERGENCY_STOP,
     SERVICE_SET_POOL,
@@ -16,15 +31,31 @@ from .const import (
     SERVICE_SLEEP_MINER,
     SERVICE_SOLAR_MAX,
     SERVICE_WAKE_MINER,
+    SOLAR_MAX_POWER,
 )
-from .luxos_api import LuxOSAPIError
+from .luxos_api import LuxOSAPIError, trace_commands
+from .miner_state import observed_state
+from .power_limit import async_apply_profile, async_set_power_limit
+from .rollout import RAMP_SETTLE_RATIO, async_wait_for_power, plan_batches
 
 _LOGGER = logging.getLogger(__name__)
 
+# Commands read back after a service call to confirm profile, curtail and ATM state
+VERIFY_COMMANDS = ["devs", "config", "atm"]
+
+# Optional staged rollout controls for power-raising services
+ROLLOUT_FIELDS = {
+    vol.Optional("batch_size"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional("batch_delay", default=0): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+    vol.Optional("max_ramp_watts"): vol.All(vol.Coerce(int), vol.Range(min=100)),
+    vol.Optional("abort_on_failure", default=False): cv.boolean,
+}
+
 # Service schemas
 SET_POWER_PROFILE_SCHEMA = vol.Schema({
     vol.Required("entity_id"): cv.entity_ids,
     vol.Required("profile"): cv.string,  # Accept any valid profile name dynamically
+    **ROLLOUT_FIELDS,
 })
 
 SET_POWER_LIMIT_SCHEMA = vol.Schema({
@@ -38,6 +69,7 @@ EMERGENCY_STOP_SCHEMA = vol.Schema({
 
 SOLAR_MAX_SCHEMA = vol.Schema({
     vol.Required("entity_id"): cv.entity_ids,
+    **ROLLOUT_FIELDS,
 })
 
 ECO_MODE_SCHEMA = vol.Schema({
@@ -58,246 +90,478 @@ SLEEP_MINER_SCHEMA = vol.Schema({
 
 WAKE_MINER_SCHEMA = vol.Schema({
     vol.Required("entity_id"): cv.entity_ids,
+    **ROLLOUT_FIELDS,
 })
 
+# Built once per process; registration reuses them for every setup
+SERVICE_SCHEMAS = {
+    SERVICE_SET_POWER_PROFILE: SET_POWER_PROFILE_SCHEMA,
+    SERVICE_SET_POWER_LIMIT: SET_POWER_LIMIT_SCHEMA,
+    SERVICE_EMERGENCY_STOP: EMERGENCY_STOP_SCHEMA,
+    SERVICE_SOLAR_MAX: SOLAR_MAX_SCHEMA,
+    SERVICE_ECO_MODE: ECO_MODE_SCHEMA,
+    SERVICE_SET_POOL: SET_POOL_SCHEMA,
+    SERVICE_SLEEP_MINER: SLEEP_MINER_SCHEMA,
+    SERVICE_WAKE_MINER: WAKE_MINER_SCHEMA,
+}
+
 
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for the PV Miner integration."""
+    entity_index = EntityEntryIndex(hass)
+    entity_index.async_start()
     
-    async def handle_set_power_profile(call: ServiceCall) -> None:
+    async def handle_set_power_profile(call: ServiceCall) -> ServiceResponse:
         """Handle set power profile service call."""
-        entity_ids = call.data["entity_id"]
-        profile = call.data["profile"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _set_power_profile, profile=profile
-            )
+        return _service_response(await _async_fan_out(
+            hass, entity_index, call.data["entity_id"], _set_power_profile,
+            rollout=_rollout_options(call.data),
+            profile=call.data["profile"],
+        ))
 
-    async def handle_set_power_limit(call: ServiceCall) -> None:
+    async def handle_set_power_limit(call: ServiceCall) -> ServiceResponse:
         """Handle set power limit service call."""
-        entity_ids = call.data["entity_id"]
-        power_limit = call.data["power_limit"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _set_power_limit, power_limit=power_limit
-            )
+        return _service_response(await _async_fan_out(
+            hass, entity_index, call.data["entity_id"], _set_power_limit,
+            power_limit=call.data["power_limit"],
+        ))
 
-    async def handle_emergency_stop(call: ServiceCall) -> None:
+    async def handle_emergency_stop(call: ServiceCall) -> ServiceResponse:
         """Handle emergency stop service call."""
-        entity_ids = call.data["entity_id"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _emergency_stop
-            )
+        return _service_response(
+            await _async_fan_out(hass, entity_index, call.data["entity_id"], _emergency_stop)
+        )
 
-    async def handle_solar_max(call: ServiceCall) -> None:
+    async def handle_solar_max(call: ServiceCall) -> ServiceResponse:
         """Handle solar max service call."""
-        entity_ids = call.data["entity_id"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _solar_max
-            )
+        return _service_response(await _async_fan_out(
+            hass, entity_index, call.data["entity_id"], _solar_max,
+            rollout=_rollout_options(call.data),
+        ))
 
-    async def handle_eco_mode(call: ServiceCall) -> None:
+    async def handle_eco_mode(call: ServiceCall) -> ServiceResponse:
         """Handle eco mode service call."""
-        entity_ids = call.data["entity_id"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _eco_mode
-            )
+        return _service_response(
+            await _async_fan_out(hass, entity_index, call.data["entity_id"], _eco_mode)
+        )
 
-    async def handle_set_pool(call: ServiceCall) -> None:
+    async def handle_set_pool(call: ServiceCall) -> ServiceResponse:
         """Handle set pool service call."""
-        entity_ids = call.data["entity_id"]
-        pool_url = call.data["pool_url"]
-        pool_user = call.data["pool_user"]
-        pool_password = call.data["pool_password"]
-        priority = call.data["priority"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _set_pool,
-                pool_url=pool_url,
-                pool_user=pool_user,
-                pool_password=pool_password,
-                priority=priority
-            )
-
-    async def handle_sleep_miner(call: ServiceCall) -> None:
+        return _service_response(await _async_fan_out(
+            hass, entity_index, call.data["entity_id"], _set_pool,
+            pool_url=call.data["pool_url"],
+            pool_user=call.data["pool_user"],
+            pool_password=call.data["pool_password"],
+            priority=call.data["priority"],
+        ))
+
+    async def handle_sleep_miner(call: ServiceCall) -> ServiceResponse:
         """Handle sleep miner service call."""
-        entity_ids = call.data["entity_id"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _sleep_miner
-            )
+        return _service_response(
+            await _async_fan_out(hass, entity_index, call.data["entity_id"], _sleep_miner)
+        )
 
-    async def handle_wake_miner(call: ServiceCall) -> None:
+    async def handle_wake_miner(call: ServiceCall) -> ServiceResponse:
         """Handle wake miner service call."""
-        entity_ids = call.data["entity_id"]
-        
-        for entity_id in entity_ids:
-            await _execute_service_for_entity(
-                hass, entity_id, _wake_miner
-            )
+        return _service_response(await _async_fan_out(
+            hass, entity_index, call.data["entity_id"], _wake_miner,
+            rollout=_rollout_options(call.data),
+        ))
+
+    handlers = {
+        SERVICE_SET_POWER_PROFILE: handle_set_power_profile,
+        SERVICE_SET_POWER_LIMIT: handle_set_power_limit,
+        SERVICE_EMERGENCY_STOP: handle_emergency_stop,
+        SERVICE_SOLAR_MAX: handle_solar_max,
+        SERVICE_ECO_MODE: handle_eco_mode,
+        SERVICE_SET_POOL: handle_set_pool,
+        SERVICE_SLEEP_MINER: handle_sleep_miner,
+        SERVICE_WAKE_MINER: handle_wake_miner,
+    }
+
+    # Register services with the schemas built when this module was imported
+    for service, schema in SERVICE_SCHEMAS.items():
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            handlers[service],
+            schema=schema,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+
+class EntityEntryIndex:
+    """Map PV Miner entity ids to their config entries.
+
+    Built from the entity and device registries on first use and kept in
+    sync through registry update events.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the index."""
+        self.hass = hass
+        self._index: Optional[Dict[str, str]] = None
+        self._unsub: List[Callable[[], None]] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Listen for registry changes."""
+        self._unsub.append(
+            self.hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_updated)
+        )
+        self._unsub.append(
+            self.hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_updated)
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for registry changes."""
+        while self._unsub:
+            self._unsub.pop()()
+
+    def _entry_id_for(self, entity_entry: er.RegistryEntry) -> Optional[str]:
+        """Return the config entry of a registry entry, via its device if needed."""
+        if entity_entry.config_entry_id:
+            return entity_entry.config_entry_id
+        if entity_entry.device_id:
+            device = dr.async_get(self.hass).async_get(entity_entry.device_id)
+            if device:
+                for entry_id in device.config_entries:
+                    if entry_id in self.hass.data.get(DOMAIN, {}):
+                        return entry_id
+        return None
+
+    def _build(self) -> Dict[str, str]:
+        """Build the index from the entity registry."""
+        index = {}
+        for entity_entry in er.async_get(self.hass).entities.values():
+            if entity_entry.platform != DOMAIN:
+                continue
+            entry_id = self._entry_id_for(entity_entry)
+            if entry_id:
+                index[entity_entry.entity_id] = entry_id
+        return index
+
+    @callback
+    def _async_entity_updated(self, event: Event) -> None:
+        """Apply an entity registry change to the index."""
+        if self._index is None:
+            return
+        entity_id = event.data.get("entity_id")
+        self._index.pop(entity_id, None)
+        if event.data.get("old_entity_id"):
+            self._index.pop(event.data["old_entity_id"], None)
+        if event.data.get("action") == "remove":
+            return
+        entity_entry = er.async_get(self.hass).async_get(entity_id)
+        if entity_entry and entity_entry.platform == DOMAIN:
+            entry_id = self._entry_id_for(entity_entry)
+            if entry_id:
+                self._index[entity_id] = entry_id
+
+    @callback
+    def _async_device_updated(self, event: Event) -> None:
+        """Rebuild lazily after a device changed its config entries."""
+        self._index = None
+
+    def resolve(self, entity_id: str) -> Optional[str]:
+        """Return the loaded config entry id owning an entity."""
+        if self._index is None:
+            self._index = self._build()
+        entry_id = self._index.get(entity_id)
+        if entry_id in self.hass.data.get(DOMAIN, {}):
+            return entry_id
+        return None
+
+
+def _rollout_options(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the staged rollout options of a call, or None to run all at once."""
+    if data.get("batch_size") is None and data.get("max_ramp_watts") is None:
+        return None
+    return {
+        "batch_size": data.get("batch_size"),
+        "batch_delay": data.get("batch_delay", 0),
+        "max_ramp_watts": data.get("max_ramp_watts"),
+        "abort_on_failure": data.get("abort_on_failure", False),
+    }
+
+
+def _service_response(per_miner: Dict[str, Dict[str, Any]]) -> ServiceResponse:
+    """Return the service response for per-miner results."""
+    return {
+        "success": bool(per_miner) and all(result["success"] for result in per_miner.values()),
+        "miners": per_miner,
+    }
+
+
+async def _async_verified_state(entry_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Read back the state a service call may have changed.
+
+    Only states the miner reported are returned. The full coordinator poll
+    is requested, not awaited.
+    """
+    api = entry_data["api"]
+    try:
+        data = await api.execute_batch(VERIFY_COMMANDS)
+    except LuxOSAPIError as e:
+        _LOGGER.warning("Could not read back the state of %s: %s", api.host, e)
+        return {}
+    api.state.observe(data)
+    await entry_data["coordinator"].async_request_refresh()
+    return observed_state(data)
 
-    # Register services
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SET_POWER_PROFILE,
-        handle_set_power_profile,
-        schema=SET_POWER_PROFILE_SCHEMA,
-    )
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SET_POWER_LIMIT,
-        handle_set_power_limit,
-        schema=SET_POWER_LIMIT_SCHEMA,
-    )
+async def _async_fan_out(
+    hass: HomeAssistant,
+    entity_index: EntityEntryIndex,
+    entity_ids: List[str],
+    service_func,
+    rollout: Optional[Dict[str, Any]] = None,
+    **kwargs
+) -> Dict[str, Dict[str, Any]]:
+    """Run a service function on every miner behind the entities.
+
+    Entities of the same miner are merged into one call. Without rollout
+    options all miners run concurrently (at most DEFAULT_FLEET_CONCURRENCY
+    at once); with them the miners are staged in verified batches. Returns
+    the per-miner results keyed by config entry id; entities that belong to
+    no miner are reported as failed results keyed by entity id.
+    """
+    targets: Dict[str, List[str]] = {}
+    unresolved: Dict[str, Dict[str, Any]] = {}
+    for entity_id in entity_ids:
+        entry_id = entity_index.resolve(entity_id)
+        if entry_id is None:
+            _LOGGER.error("Could not find config entry for entity %s", entity_id)
+            unresolved[entity_id] = {
+                "miner": None,
+                "success": False,
+                "error": f"{entity_id} does not belong to a PV Miner",
+                "entity_ids": [entity_id],
+            }
+            continue
+        targets.setdefault(entry_id, []).append(entity_id)
+
+    if rollout is None:
+        per_miner = await _async_run_batch(hass, list(targets), service_func, **kwargs)
+    else:
+        per_miner = await _async_staged_rollout(hass, list(targets), service_func, rollout, **kwargs)
+    for entry_id, result in per_miner.items():
+        result["entity_ids"] = targets[entry_id]
+    per_miner.update(unresolved)
+
+    failed = [
+        result["miner"] or result["entity_ids"][0]
+        for result in per_miner.values()
+        if not result["success"]
+    ]
+    if failed:
+        _LOGGER.warning(
+            "%s failed on %d of %d miners: %s",
+            service_func.__name__.lstrip("_"),
+            len(failed),
+            len(per_miner),
+            ", ".join(failed),
+        )
+    return per_miner
+
+
+async def _async_run_batch(
+    hass: HomeAssistant,
+    entry_ids: List[str],
+    service_func,
+    **kwargs
+) -> Dict[str, Dict[str, Any]]:
+    """Run a service function concurrently on a set of miners."""
+    semaphore = asyncio.Semaphore(DEFAULT_FLEET_CONCURRENCY)
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_EMERGENCY_STOP,
-        handle_emergency_stop,
-        schema=EMERGENCY_STOP_SCHEMA,
-    )
+    async def _run(entry_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await _execute_service_for_entry(hass, entry_id, service_func, **kwargs)
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SOLAR_MAX,
-        handle_solar_max,
-        schema=SOLAR_MAX_SCHEMA,
-    )
+    results = await asyncio.gather(*(_run(entry_id) for entry_id in entry_ids))
+    return dict(zip(entry_ids, results))
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_ECO_MODE,
-        handle_eco_mode,
-        schema=ECO_MODE_SCHEMA,
-    )
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SET_POOL,
-        handle_set_pool,
-        schema=SET_POOL_SCHEMA,
-    )
+def _expected_watts(entry_data: Dict[str, Any], service_func, **kwargs) -> Optional[float]:
+    """Return the power a miner is expected to draw after the service call."""
+    catalog = entry_data["profile_catalog"]
+    if service_func is _set_power_profile:
+        profile = catalog.get(kwargs.get("profile"))
+    elif service_func is _solar_max:
+        profile = catalog.for_budget(SOLAR_MAX_POWER) or catalog.lowest
+    else:
+        # A woken miner resumes its last profile - assume the worst case
+        profile = catalog.highest
+    return profile.watts if profile else None
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SLEEP_MINER,
-        handle_sleep_miner,
-        schema=SLEEP_MINER_SCHEMA,
-    )
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_WAKE_MINER,
-        handle_wake_miner,
-        schema=WAKE_MINER_SCHEMA,
+async def _async_staged_rollout(
+    hass: HomeAssistant,
+    entry_ids: List[str],
+    service_func,
+    rollout: Dict[str, Any],
+    **kwargs
+) -> Dict[str, Dict[str, Any]]:
+    """Apply a power-raising service in batches limited by count and watt ramp.
+
+    Each batch is verified through the coordinators' measured power before
+    the next one starts, so the fleet ramps as fast as the limits allow.
+    """
+    steps = []
+    expected: Dict[str, Optional[float]] = {}
+    current: Dict[str, float] = {}
+    for entry_id in entry_ids:
+        entry_data = hass.data[DOMAIN][entry_id]
+        expected[entry_id] = _expected_watts(entry_data, service_func, **kwargs)
+        current[entry_id] = entry_data["coordinator"].power_watts or 0
+        step = (expected[entry_id] or 0) - current[entry_id]
+        steps.append((entry_id, step))
+
+    batches = plan_batches(steps, rollout["batch_size"], rollout["max_ramp_watts"])
+    _LOGGER.info(
+        "Rolling out %s to %d miners in %d batches",
+        service_func.__name__.lstrip("_"),
+        len(entry_ids),
+        len(batches),
     )
 
+    results: Dict[str, Dict[str, Any]] = {}
+    for number, batch in enumerate(batches):
+        if number and rollout["batch_delay"]:
+            await asyncio.sleep(rollout["batch_delay"])
+
+        batch_results = await _async_run_batch(hass, batch, service_func, **kwargs)
+
+        async def _verify(entry_id: str) -> None:
+            result = batch_results[entry_id]
+            step = (expected[entry_id] or 0) - current[entry_id]
+            if not result["success"] or step <= 0:
+                return
+            coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
+            reached, watts = await async_wait_for_power(
+                coordinator, current[entry_id] + step * RAMP_SETTLE_RATIO
+            )
+            result["power"] = watts
+            if not reached:
+                result["success"] = False
+                result["error"] = f"power did not ramp up (last {watts}W)"
+
+        await asyncio.gather(*(_verify(entry_id) for entry_id in batch))
+        results.update(batch_results)
+
+        if rollout["abort_on_failure"] and not all(r["success"] for r in batch_results.values()):
+            remaining = [entry_id for later in batches[number + 1:] for entry_id in later]
+            _LOGGER.warning("Rollout aborted after batch %d; %d miners skipped", number + 1, len(remaining))
+            for entry_id in remaining:
+                results[entry_id] = {
+                    "miner": hass.data[DOMAIN][entry_id]["config"][CONF_NAME],
+                    "success": False,
+                    "error": "rollout aborted",
+                }
+            break
 
-async def _execute_service_for_entity(
+    return results
+
+
+async def _execute_service_for_entry(
     hass: HomeAssistant,
-    entity_id: str,
+    config_entry_id: str,
     service_func,
     **kwargs
-) -> None:
-    """Execute a service function for a specific entity."""
-    # Find the config entry for this entity
-    config_entry_id = None
-    for entry_id, entry_data in hass.data[DOMAIN].items():
-        # Check if this entity belongs to this config entry
-        # This is a simplified approach - in reality you'd need to track entity-to-config mappings
-        config_entry_id = entry_id
-        break
+) -> Dict[str, Any]:
+    """Execute a service function for one miner and return its result.
+
+    The result holds the LuxOS STATUS message of the last write, the
+    latency and retries of the call, and the state read back from the
+    miner afterwards.
+    """
+    entry_data = hass.data[DOMAIN][config_entry_id]
+    miner = entry_data["config"][CONF_NAME]
+    result: Dict[str, Any] = {"miner": miner, "success": True, "error": None}
     
-    if not config_entry_id:
-        _LOGGER.error("Could not find config entry for entity %s", entity_id)
-        return
-    
-    api = hass.data[DOMAIN][config_entry_id]["api"]
-    coordinator = hass.data[DOMAIN][config_entry_id]["coordinator"]
-    
-    try:
-        await service_func(api, **kwargs)
-        await coordinator.async_request_refresh()
-    except LuxOSAPIError as e:
-        _LOGGER.error("Service call failed for %s: %s", entity_id, e)
-
-
-async def _set_power_profile(api, profile: str) -> None:
-    """Set power profile via API using dynamic LuxOS profiles."""
+    start = time.monotonic()
+    with trace_commands() as commands:
+        try:
+            outcome = await service_func(entry_data, **kwargs)
+        except (LuxOSAPIError, HomeAssistantError) as e:
+            _LOGGER.error("Service call failed for %s: %s", miner, e)
+            result.update(success=False, error=str(e))
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected error in service call for %s", miner)
+            result.update(success=False, error=str(e))
+        else:
+            if isinstance(outcome, dict):
+                result.update(outcome)
+    result["latency_ms"] = round((time.monotonic() - start) * 1000)
+    result["message"] = commands[-1]["msg"] if commands else None
+    result["retries"] = sum(command["retries"] for command in commands)
+    result["commands"] = commands
+
+    result["verified"] = await _async_verified_state(entry_data) if result["success"] else {}
+    return result
+
+
+async def _set_power_profile(entry_data: Dict[str, Any], profile: str) -> None:
+    """Set power profile via API using the miner's profile catalog."""
+    catalog = entry_data["profile_catalog"]
+    if profile not in catalog:
+        raise HomeAssistantError(
+            f"Unknown power profile '{profile}' (available: {', '.join(catalog.names)})"
+        )
     try:
-        # Use the LuxOS profile system directly
-        await api.set_profile(profile)
-        _LOGGER.info("Set power profile to '%s'", profile)
+        applied = await async_apply_profile(entry_data, profile)
+        _LOGGER.info("Set power profile to '%s'", applied)
     except Exception as e:
         _LOGGER.error("Failed to set power profile '%s': %s", profile, e)
         raise
 
 
-async def _set_power_limit(api, power_limit: int) -> None:
-    """Set power limit via API."""
-    # This is a simplified approach - actual implementation would depend on LuxOS capabilities
-    # For now, we'll map power limits to frequency offsets
-    
-    if power_limit <= 1500:
-        # Eco mode
-        frequency = -8
-    elif power_limit <= 3000:
-        # Balanced mode
-        frequency = 0
-    elif power_limit >= 4200:
-        # Max power mode
-        frequency = 2
-    else:
-        # Calculate frequency based on power
-        frequency = int((power_limit - 3000) / 600)  # Rough calculation
-        frequency = max(-16, min(4, frequency))
-    
-    await api.set_frequency(frequency)
-    _LOGGER.info("Set power limit to %dW (frequency offset: %d)", power_limit, frequency)
+async def _set_power_for_budget(entry_data: Dict[str, Any], watts: int) -> str:
+    """Set the highest profile that fits the power budget (lowest if none does)."""
+    catalog = entry_data["profile_catalog"]
+    target = catalog.for_budget(watts) or catalog.lowest
+    return await async_apply_profile(entry_data, target.name)
 
 
-async def _emergency_stop(api) -> None:
+async def _set_power_limit(entry_data: Dict[str, Any], power_limit: int) -> Dict[str, Any]:
+    """Limit the miner's power and report the measured result."""
+    return await async_set_power_limit(entry_data, power_limit)
+
+
+async def _emergency_stop(entry_data: Dict[str, Any]) -> None:
     """Emergency stop all mining operations."""
-    await api.pause_mining()
+    await entry_data["api"].pause_mining(force=True)
     _LOGGER.info("Emergency stop executed")
 
 
-async def _solar_max(api) -> None:
+async def _solar_max(entry_data: Dict[str, Any]) -> None:
     """Set to solar max mode (4200W)."""
-    await api.set_frequency(2)  # Max power overclock
-    _LOGGER.info("Solar max mode activated (4200W)")
+    profile = await _set_power_for_budget(entry_data, SOLAR_MAX_POWER)
+    _LOGGER.info("Solar max mode activated (%dW, profile %s)", SOLAR_MAX_POWER, profile)
 
 
-async def _eco_mode(api) -> None:
+async def _eco_mode(entry_data: Dict[str, Any]) -> None:
     """Set to eco mode (1500W)."""
-    await api.set_frequency(-8)  # Eco underclock
-    _LOGGER.info("Eco mode activated (1500W)")
+    profile = await _set_power_for_budget(entry_data, ECO_MODE_POWER)
+    _LOGGER.info("Eco mode activated (%dW, profile %s)", ECO_MODE_POWER, profile)
 
 
-async def _set_pool(api, pool_url: str, pool_user: str, pool_password: str, priority: int) -> None:
+async def _set_pool(
+    entry_data: Dict[str, Any], pool_url: str, pool_user: str, pool_password: str, priority: int
+) -> None:
     """Add and switch to a new mining pool."""
-    await api.add_pool(pool_url, pool_user, pool_password, priority)
+    await entry_data["api"].add_pool(pool_url, pool_user, pool_password, priority)
     _LOGGER.info("Added mining pool: %s", pool_url)
 
 
-async def _sleep_miner(api) -> None:
+async def _sleep_miner(entry_data: Dict[str, Any]) -> None:
     """Put the miner into sleep mode (curtail sleep)."""
-    await api.pause_mining()
+    await entry_data["api"].pause_mining(force=True)
     _LOGGER.info("Miner put into sleep mode (curtail sleep)")
 
 
-async def _wake_miner(api) -> None:
+async def _wake_miner(entry_data: Dict[str, Any]) -> None:
     """Wake up the miner from sleep mode (curtail wakeup)."""
-    await api.resume_mining()
-    _LOGGER.info("Miner woken up from sleep mode (curtail wakeup)")
\ No newline at end of file
+    await entry_data["api"].resume_mining(force=True)
+    _LOGGER.info("Miner woken up from sleep mode (curtail wakeup)")
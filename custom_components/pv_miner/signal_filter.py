@@ -0,0 +1,205 @@
+"""Signal conditioning for the solar power reading."""
+import logging
+from collections import deque
+from statistics import median
+from typing import Any, Dict, List, Optional, Sequence
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SolarSignalFilter:
+    """Rolling median + EWMA filter with spike/dropout rejection.
+
+    The coordinator feeds the sensor reading on every tick, also when the
+    value has not changed (HA does not bump ``last_updated`` for a steady
+    reading). A sample that deviates from the window median by more than
+    the spike threshold is held back instead of entering the window: a
+    single glitch (e.g. a 0W dropout from the Shelly meter) is discarded
+    once the next normal sample arrives, while a run of consistent outliers
+    longer than half the window is a real step change and enters the window
+    together. The median is then smoothed with an EWMA. The signal is stale
+    while the source entity is unavailable or has not reported a reading for
+    longer than ``max_age`` (a frozen meter).
+    """
+
+    def __init__(
+        self,
+        window: int = 5,
+        alpha: float = 0.5,
+        spike_threshold: float = 0.5,
+        spike_min_watts: float = 300.0,
+        max_age: float = 600.0,
+    ) -> None:
+        """Initialize the filter."""
+        if window < 1:
+            raise ValueError("Filter window must be at least 1 sample")
+        if not 0 < alpha <= 1:
+            raise ValueError("EWMA alpha must be in (0, 1]")
+
+        self.window = window
+        self.alpha = alpha
+        self.spike_threshold = spike_threshold
+        self.spike_min_watts = spike_min_watts
+        self.max_age = max_age
+
+        self._samples: deque = deque(maxlen=window)
+        # Outliers held back until they prove to be a step change
+        self._held: List[float] = []
+        self._value: Optional[float] = None
+        self._raw: Optional[float] = None
+        self._stale = False
+        self.accepted = 0
+        self.rejected = 0
+
+    @property
+    def value(self) -> Optional[float]:
+        """Return the filtered power, or None while stale or empty."""
+        if self._stale:
+            return None
+        return self._value
+
+    @property
+    def raw(self) -> Optional[float]:
+        """Return the last raw sample."""
+        return self._raw
+
+    @property
+    def is_stale(self) -> bool:
+        """Return True while the source sensor is unavailable or frozen."""
+        return self._stale
+
+    def _deviates(self, sample: float, reference: float) -> bool:
+        """Return True if the sample is too far from the reference."""
+        limit = max(self.spike_min_watts, abs(reference) * self.spike_threshold)
+        return abs(sample - reference) > limit
+
+    def is_outlier(self, sample: float) -> bool:
+        """Return True if the sample deviates too far from the window median."""
+        if not self._samples:
+            return False
+        return self._deviates(sample, median(self._samples))
+
+    def push(self, sample: float) -> float:
+        """Feed a sample through the rejection stage and return the window median."""
+        if not self._samples:
+            self.accepted += 1
+            self._samples.append(sample)
+            return sample
+        reference = median(self._samples)
+        if not self._deviates(sample, reference):
+            self._discard_held()
+            self.accepted += 1
+            self._samples.append(sample)
+            return median(self._samples)
+
+        if self._held and self._deviates(sample, median(self._held)):
+            # Not the same level as the held run - that run was glitches
+            self._discard_held()
+        self._held.append(sample)
+        if len(self._held) <= self.window // 2:
+            _LOGGER.debug("Holding back solar sample %.0fW (window median %.0fW)", sample, reference)
+            return reference
+        # A persistent new level, not a glitch
+        self.accepted += len(self._held)
+        self._samples.extend(self._held)
+        self._held.clear()
+        return median(self._samples)
+
+    def _discard_held(self) -> None:
+        """Drop held-back outliers as rejected."""
+        if self._held:
+            self.rejected += len(self._held)
+            _LOGGER.debug("Rejected %d solar sample(s) as spike/dropout", len(self._held))
+            self._held.clear()
+
+    def update(self, sample: float, age: Optional[float] = None) -> Optional[float]:
+        """Feed a raw sample (one per tick) and return the filtered value.
+
+        ``age`` is the seconds since the source sensor last reported. A
+        reading older than ``max_age`` makes the signal stale and returns None.
+        """
+        if age is not None and age > self.max_age:
+            if not self._stale:
+                _LOGGER.warning("Solar sensor has not reported for %.0fs - holding current state", age)
+            self._stale = True
+            return None
+        if self._stale:
+            _LOGGER.info("Solar sensor available again")
+        self._stale = False
+        self._raw = sample
+
+        filtered_median = self.push(sample)
+        if self._value is None:
+            self._value = filtered_median
+        else:
+            self._value += self.alpha * (filtered_median - self._value)
+        return self._value
+
+    def mark_unavailable(self) -> None:
+        """Mark the signal stale because the source sensor is unavailable."""
+        if not self._stale:
+            _LOGGER.warning("Solar sensor unavailable - holding current state")
+        self._stale = True
+
+    def reset(self) -> None:
+        """Clear the filter state."""
+        self._samples.clear()
+        self._held.clear()
+        self._value = None
+        self._raw = None
+        self._stale = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return filter diagnostics for state attributes."""
+        return {
+            "raw_power": self._raw,
+            "window": self.window,
+            "alpha": self.alpha,
+            "samples": len(self._samples),
+            "held_samples": len(self._held),
+            "accepted_samples": self.accepted,
+            "rejected_samples": self.rejected,
+            "stale": self._stale,
+        }
+
+
+def filter_series(
+    samples: Sequence[float],
+    window: int = 5,
+    alpha: float = 0.5,
+    spike_threshold: float = 0.5,
+    spike_min_watts: float = 300.0,
+):
+    """Equivalent of feeding ``samples`` through SolarSignalFilter.update.
+
+    Used by the offline simulator; requires numpy. The rejection stage runs
+    the live filter's own ``push``; the EWMA is vectorized. Staleness is not
+    applied here - callers drop or hold unavailable samples themselves.
+    """
+    import numpy as np
+
+    values = np.asarray(samples, dtype=float)
+    count = len(values)
+    if count == 0:
+        return np.empty(0)
+
+    stage = SolarSignalFilter(window, 1.0, spike_threshold, spike_min_watts)
+    medians = np.fromiter((stage.push(sample) for sample in values.tolist()), dtype=float, count=count)
+
+    if alpha >= 1:
+        return medians
+
+    # EWMA in closed form per block: y_k = b^k * (b*y_prev + a*sum_j m_j*b^-j).
+    # The block length keeps b^-k well inside float range.
+    decay = 1.0 - alpha
+    block = max(1, min(1024, int(200 / max(np.log10(1 / decay), 1e-12))))
+    output = np.empty(count)
+    output[0] = medians[0]
+    previous = medians[0]
+    for start in range(1, count, block):
+        chunk = medians[start:start + block]
+        powers = decay ** np.arange(len(chunk))
+        partial = np.cumsum(chunk / powers) * alpha
+        output[start:start + len(chunk)] = powers * (decay * previous + partial)
+        previous = output[start + len(chunk) - 1]
+    return output
@@ -1,39 +1,37 @@
 """Solar power coordinator for automatic miner power adjustment."""
+import asyncio
 import logging
 from datetime import timedelta
-from typing import Optional
+from typing import Callable, List, Optional
 
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import (
+    DEFAULT_SOLAR_FILTER_ALPHA,
+    DEFAULT_SOLAR_FILTER_WINDOW,
+    DEFAULT_SOLAR_MAX_AGE,
+    DEFAULT_SOLAR_SPIKE_MIN_WATTS,
+    DEFAULT_SOLAR_SPIKE_THRESHOLD,
+    DOMAIN,
+)
+from .battery_budget import BatteryBudget
+from .curtail_cost import CHOICE_LOWEST, CHOICE_RIDE, CurtailCostModel
+from .forecast_planner import DEFAULT_PLANNER_REPLAN_INTERVAL, ForecastPlanner, parse_forecast
+from .profile_catalog import ProfileCatalog
+from .signal_filter import SolarSignalFilter
+from .solar_policy import (
+    POWER_PROFILE_MAP,
+    SLEEP_PROFILE,
+    SolarPolicy,
+    default_profile_models,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-# Power profile mapping: available solar power (W) -> LuxOS profile name
-# Uses all profiles from -16 (260MHz) to +1 (685MHz)
-POWER_PROFILE_MAP = [
-    (0, "260MHz"),      # 0-2300W: Profile -16 (Min: 2223W, 48 TH/s)
-    (2300, "285MHz"),   # 2300-2400W: Profile -15
-    (2400, "310MHz"),   # 2400-2500W: Profile -14
-    (2500, "335MHz"),   # 2500-2600W: Profile -12
-    (2600, "360MHz"),   # 2600-2700W: Profile -10
-    (2700, "385MHz"),   # 2700-2800W: Profile -8 (Low)
-    (2800, "410MHz"),   # 2800-2900W: Profile -7
-    (2900, "435MHz"),   # 2900-3000W: Profile -5
-    (3000, "460MHz"),   # 3000-3100W: Profile -6
-    (3100, "485MHz"),   # 3100-3200W: Profile -4
-    (3200, "510MHz"),   # 3200-3300W: Profile -3 (Mid)
-    (3300, "535MHz"),   # 3300-3400W: Profile -2
-    (3400, "560MHz"),   # 3400-3500W: Profile -1
-    (3500, "585MHz"),   # 3500-3600W: Profile -2
-    (3600, "610MHz"),   # 3600-3700W: Profile -1
-    (3700, "635MHz"),   # 3700-3800W: Profile 0
-    (3800, "660MHz"),   # 3800-3900W: Profile 0
-    (3900, "685MHz"),   # 3900W+: Profile +1 (Max: 3693W, 127 TH/s)
-]
-
 
 class SolarPowerCoordinator:
     """Coordinator for automatic solar power adjustment."""
@@ -45,6 +43,9 @@ class SolarPowerCoordinator:
         config_entry_id: str,
         miner_name: str,
         solar_sensor: str = "sensor.pro3em_total_active_power",
+        forecast_entity: Optional[str] = None,
+        coordinator: Optional[DataUpdateCoordinator] = None,
+        profile_catalog: Optional[ProfileCatalog] = None,
     ) -> None:
         """Initialize the solar power coordinator."""
         self.hass = hass
@@ -52,10 +53,39 @@ class SolarPowerCoordinator:
         self._config_entry_id = config_entry_id
         self._miner_name = miner_name
         self._solar_sensor = solar_sensor
-        self._current_profile = None
         self._is_auto_mode = False
         self._update_interval = timedelta(seconds=30)
         self._cancel_update = None
+        self._cancel_solar_events = None
+        # Last state event of the solar sensor, where HA lacks last_reported
+        self._solar_reported_at = None
+        # A wake cycle can outlast the update interval; ticks never overlap
+        self._adjust_lock = asyncio.Lock()
+        self._listeners: List[Callable[[], None]] = []
+        # Decide on the miner's own profiles; the S21+ table is the fallback
+        self.profile_catalog = profile_catalog
+        if profile_catalog:
+            self.policy = SolarPolicy(profile_catalog.policy_map())
+            self.profile_models = profile_catalog.profile_models()
+        else:
+            self.policy = SolarPolicy(POWER_PROFILE_MAP)
+            self.profile_models = default_profile_models(self.policy)
+        self._forecast_entity = forecast_entity
+        self.planner = ForecastPlanner(self.policy, self.profile_models) if forecast_entity else None
+        self._last_plan_time: Optional[float] = None
+        self._coordinator = coordinator
+        self.cost_model = CurtailCostModel(self.policy.sleep_threshold)
+        self.battery_budget: Optional[BatteryBudget] = None
+        self._battery_soc_entity: Optional[str] = None
+        self._battery_charge_entity: Optional[str] = None
+        self._battery_discharge_entity: Optional[str] = None
+        self.signal_filter = SolarSignalFilter(
+            window=DEFAULT_SOLAR_FILTER_WINDOW,
+            alpha=DEFAULT_SOLAR_FILTER_ALPHA,
+            spike_threshold=DEFAULT_SOLAR_SPIKE_THRESHOLD,
+            spike_min_watts=DEFAULT_SOLAR_SPIKE_MIN_WATTS,
+            max_age=DEFAULT_SOLAR_MAX_AGE,
+        )
 
     async def async_start(self) -> None:
         """Start the solar power coordinator."""
@@ -65,6 +95,12 @@ class SolarPowerCoordinator:
             self._solar_sensor,
         )
 
+        # Note when the meter reports, to detect a frozen reading
+        self._solar_reported_at = dt_util.utcnow()
+        self._cancel_solar_events = async_track_state_change_event(
+            self.hass, [self._solar_sensor], self._async_solar_reported
+        )
+
         # Start periodic updates
         self._cancel_update = async_track_time_interval(
             self.hass,
@@ -77,6 +113,174 @@ class SolarPowerCoordinator:
         if self._cancel_update:
             self._cancel_update()
             self._cancel_update = None
+        if self._cancel_solar_events:
+            self._cancel_solar_events()
+            self._cancel_solar_events = None
+
+    @callback
+    def _async_solar_reported(self, event: Event) -> None:
+        """Record a state event of the solar sensor."""
+        self._solar_reported_at = event.time_fired
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback invoked after each solar update."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            if update_callback in self._listeners:
+                self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify_listeners(self) -> None:
+        """Notify registered listeners about new filter output."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @property
+    def filtered_power(self) -> Optional[float]:
+        """Return the conditioned solar power, or None if unavailable/stale."""
+        return self.signal_filter.value
+
+    def _reading_age(self, solar_state) -> Optional[float]:
+        """Return the seconds since the solar sensor last reported a reading.
+
+        Uses ``last_reported`` where HA provides it (bumped even when the
+        value is unchanged), otherwise the last state event seen. Not
+        ``last_updated``, which a steady reading never bumps.
+        """
+        reported = getattr(solar_state, "last_reported", None) or self._solar_reported_at
+        if reported is None:
+            return None
+        return (dt_util.utcnow() - reported).total_seconds()
+
+    def _sample_solar_sensor(self) -> Optional[float]:
+        """Read the solar sensor and push it through the signal filter.
+
+        The reading is sampled on every tick - a steady value is not
+        re-announced by HA. An unavailable sensor or one that stopped
+        reporting (frozen meter) makes the signal stale.
+        """
+        solar_state = self.hass.states.get(self._solar_sensor)
+
+        if solar_state is None:
+            _LOGGER.warning(
+                "Solar sensor %s not found - auto mode disabled",
+                self._solar_sensor,
+            )
+            self.signal_filter.mark_unavailable()
+            return None
+
+        try:
+            raw_power = float(solar_state.state)
+        except (ValueError, TypeError):
+            if solar_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+                _LOGGER.warning(
+                    "Invalid solar power value: %s",
+                    solar_state.state,
+                )
+            self.signal_filter.mark_unavailable()
+            return None
+
+        return self.signal_filter.update(raw_power, self._reading_age(solar_state))
+
+    def configure_battery(
+        self,
+        budget: BatteryBudget,
+        soc_entity: str,
+        charge_entity: Optional[str] = None,
+        discharge_entity: Optional[str] = None,
+    ) -> None:
+        """Limit the solar budget by battery state of charge.
+
+        ``charge_entity`` may be a signed battery power sensor (positive while
+        charging); ``discharge_entity`` is an optional separate sensor
+        reporting discharge power as a positive value.
+        """
+        self.battery_budget = budget
+        self._battery_soc_entity = soc_entity
+        self._battery_charge_entity = charge_entity
+        self._battery_discharge_entity = discharge_entity
+
+    def _read_float(self, entity_id: Optional[str]) -> Optional[float]:
+        """Return the numeric state of an entity, or None."""
+        if not entity_id:
+            return None
+        state = self.hass.states.get(entity_id)
+        if state is None or state.state in ("unknown", "unavailable"):
+            return None
+        try:
+            return float(state.state)
+        except (ValueError, TypeError):
+            return None
+
+    def _battery_power(self) -> Optional[float]:
+        """Return the measured battery power (positive = charging)."""
+        charge = self._read_float(self._battery_charge_entity)
+        discharge = self._read_float(self._battery_discharge_entity)
+        if charge is None and discharge is None:
+            return None
+        return (charge or 0.0) - (discharge or 0.0)
+
+    def _update_plan(self, now_ts: float) -> None:
+        """Rebuild the forecast schedule when it is due."""
+        if self.planner is None:
+            return
+        if (
+            self._last_plan_time is not None
+            and now_ts - self._last_plan_time < DEFAULT_PLANNER_REPLAN_INTERVAL
+        ):
+            return
+
+        forecast_state = self.hass.states.get(self._forecast_entity)
+        if forecast_state is None:
+            _LOGGER.debug("Forecast entity %s not found", self._forecast_entity)
+            return
+
+        self._last_plan_time = now_ts
+        forecast = parse_forecast(dict(forecast_state.attributes))
+        if not forecast:
+            _LOGGER.warning(
+                "Forecast entity %s has no usable forecast attributes",
+                self._forecast_entity,
+            )
+            return
+
+        self.planner.plan(forecast, now_ts, self._current_profile)
+
+    @property
+    def _thermal_governor(self):
+        """Return the thermal governor of the miner coordinator, if any."""
+        return getattr(self._coordinator, "thermal_governor", None)
+
+    @property
+    def _current_profile(self) -> Optional[str]:
+        """Return the miner's confirmed profile, SLEEP_PROFILE while curtailed."""
+        state = self._api.state
+        if state.curtailed:
+            return SLEEP_PROFILE
+        return state.profile
+
+    def _record_profile(self, profile: str) -> None:
+        """Tell the thermal governor about an applied profile."""
+        if self._thermal_governor is not None:
+            self._thermal_governor.record_profile(profile)
+
+    def _current_hashrate(self) -> Optional[float]:
+        """Return the miner hashrate (TH/s) from the last coordinator poll."""
+        if self._coordinator is None or not self._coordinator.data:
+            return None
+        stats = self._coordinator.data.get("stats", {})
+        if isinstance(stats, dict) and "STATS" in stats:
+            stats_data = stats["STATS"]
+            if isinstance(stats_data, list) and len(stats_data) > 1:
+                miner_stats = stats_data[1]
+                if "GHS 5s" in miner_stats:
+                    return float(miner_stats["GHS 5s"]) / 1000
+        return None
 
     def set_auto_mode(self, enabled: bool) -> None:
         """Enable or disable auto mode."""
@@ -89,27 +293,23 @@ class SolarPowerCoordinator:
 
     async def _async_update(self, now=None) -> None:
         """Update miner power based on solar production."""
-        if not self._is_auto_mode:
-            return
-
+        # Always sample so the filtered sensor stays live in manual mode
+        solar_power = self._sample_solar_sensor()
         try:
-            # Get solar production from sensor
-            solar_state = self.hass.states.get(self._solar_sensor)
-
-            if solar_state is None:
-                _LOGGER.warning(
-                    "Solar sensor %s not found - auto mode disabled",
-                    self._solar_sensor,
-                )
-                return
+            if self._is_auto_mode:
+                if self._adjust_lock.locked():
+                    _LOGGER.debug("Previous adjustment of %s still running - skipping tick", self._miner_name)
+                    return
+                async with self._adjust_lock:
+                    await self._async_adjust(solar_power)
+        finally:
+            self._async_notify_listeners()
 
-            try:
-                solar_power = float(solar_state.state)
-            except (ValueError, TypeError):
-                _LOGGER.warning(
-                    "Invalid solar power value: %s",
-                    solar_state.state,
-                )
+    async def _async_adjust(self, solar_power: Optional[float]) -> None:
+        """Apply the solar decision for the conditioned solar power."""
+        try:
+            if solar_power is None:
+                # Missing, invalid or stale reading - hold the current state
                 return
 
             # Get available solar power entity value
@@ -125,27 +325,99 @@ class SolarPowerCoordinator:
             else:
                 available_power = solar_power
 
-            # Check if we should sleep the miner (no solar power)
-            if available_power < 500:
-                # Not enough solar power - put miner to sleep
-                if self._current_profile != "sleep":
-                    _LOGGER.info(
-                        "Auto-sleeping %s: %.0fW solar (insufficient power)",
+            now_ts = dt_util.utcnow().timestamp()
+
+            # Use the forecast plan as prior, corrected by the measured power
+            if self.planner is not None:
+                self._update_plan(now_ts)
+                available_power = self.planner.corrected_power(available_power, now_ts)
+
+            # Let the battery charge first and supplement PV down to its floor
+            if self.battery_budget is not None:
+                available_power = self.battery_budget.update(
+                    available_power,
+                    self._read_float(self._battery_soc_entity),
+                    self._battery_power(),
+                    self._coordinator.power_watts if self._coordinator is not None else None,
+                )
+
+            # Learn dip lengths and wake time for the curtail cost model
+            self.cost_model.add_sample(now_ts, available_power)
+            current_model = self.profile_models.get(self._current_profile)
+            if current_model is not None:
+                self.cost_model.observe_hashrate(now_ts, self._current_hashrate(), current_model.hashrate)
+
+            decision = self.policy.decide(available_power, self._current_profile)
+
+            # Weigh a sleep/wake cycle against riding the dip
+            if decision.profile == SLEEP_PROFILE and current_model is not None:
+                lowest_profile = self.policy.profiles[0]
+                choice = self.cost_model.choose(
+                    now_ts,
+                    available_power,
+                    current_model.watts,
+                    self.profile_models[lowest_profile].watts,
+                    at_lowest=self._current_profile == lowest_profile,
+                )
+                if choice == CHOICE_RIDE:
+                    _LOGGER.debug(
+                        "Riding dip on %s: %.0fW solar, keeping %s",
                         self._miner_name,
                         available_power,
+                        self._current_profile,
                     )
-                    try:
-                        await self._api.pause_mining()
-                        self._current_profile = "sleep"
-                    except Exception as e:
-                        _LOGGER.error("Failed to sleep miner: %s", e)
+                    return
+                if choice == CHOICE_LOWEST:
+                    if self._current_profile != lowest_profile:
+                        _LOGGER.info(
+                            "Riding dip on %s at lowest profile %s: %.0fW solar",
+                            self._miner_name,
+                            lowest_profile,
+                            available_power,
+                        )
+                        try:
+                            await self._api.set_profile(lowest_profile)
+                            self._record_profile(lowest_profile)
+                        except Exception as e:
+                            _LOGGER.error("Failed to set power profile %s: %s", lowest_profile, e)
+                    return
+
+            # Check if we should sleep the miner (no solar power)
+            if decision.profile == SLEEP_PROFILE:
+                # Not enough solar power - put miner to sleep
+                _LOGGER.info(
+                    "Auto-sleeping %s: %.0fW solar (insufficient power)",
+                    self._miner_name,
+                    available_power,
+                )
+                try:
+                    await self._api.pause_mining()
+                    self._record_profile(SLEEP_PROFILE)
+                except Exception as e:
+                    _LOGGER.error("Failed to sleep miner: %s", e)
+                return
+
+            if decision.profile is None:
                 return
+            target_profile = decision.profile
 
-            # Determine appropriate power profile
-            target_profile = self._get_profile_for_power(available_power)
+            # The thermal governor takes precedence over the solar decision
+            governor = self._thermal_governor
+            if governor is not None:
+                capped = governor.cap(target_profile)
+                if capped != target_profile:
+                    _LOGGER.debug(
+                        "Thermal cap limits %s to %s (solar wants %s)",
+                        self._miner_name,
+                        capped,
+                        target_profile,
+                    )
+                    target_profile = capped
+                    if not decision.wake and governor.active_profile == capped:
+                        return
 
             # Wake miner if it's currently asleep
-            if self._current_profile == "sleep":
+            if decision.wake:
                 _LOGGER.info(
                     "Auto-waking %s: %.0fW solar available",
                     self._miner_name,
@@ -153,50 +425,42 @@ class SolarPowerCoordinator:
                 )
                 try:
                     await self._api.resume_mining()
-                    # Give miner time to wake up before setting profile
-                    import asyncio
-                    await asyncio.sleep(5)
+                    # Set the profile as soon as the miner is hashing again
+                    ready = await self._api.wait_for_mining()
                 except Exception as e:
                     _LOGGER.error("Failed to wake miner: %s", e)
                     return
+                if not ready:
+                    _LOGGER.warning(
+                        "%s is not hashing after wakeup - not setting profile %s",
+                        self._miner_name,
+                        target_profile,
+                    )
+                    return
+                self.cost_model.wake_started(now_ts)
 
-            # Only change profile if different from current
-            if target_profile != self._current_profile:
-                _LOGGER.info(
-                    "Auto-adjusting %s: %.0fW solar -> profile %s (was %s)",
-                    self._miner_name,
-                    available_power,
+            _LOGGER.info(
+                "Auto-adjusting %s: %.0fW solar -> profile %s (was %s)",
+                self._miner_name,
+                available_power,
+                target_profile,
+                self._current_profile or "unknown",
+            )
+
+            # Set the power profile via API
+            try:
+                await self._api.set_profile(target_profile)
+                self._record_profile(target_profile)
+            except Exception as e:
+                _LOGGER.error(
+                    "Failed to set power profile %s: %s",
                     target_profile,
-                    self._current_profile or "unknown",
+                    e,
                 )
 
-                # Set the power profile via API
-                try:
-                    await self._api.set_profile(target_profile)
-                    self._current_profile = target_profile
-                except Exception as e:
-                    _LOGGER.error(
-                        "Failed to set power profile %s: %s",
-                        target_profile,
-                        e,
-                    )
-
         except Exception as e:
             _LOGGER.error("Error in solar power coordinator update: %s", e)
 
     def _get_profile_for_power(self, available_power: float) -> str:
         """Get the appropriate power profile for available solar power."""
-        # Note: Caller should check for < 100W and handle sleep separately
-
-        # Find the appropriate profile from the map
-        for i, (threshold, profile) in enumerate(POWER_PROFILE_MAP):
-            # If this is the last entry or power is below next threshold
-            if i == len(POWER_PROFILE_MAP) - 1:
-                return profile
-
-            next_threshold = POWER_PROFILE_MAP[i + 1][0]
-            if available_power < next_threshold:
-                return profile
-
-        # Fallback to max profile
-        return "685MHz"
+        return self.policy.profile_for_power(available_power)
@@ -0,0 +1,109 @@
+"""Solar power decision policy shared by the live coordinator and the simulator."""
+import re
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Power profile mapping: available solar power (W) -> LuxOS profile name
+# Uses all profiles from -16 (260MHz) to +1 (685MHz)
+POWER_PROFILE_MAP = [
+    (0, "260MHz"),      # 0-2300W: Profile -16 (Min: 2223W, 48 TH/s)
+    (2300, "285MHz"),   # 2300-2400W: Profile -15
+    (2400, "310MHz"),   # 2400-2500W: Profile -14
+    (2500, "335MHz"),   # 2500-2600W: Profile -12
+    (2600, "360MHz"),   # 2600-2700W: Profile -10
+    (2700, "385MHz"),   # 2700-2800W: Profile -8 (Low)
+    (2800, "410MHz"),   # 2800-2900W: Profile -7
+    (2900, "435MHz"),   # 2900-3000W: Profile -5
+    (3000, "460MHz"),   # 3000-3100W: Profile -6
+    (3100, "485MHz"),   # 3100-3200W: Profile -4
+    (3200, "510MHz"),   # 3200-3300W: Profile -3 (Mid)
+    (3300, "535MHz"),   # 3300-3400W: Profile -2
+    (3400, "560MHz"),   # 3400-3500W: Profile -1
+    (3500, "585MHz"),   # 3500-3600W: Profile -2
+    (3600, "610MHz"),   # 3600-3700W: Profile -1
+    (3700, "635MHz"),   # 3700-3800W: Profile 0
+    (3800, "660MHz"),   # 3800-3900W: Profile 0
+    (3900, "685MHz"),   # 3900W+: Profile +1 (Max: 3693W, 127 TH/s)
+]
+
+# Pseudo profile used while the miner is curtailed
+SLEEP_PROFILE = "sleep"
+
+# Below this available power the miner is put to sleep
+SLEEP_THRESHOLD = 500
+
+# Miner model defaults (S21+ endpoints from the LuxOS profile table)
+DEFAULT_MIN_PROFILE = (260, 2223, 48.0)  # MHz, W, TH/s
+DEFAULT_MAX_PROFILE = (685, 3693, 127.0)
+DEFAULT_RETUNE_SECONDS = 90  # zero hashrate while LuxOS re-tunes after profileset
+DEFAULT_WAKE_SECONDS = 180  # zero hashrate while boards re-init after curtail wakeup
+
+
+class SolarDecision(NamedTuple):
+    """Outcome of one solar policy evaluation."""
+
+    wake: bool  # Miner must be woken before applying the profile
+    profile: Optional[str]  # Target profile, SLEEP_PROFILE, or None for no change
+
+
+class SolarPolicy:
+    """Map available power to a profile or sleep decision."""
+
+    def __init__(
+        self,
+        profile_map: Sequence[Tuple[float, str]] = POWER_PROFILE_MAP,
+        sleep_threshold: float = SLEEP_THRESHOLD,
+    ) -> None:
+        """Initialize the policy."""
+        self.profile_map = list(profile_map)
+        self.sleep_threshold = sleep_threshold
+        self.thresholds: List[float] = [threshold for threshold, _ in self.profile_map]
+        self.profiles: List[str] = [profile for _, profile in self.profile_map]
+
+    def profile_index_for_power(self, available_power: float) -> int:
+        """Return the index into ``profiles`` for the available power."""
+        return max(0, bisect_right(self.thresholds, available_power) - 1)
+
+    def profile_for_power(self, available_power: float) -> str:
+        """Return the appropriate power profile for available solar power."""
+        return self.profiles[self.profile_index_for_power(available_power)]
+
+    def decide(self, available_power: float, current_profile: Optional[str]) -> SolarDecision:
+        """Decide what to do for the given available power and current profile."""
+        if available_power < self.sleep_threshold:
+            if current_profile != SLEEP_PROFILE:
+                return SolarDecision(False, SLEEP_PROFILE)
+            return SolarDecision(False, None)
+
+        target_profile = self.profile_for_power(available_power)
+        wake = current_profile == SLEEP_PROFILE
+        if wake or target_profile != current_profile:
+            return SolarDecision(wake, target_profile)
+        return SolarDecision(False, None)
+
+
+class ProfileModel(NamedTuple):
+    """Power, hashrate and re-tune latency of one profile."""
+
+    name: str
+    watts: float
+    hashrate: float  # TH/s
+    retune_seconds: float
+
+
+def default_profile_models(policy: SolarPolicy) -> Dict[str, ProfileModel]:
+    """Interpolate a profile model for every profile in the policy map by frequency."""
+    low_freq, low_watts, low_hash = DEFAULT_MIN_PROFILE
+    high_freq, high_watts, high_hash = DEFAULT_MAX_PROFILE
+    models = {}
+    for name in policy.profiles:
+        match = re.match(r"(\d+)\s*MHz", name)
+        freq = float(match.group(1)) if match else high_freq
+        ratio = (freq - low_freq) / (high_freq - low_freq)
+        models[name] = ProfileModel(
+            name,
+            low_watts + ratio * (high_watts - low_watts),
+            low_hash + ratio * (high_hash - low_hash),
+            DEFAULT_RETUNE_SECONDS,
+        )
+    return models
@@ -9,7 +9,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, SWITCH_TYPES
+from .const import CAP_CURTAIL, DOMAIN, SWITCH_TYPES
 from .luxos_api import LuxOSAPIError
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,17 +27,20 @@ async def async_setup_entry(
     
     entities = []
     
-    # Create main miner switch
-    entities.append(
-        PVMinerSwitch(
-            coordinator,
-            api,
-            config_entry.entry_id,
-            config[CONF_NAME],
-            "miner_enabled",
-            SWITCH_TYPES["miner_enabled"],
+    # Create main miner switch (sleep/wakeup needs curtail support)
+    if api.supports(CAP_CURTAIL):
+        entities.append(
+            PVMinerSwitch(
+                coordinator,
+                api,
+                config_entry.entry_id,
+                config[CONF_NAME],
+                "miner_enabled",
+                SWITCH_TYPES["miner_enabled"],
+            )
         )
-    )
+    else:
+        _LOGGER.info("Curtail not supported by %s, miner switch not created", config[CONF_NAME])
 
     # Hashboard switches removed - not supported by LuxOS firmware 2025.10.15.191043
     # Use power profile switching instead for granular power control
@@ -95,6 +98,16 @@ class PVMinerSwitch(CoordinatorEntity, SwitchEntity):
             _LOGGER.debug("Error checking switch state %s: %s", self._switch_type, e)
             return None
 
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the last observed readiness latencies and cache counters."""
+        attributes = {
+            f"{operation}_ready_seconds": latency
+            for operation, latency in self._api.readiness_latency.items()
+        }
+        attributes.update(self._api.cache.as_dict())
+        return attributes
+
     def _is_miner_enabled(self, data: Dict[str, Any]) -> bool:
         """Check if miner is enabled based on hashrate."""
         stats = data.get("stats", {})
@@ -0,0 +1,182 @@
+"""Thermal governor capping the power profile on hot hashboards."""
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from .const import DEFAULT_THERMAL_LIMIT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Thermal defaults
+DEFAULT_THERMAL_MARGIN = 3  # °C below the limit at which the cap steps down
+DEFAULT_THERMAL_HYSTERESIS = 8  # °C below the limit required before stepping up
+DEFAULT_THERMAL_STEP_SECONDS = 60  # minimum time between two downward steps
+DEFAULT_THERMAL_COOLDOWN_SECONDS = 600  # time spent cool before stepping up
+
+
+def board_temperatures(data: Dict[str, Any]) -> List[float]:
+    """Return per-board temperatures from coordinator data.
+
+    Uses the ``devs`` reply (one entry per ASC), falling back to the
+    ``temps`` reply and finally to the ``stats`` temp1..temp3 fields.
+    """
+    temperatures: List[float] = []
+
+    devs = data.get("devs", {})
+    if isinstance(devs, dict) and isinstance(devs.get("DEVS"), list):
+        for dev in devs["DEVS"]:
+            if isinstance(dev, dict) and "Temperature" in dev:
+                try:
+                    temperatures.append(float(dev["Temperature"]))
+                except (TypeError, ValueError):
+                    continue
+    if temperatures:
+        return temperatures
+
+    temps = data.get("temps", {})
+    if isinstance(temps, dict) and isinstance(temps.get("TEMPS"), list):
+        for board in temps["TEMPS"]:
+            if not isinstance(board, dict):
+                continue
+            readings = []
+            for key in ("TopLeft", "TopRight", "BottomLeft", "BottomRight", "Board", "Chip"):
+                try:
+                    readings.append(float(board[key]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            if readings:
+                temperatures.append(max(readings))
+    if temperatures:
+        return temperatures
+
+    stats = data.get("stats", {})
+    if isinstance(stats, dict) and isinstance(stats.get("STATS"), list) and len(stats["STATS"]) > 1:
+        miner_stats = stats["STATS"][1]
+        for board in range(3):
+            try:
+                temperatures.append(float(miner_stats[f"temp{board + 1}"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return temperatures
+
+
+class ThermalGovernor:
+    """Cap the selectable profile while any hashboard runs near its limit.
+
+    The governor is fed the per-board temperatures of every coordinator poll
+    and never issues API calls of its own. When the hottest board reaches
+    ``limit - margin`` the cap steps one profile below the active one (at most
+    once per ``step_seconds``). Once all boards stay below
+    ``limit - hysteresis`` for ``cooldown_seconds`` the cap is raised one
+    step again, until it is lifted entirely.
+    """
+
+    def __init__(
+        self,
+        profiles: Sequence[str],
+        limit: float = DEFAULT_THERMAL_LIMIT,
+        margin: float = DEFAULT_THERMAL_MARGIN,
+        hysteresis: float = DEFAULT_THERMAL_HYSTERESIS,
+        step_seconds: float = DEFAULT_THERMAL_STEP_SECONDS,
+        cooldown_seconds: float = DEFAULT_THERMAL_COOLDOWN_SECONDS,
+    ) -> None:
+        """Initialize the governor with profiles ordered from lowest to highest power."""
+        self.profiles = list(profiles)
+        self.limit = limit
+        self.margin = margin
+        self.hysteresis = hysteresis
+        self.step_seconds = step_seconds
+        self.cooldown_seconds = cooldown_seconds
+
+        self.cap_index: Optional[int] = None  # None = uncapped
+        self.active_profile: Optional[str] = None
+        self.max_temperature: Optional[float] = None
+        self._last_step: Optional[float] = None
+        self._cool_since: Optional[float] = None
+
+    @property
+    def cap_profile(self) -> Optional[str]:
+        """Return the highest profile currently allowed (None when uncapped)."""
+        if self.cap_index is None:
+            return None
+        return self.profiles[self.cap_index]
+
+    def record_profile(self, profile: Optional[str]) -> None:
+        """Record the profile last applied to the miner."""
+        self.active_profile = profile
+
+    def cap(self, profile: str) -> str:
+        """Return ``profile`` limited to the current cap."""
+        if self.cap_index is None:
+            return profile
+        if profile in self.profiles and self.profiles.index(profile) <= self.cap_index:
+            return profile
+        # Unknown profiles cannot be ranked, so they are replaced by the cap too
+        return self.profiles[self.cap_index]
+
+    def update(self, temperatures: Sequence[float], now: float) -> Optional[str]:
+        """Evaluate new board temperatures.
+
+        Returns the profile to apply when the active profile now exceeds the
+        cap, otherwise None.
+        """
+        if not temperatures or not self.profiles:
+            return None
+        self.max_temperature = max(temperatures)
+
+        if self.max_temperature >= self.limit - self.margin:
+            self._cool_since = None
+            if self._last_step is None or now - self._last_step >= self.step_seconds:
+                self._step_down(now)
+        elif self.max_temperature <= self.limit - self.hysteresis:
+            if self._cool_since is None:
+                self._cool_since = now
+            elif self.cap_index is not None and now - self._cool_since >= self.cooldown_seconds:
+                self._step_up(now)
+        else:
+            self._cool_since = None
+
+        if self.active_profile is not None and self.active_profile in self.profiles:
+            capped = self.cap(self.active_profile)
+            if capped != self.active_profile:
+                return capped
+        return None
+
+    def _step_down(self, now: float) -> None:
+        """Lower the cap one profile below the effective profile."""
+        if self.active_profile in self.profiles:
+            current = self.profiles.index(self.active_profile)
+        else:
+            current = len(self.profiles) - 1
+        if self.cap_index is not None:
+            current = min(current, self.cap_index)
+        new_index = max(0, current - 1)
+        if new_index != self.cap_index:
+            _LOGGER.warning(
+                "Hashboard at %.1f°C (limit %.0f°C) - capping profile at %s",
+                self.max_temperature,
+                self.limit,
+                self.profiles[new_index],
+            )
+        self.cap_index = new_index
+        self._last_step = now
+
+    def _step_up(self, now: float) -> None:
+        """Raise the cap one profile, lifting it above the top profile."""
+        self.cap_index += 1
+        if self.cap_index >= len(self.profiles) - 1:
+            self.cap_index = None
+            _LOGGER.info("Hashboards cooled down - thermal cap lifted")
+        else:
+            _LOGGER.info("Hashboards cooled down - raising thermal cap to %s", self.profiles[self.cap_index])
+        # Each further step needs another full cooldown
+        self._cool_since = now
+        self._last_step = now
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return governor state for state attributes."""
+        return {
+            "limit": self.limit,
+            "max_board_temperature": self.max_temperature,
+            "cap_profile": self.cap_profile,
+            "active_profile": self.active_profile,
+        }
@@ -5,6 +5,7 @@ This bypasses Home Assistant to help diagnose hashboard switching issues.
 """
 import socket
 import json
+import sys
 import time
 
 def send_luxos_command(host, command, parameter=""):
@@ -89,7 +90,8 @@ def main():
     """Main diagnostic function."""
     print("=== LuxOS Hashboard Control Diagnostic Tool (Simple) ===\n")
 
-    MINER_HOST = "192.168.1.210"
+    # Pass a host to test another miner, e.g. 127.0.0.1 for the LuxOS simulator
+    MINER_HOST = sys.argv[1] if len(sys.argv) > 1 else "192.168.1.210"
     MINER_USERNAME = "root"
     MINER_PASSWORD = "root"
 